@@ -0,0 +1,272 @@
+"""Analiz katmanı benchmark'ı (model ve video gerekmez).
+
+Sentetik tracker çıktısıyla ZoneCounter, CycleTimeAnalyzer, istatistik
+kaydı ve çizim fonksiyonlarını sürer. Track sayısı, zone sayısı ve çalışma
+süresi büyürken çağrı başı gecikmeyi ve belleği raporlar; gerileme varsa
+çıkış kodu 1 olur.
+
+baseline.json iki bölümdür:
+- checks: sabit senaryoların (CHECK_SCENARIOS) sayım ve cycle sonuçları.
+  Makineden bağımsızdır, repoda tutulur ve her çalıştırmada birebir
+  karşılaştırılır. Davranış bilerek değiştiğinde --save-checks ile yenilenir.
+- scenarios: gecikme ve bellek ölçümleri. Makineye özeldir ve yerelde
+  --save-baseline ile kaydedilir.
+Her çalıştırmada en fazla zone sayısının (MAX_ZONES) çalıştığı da kontrol edilir:
+
+    python benchmarks/bench_analytics.py --save-baseline   # gecikme baseline'ı oluştur
+    python benchmarks/bench_analytics.py                   # baseline ile karşılaştır
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+# src klasörünü Python path'ine ekle
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from analytics import ZoneAnalytics  # noqa: E402
+from synthetic import MOTIONS, SyntheticScene, make_zones  # noqa: E402
+from zone_engine import MAX_ZONES  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Sabit parametrelerle (komut satırından bağımsız) çalışan deterministik senaryolar:
+# (hareket, track, zone, frame)
+CHECK_SCENARIOS = (
+    ('conveyor', 50, 3, 2000),
+    ('conveyor', 200, 10, 2000),
+    # Kaybolup yeniden bulunan track'ler: yeniden ilişkilendirme ve sayım davranışını sabitler
+    ('random_walk', 50, 3, 2000),
+    ('random_walk', 10, 3, 5000),
+)
+CALLS = ('zone_engine', 'zone_counter', 'cycle_analyzer', 'evict', 'current_cycle_times',
+         'draw', 'zone_statistics', 'save_statistics')
+
+
+def scenario_key(args, n_tracks, n_zones, n_frames):
+    return f"{args.motion}/t{n_tracks}/z{n_zones}/f{n_frames}"
+
+
+def run_scenario(args, n_tracks, n_zones, n_frames, stats_path, timed=True):
+    """Senaryoyu çalıştır; çağrı başı süreler (saniye) ve sonuç özetini döndür"""
+    zones = make_zones(n_zones, tuple(args.frame_size))
+    analytics = ZoneAnalytics(zones, stats_path=stats_path)
+    counter, analyzer = analytics.zone_counter, analytics.cycle_analyzer
+    scene = SyntheticScene(n_tracks, tuple(args.frame_size), args.motion, fps=args.fps,
+                           dropout=args.dropout, id_switch=args.id_switch, seed=args.seed)
+    width, height = args.frame_size
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    timings = {call: [] for call in CALLS}
+    clock = time.perf_counter if timed else (lambda: 0.0)
+
+    def timed_call(name, fn, *call_args):
+        start = clock()
+        result = fn(*call_args)
+        timings[name].append(clock() - start)
+        return result
+
+    for frame_number, (timestamp, detections) in enumerate(scene.frames(n_frames), 1):
+        zone_frame = timed_call('zone_engine', analytics.zone_engine.update,
+                                detections.xyxy, detections.tracker_id)
+        timed_call('zone_counter', counter.update, detections, zone_frame, timestamp)
+        timed_call('cycle_analyzer', analyzer.update, detections, zone_frame, timestamp)
+        timed_call('evict', analytics.track_table.evict, timestamp, counter.max_disappeared_time)
+        timed_call('current_cycle_times', analyzer.get_current_cycle_times, timestamp)
+        if args.draw:
+            timed_call('draw', analytics.draw, frame, detections, timestamp)
+        if frame_number % args.save_every == 0:
+            timed_call('zone_statistics', analyzer.get_zone_statistics, timestamp)
+            timed_call('save_statistics', analyzer.save_statistics, stats_path)
+
+    result = {
+        'counts': counter.get_counts(),
+        'cycles': int(analyzer.cycle_store.total_appended),
+        'max_track_id': int(scene.next_id - 1),
+    }
+    return timings, result
+
+
+def check_zone_limit(args):
+    """MAX_ZONES zone (dikdörtgen ve poligon) kurulur ve son zone'da sayım / cycle
+    oluşur; bir fazlası ZoneAnalytics kurulurken ValueError verir"""
+    problems = []
+    last = f"zone{MAX_ZONES}"
+    for polygon in (False, True):
+        zones = make_zones(MAX_ZONES, tuple(args.frame_size), polygon=polygon)
+        analytics = ZoneAnalytics(zones, save_interval=None)
+        scene = SyntheticScene(200, tuple(args.frame_size), 'conveyor', fps=args.fps, seed=args.seed)
+        for timestamp, detections in scene.frames(1500):
+            analytics.analyze(None, detections, timestamp, render=False)
+        count = analytics.zone_counter.get_counts()[last]
+        cycles = analytics.cycle_analyzer.get_zone_statistics(timestamp).get(last, {}).get('total_objects', 0)
+        if not count or not cycles:
+            problems.append(f"{MAX_ZONES} zone ({'poligon' if polygon else 'dikdörtgen'}): "
+                            f"{last} sayım {count}, cycle {cycles}")
+    try:
+        ZoneAnalytics(make_zones(MAX_ZONES + 1, tuple(args.frame_size)), save_interval=None)
+        problems.append(f"{MAX_ZONES + 1} zone reddedilmedi")
+    except ValueError:
+        pass
+    return problems
+
+
+def run_checks(args):
+    """CHECK_SCENARIOS sonuçları {anahtar: sonuç} (süre ölçülmez, çizim yok)"""
+    checks = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stats_path = os.path.join(tmp_dir, 'cycle_time_stats.json')
+        for motion, n_tracks, n_zones, n_frames in CHECK_SCENARIOS:
+            check_args = argparse.Namespace(motion=motion, frame_size=[1920, 1080], fps=25.0, dropout=0.02,
+                                            id_switch=0.001, seed=0, draw=False, save_every=250)
+            key = scenario_key(check_args, n_tracks, n_zones, n_frames)
+            _, checks[key] = run_scenario(check_args, n_tracks, n_zones, n_frames, stats_path, timed=False)
+    return checks
+
+
+def describe(samples):
+    values = np.asarray(samples) * 1e6
+    quarter = max(len(values) // 4, 1)
+    first, last = np.median(values[:quarter]), np.median(values[-quarter:])
+    return {
+        'calls': len(values),
+        'mean_us': float(values.mean()),
+        'p50_us': float(np.median(values)),
+        'p95_us': float(np.percentile(values, 95)),
+        # Çalışma uzadıkça yavaşlama: son çeyrek / ilk çeyrek medyanı
+        'growth': float(last / first) if first > 0 else 1.0,
+    }
+
+
+def measure_memory(args, n_tracks, n_zones, n_frames, stats_path):
+    tracemalloc.start()
+    run_scenario(args, n_tracks, n_zones, n_frames, stats_path, timed=False)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 1024, peak / 1024
+
+
+def compare_checks(checks, expected):
+    """Deterministik senaryo sonuçları kayıtlı sonuçlarla birebir aynı olmalı"""
+    problems = []
+    for key, result in checks.items():
+        if key not in expected:
+            problems.append(f"{key}: kayıtlı sonuç yok (--save-checks)")
+        elif result != expected[key]:
+            problems.append(f"{key}: sonuç değişti {expected[key]} -> {result}")
+    return problems
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """Baseline'a göre gerilemeleri listele"""
+    problems = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if current['result'] != reference['result']:
+            problems.append(f"{key}: sonuç değişti {reference['result']} -> {current['result']}")
+        for call, stats in current['latency'].items():
+            ref = reference['latency'].get(call)
+            if ref and ref['p50_us'] > 0 and stats['p50_us'] > tolerance * ref['p50_us']:
+                problems.append(f"{key} {call}: p50 {ref['p50_us']:.1f} -> {stats['p50_us']:.1f} us "
+                                f"({stats['p50_us'] / ref['p50_us']:.2f}x)")
+        ref_memory = reference.get('memory_kb')
+        if ref_memory and current.get('memory_kb') and current['memory_kb'] > memory_tolerance * ref_memory:
+            problems.append(f"{key}: bellek {ref_memory:.0f} -> {current['memory_kb']:.0f} KB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tracks', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--zones', type=int, nargs='+', default=[3, 10])
+    parser.add_argument('--frames', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--motion', choices=MOTIONS, default='conveyor')
+    parser.add_argument('--dropout', type=float, default=0.02)
+    parser.add_argument('--id-switch', type=float, default=0.001)
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--frame-size', type=int, nargs=2, default=[1920, 1080], metavar=('W', 'H'))
+    parser.add_argument('--save-every', type=int, default=250, help="save_statistics aralığı (frame)")
+    parser.add_argument('--no-draw', dest='draw', action='store_false', help="Çizim fonksiyonlarını atla")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="Bellek ölçümünü atla")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Gecikme / bellek sonuçlarını baseline olarak kaydet")
+    parser.add_argument('--save-checks', action='store_true',
+                        help="Deterministik senaryo sonuçlarını kaydet (davranış bilerek değiştiğinde)")
+    parser.add_argument('--tolerance', type=float, default=1.5, help="İzin verilen p50 artış oranı")
+    parser.add_argument('--memory-tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        problems = check_zone_limit(args)
+    print(f"Zone sınırı ({MAX_ZONES}): {'HATA' if problems else 'tamam'}")
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        checks = run_checks(args)
+    print("\nDeterministik senaryolar:")
+    for key, result in checks.items():
+        print(f"  {key:<28} {result}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stats_path = os.path.join(tmp_dir, 'cycle_time_stats.json')
+        for n_frames in args.frames:
+            for n_zones in args.zones:
+                for n_tracks in args.tracks:
+                    key = scenario_key(args, n_tracks, n_zones, n_frames)
+                    # Sayım/cycle çıktıları benchmark'ta bastırılır
+                    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                        timings, result = run_scenario(args, n_tracks, n_zones, n_frames, stats_path)
+                        memory = (measure_memory(args, n_tracks, n_zones, n_frames, stats_path)
+                                  if args.memory else (None, None))
+                    latency = {call: describe(samples) for call, samples in timings.items() if samples}
+                    results[key] = {'latency': latency, 'result': result,
+                                    'memory_kb': memory[0], 'peak_kb': memory[1]}
+
+                    print(f"\n{key}  (cycle: {result['cycles']}, max ID: {result['max_track_id']}"
+                          + (f", bellek: {memory[0]:.0f} KB, tepe: {memory[1]:.0f} KB)" if args.memory else ")"))
+                    print(f"  {'çağrı':<20} {'sayı':>7} {'ort us':>9} {'p50 us':>9} {'p95 us':>9} {'büyüme':>7}")
+                    for call, stats in latency.items():
+                        print(f"  {call:<20} {stats['calls']:>7} {stats['mean_us']:>9.1f} {stats['p50_us']:>9.1f} "
+                              f"{stats['p95_us']:>9.1f} {stats['growth']:>6.2f}x")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    if args.save_checks or args.save_baseline:
+        if args.save_checks:
+            baseline['checks'] = checks
+        if args.save_baseline:
+            baseline['scenarios'] = results
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline kaydedildi: {args.baseline}")
+
+    problems += compare_checks(checks, baseline.get('checks', {}))
+    scenarios = baseline.get('scenarios')
+    if scenarios:
+        problems += compare(results, scenarios, args.tolerance, args.memory_tolerance)
+    if problems:
+        print("\nGERİLEME TESPİT EDİLDİ:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    if scenarios:
+        print(f"\nBaseline ile uyumlu ({len(checks)} deterministik, "
+              f"{len(set(results) & set(scenarios))} ölçüm senaryosu)")
+    else:
+        print(f"\nDeterministik senaryolar uyumlu ({len(checks)}); gecikme baseline'ı yok "
+              f"({args.baseline}), kaydetmek için --save-baseline")
+
+
+if __name__ == "__main__":
+    main()
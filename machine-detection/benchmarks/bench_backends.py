@@ -0,0 +1,149 @@
+"""Inference backend karşılaştırması (video ve model ağırlıkları gerekir).
+
+Aynı frame'leri her backend'den geçirir; frame başı gecikmeyi (warmup
+sonrası) ve PyTorch (ultralytics) backend'ine göre tespit uyumunu raporlar.
+Uyum: aynı sınıf ve IoU >= eşik olan kutular birebir eşleştirilir,
+precision / recall / F1 referans tespitlere göre hesaplanır.
+
+    python benchmarks/bench_backends.py --video videos/line1.mp4 --backends ultralytics onnx openvino
+    python benchmarks/bench_backends.py --video videos/line1.mp4 --backends onnx --int8 --threads 4
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+# src klasörünü Python path'ine ekle
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from backends import BACKENDS, create_backend, warmup  # noqa: E402
+from config import Config  # noqa: E402
+
+REFERENCE = 'ultralytics'
+
+
+def read_frames(video_path, count, step):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    frames = []
+    index = 0
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % step == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+def box_iou(a, b):
+    """(N, 4) x (M, 4) IoU matrisi"""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod((bottom_right - top_left).clip(0), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def match_count(reference, candidate, iou_threshold):
+    """Açgözlü birebir eşleştirme: aynı sınıf, IoU >= eşik"""
+    ref_xyxy, _, ref_cls = reference
+    cand_xyxy, _, cand_cls = candidate
+    if len(ref_xyxy) == 0 or len(cand_xyxy) == 0:
+        return 0
+    iou = box_iou(ref_xyxy, cand_xyxy)
+    iou[ref_cls[:, None] != cand_cls[None, :]] = 0.0
+    used_ref, used_cand = set(), set()
+    for flat in np.argsort(iou, axis=None)[::-1]:
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        if i in used_ref or j in used_cand:
+            continue
+        used_ref.add(i)
+        used_cand.add(j)
+    return len(used_ref)
+
+
+def agreement(reference, candidate, iou_threshold):
+    matched = ref_total = cand_total = 0
+    for ref, cand in zip(reference, candidate):
+        matched += match_count(ref, cand, iou_threshold)
+        ref_total += len(ref[0])
+        cand_total += len(cand[0])
+    precision = matched / cand_total if cand_total else 1.0
+    recall = matched / ref_total if ref_total else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1,
+            'reference_boxes': ref_total, 'boxes': cand_total}
+
+
+def run_backend(name, model_path, frames, warmup_runs):
+    backend = create_backend(model_path, name)
+    start = time.perf_counter()
+    warmup(backend, frames[:1], runs=warmup_runs)
+    warmup_s = time.perf_counter() - start
+
+    latencies = []
+    detections = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        detections.append(backend.predict([frame])[0])
+        latencies.append(time.perf_counter() - t0)
+    return np.asarray(latencies), detections, warmup_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video', default=Config.VIDEO_PATH)
+    parser.add_argument('--model', default=Config.MODEL_PATH, help="PyTorch ağırlıkları (.pt)")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--step', type=int, default=1, help="Her N frame'den birini kullan")
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--int8', action='store_true', help="INT8 ağırlıklar (onnx / openvino)")
+    parser.add_argument('--warmup', type=int, default=Config.BACKEND_WARMUP)
+    parser.add_argument('--iou', type=float, default=0.5, help="Uyum için IoU eşiği")
+    args = parser.parse_args()
+
+    # Tüm backend'ler aynı giriş boyutu ve thread sayısıyla karşılaştırılır
+    Config.BACKEND_IMGSZ = args.imgsz
+    Config.BACKEND_THREADS = args.threads
+    Config.BACKEND_INT8 = args.int8
+    Config.BACKEND_MODEL_PATH = None  # Her backend kendi dışa aktarımını kullanır
+
+    frames = read_frames(args.video, args.frames, args.step)
+    if not frames:
+        print(f"Hata: Frame okunamadı: {args.video}")
+        return
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} frame ({width}x{height}), imgsz {args.imgsz}, "
+          f"thread {args.threads or 'auto'}, int8 {args.int8}")
+
+    names = list(dict.fromkeys([REFERENCE] + args.backends))
+    results = {}
+    for name in names:
+        print(f"\n[{name}]")
+        results[name] = run_backend(name, args.model, frames, args.warmup)
+
+    reference = results[REFERENCE][1]
+    print(f"\n{'backend':<12} {'warmup ms':>10} {'mean ms':>9} {'p95 ms':>9} {'fps':>8} "
+          f"{'precision':>10} {'recall':>8} {'F1':>6}")
+    for name in names:
+        latencies, detections, warmup_s = results[name]
+        match = agreement(reference, detections, args.iou)
+        print(f"{name:<12} {warmup_s * 1000:>10.0f} {latencies.mean() * 1000:>9.2f} "
+              f"{np.percentile(latencies, 95) * 1000:>9.2f} {1.0 / latencies.mean():>8.1f} "
+              f"{match['precision']:>10.3f} {match['recall']:>8.3f} {match['f1']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Cycle geçmişi benchmark'ı (model ve video gerekmez).
+
+Günlerce süren sentetik cycle geçmişini CycleHistoryWriter ile geçici bir
+SQLite veritabanına yazar (periyodik kayıttaki gibi küçük gruplar halinde)
+ve tipik rapor sorgularını ölçer: özet tablolarından okuyan CycleHistory
+ile ham cycles tablosunu tarayan referans sorgu karşılaştırılır, sonuçların
+aynı olduğu kontrol edilir:
+
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --days 90 --rate 2 --zones 10
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+# src klasörünü Python path'ine ekle
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from cycle_history import CycleHistory, CycleHistoryWriter  # noqa: E402
+
+
+def make_cycles(days, rate, n_zones, end, seed=0):
+    """Saniyede `rate` cycle, zone'lara rastgele dağılmış, çıkış zamanına göre sıralı"""
+    rng = np.random.default_rng(seed)
+    count = int(days * 86400 * rate)
+    exit_times = np.sort(rng.uniform(end - days * 86400, end, count))
+    zones = rng.integers(0, n_zones, count)
+    cycle_times = rng.gamma(4.0, 5.0, count)
+    return exit_times, zones, cycle_times
+
+
+def reference_statistics(history, start, end):
+    rows = history._execute(
+        'SELECT zone, COUNT(*), AVG(cycle_time), MIN(cycle_time), MAX(cycle_time) FROM cycles '
+        'WHERE exit_time >= ? AND exit_time < ? GROUP BY zone', [start, end])
+    return {zone: (count, mean, minimum, maximum) for zone, count, mean, minimum, maximum in rows}
+
+
+def reference_series(history, start, end):
+    return history._execute(
+        'SELECT CAST(exit_time / 3600 AS INTEGER) * 3600 AS bucket, zone, COUNT(*), AVG(cycle_time) '
+        'FROM cycles WHERE exit_time >= ? AND exit_time < ? GROUP BY bucket, zone', [start, end])
+
+
+def timed(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--rate', type=float, default=1.0, help="Saniyede cycle (tüm zone'lar)")
+    parser.add_argument('--zones', type=int, default=5)
+    parser.add_argument('--flush', type=int, default=40, help="Kayıt başına cycle (periyodik kayıt)")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    end = math.floor(time.time() / 3600) * 3600
+    exit_times, zones, cycle_times = make_cycles(args.days, args.rate, args.zones, end, args.seed)
+    zone_names = [f'zone{i + 1}' for i in range(args.zones)]
+    records = [{'zone': zone_names[zone], 'track_id': i, 'entry_time': exit_time - cycle_time,
+                'exit_time': exit_time, 'cycle_time': cycle_time}
+               for i, (exit_time, zone, cycle_time) in enumerate(zip(exit_times.tolist(), zones.tolist(),
+                                                                     cycle_times.tolist()))]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'history.db')
+        writer = CycleHistoryWriter(path)
+        start = time.perf_counter()
+        for i in range(0, len(records), args.flush):
+            writer.append(records[i:i + args.flush])
+        writer.close()
+        elapsed = time.perf_counter() - start
+        print(f"{len(records)} cycle, {args.days:g} gün, {args.zones} zone: yazım {elapsed:.1f} s "
+              f"({len(records) / elapsed:.0f} cycle/s), veritabanı {os.path.getsize(path) / 1e6:.0f} MB")
+
+        history = CycleHistory(path)
+        # Kenarları dakika / saate hizalı olmayan aralıklar
+        queries = {
+            'son 1 saat': (end - 3600 + 17.3, end - 4.1),
+            'son 1 gün': (end - 86400 + 17.3, end - 4.1),
+            f'son {args.days:g} gün': (end - args.days * 86400 + 17.3, end - 4.1),
+        }
+        print(f"\n{'sorgu':<24} {'referans ms':>12} {'özet ms':>9} {'hızlanma':>9}")
+        for name, (query_start, query_end) in queries.items():
+            expected, reference_ms = timed(lambda: reference_statistics(history, query_start, query_end),
+                                           args.repeats)
+            result, rollup_ms = timed(lambda: history.zone_statistics(query_start, query_end), args.repeats)
+            for zone, (count, mean, minimum, maximum) in expected.items():
+                stats = result[zone]
+                assert stats['count'] == count and stats['min_time'] == minimum and stats['max_time'] == maximum
+                assert abs(stats['avg_time'] - mean) < 1e-6
+            print(f"{'zone özeti, ' + name:<24} {reference_ms:>12.2f} {rollup_ms:>9.2f} "
+                  f"{reference_ms / rollup_ms:>8.1f}x")
+
+        series_start = end - args.days * 86400
+        expected, reference_ms = timed(lambda: reference_series(history, series_start, end), args.repeats)
+        rows, rollup_ms = timed(lambda: history.series('hour', series_start, end), args.repeats)
+        assert len(rows) == len(expected)
+        print(f"{'saatlik seri, ' + f'{args.days:g} gün':<24} {reference_ms:>12.2f} {rollup_ms:>9.2f} "
+              f"{reference_ms / rollup_ms:>8.1f}x")
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
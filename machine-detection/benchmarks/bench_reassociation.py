@@ -0,0 +1,70 @@
+"""Kaybolan track yeniden eşleştirme benchmark'ı.
+
+Eski iç içe Python döngüsü (greedy) ile vektörel global eşleştirmeyi
+track sayısı büyürken karşılaştırır:
+
+    python benchmarks/bench_reassociation.py
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# src klasörünü Python path'ine ekle
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from reassociation import associate  # noqa: E402
+
+
+def legacy_greedy(new_centers, lost_centers, max_distance):
+    """ZoneCounter'ın eski yöntemi: her yeni track için en yakın kayıp track (greedy)"""
+    available = dict(enumerate(map(tuple, lost_centers.tolist())))
+    pairs = []
+    for row, center in enumerate(new_centers.tolist()):
+        closest, min_distance = None, float('inf')
+        for col, old_center in available.items():
+            distance = np.sqrt((center[0] - old_center[0]) ** 2 + (center[1] - old_center[1]) ** 2)
+            if distance < max_distance and distance < min_distance:
+                min_distance, closest = distance, col
+        if closest is not None:
+            pairs.append((row, closest))
+            del available[closest]
+    return pairs
+
+
+def make_scene(n_tracks, rng, frame_size=(1920, 1080), jitter=20.0):
+    lost = rng.uniform((0, 0), frame_size, size=(n_tracks, 2))
+    new = lost + rng.normal(0, jitter, size=lost.shape)
+    return new[rng.permutation(n_tracks)], lost
+
+
+def timeit(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100, 250, 500, 1000, 2000])
+    parser.add_argument('--max-distance', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'tracks':>7} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8} {'legacy eşl.':>12} {'vector eşl.':>12}")
+    for n in args.sizes:
+        new, lost = make_scene(n, rng)
+        legacy_time, legacy_pairs = timeit(lambda: legacy_greedy(new, lost, args.max_distance), args.repeat)
+        vector_time, (rows, _) = timeit(lambda: associate(new, lost, args.max_distance), args.repeat)
+        print(f"{n:>7} {legacy_time * 1000:>10.2f} {vector_time * 1000:>10.2f} "
+              f"{legacy_time / max(vector_time, 1e-9):>7.1f}x {len(legacy_pairs):>12} {len(rows):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Çizim (annotation) benchmark'ı (model ve video gerekmez).
+
+Sentetik tracker çıktısıyla frame başı çizim maliyetini track, zone sayısı
+ve zone şekline göre ölçer. Her frame'de tüm zone katmanını ve metinleri
+yeniden çizen referans yol ile önbellekli zone katmanı + dizi tabanlı
+kutu / süre çizimi karşılaştırılır. Ekran kopyasının (tam ve küçültülmüş
+önizleme) maliyeti ayrıca raporlanır:
+
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --tracks 10 100 500 --zones 5 20 --polygons
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+# src klasörünü Python path'ine ekle
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from analytics import ZoneAnalytics  # noqa: E402
+from display import preview  # noqa: E402
+from zone_engine import zone_polygon  # noqa: E402
+from synthetic import MOTIONS, SyntheticScene, make_zones  # noqa: E402
+
+
+def draw_reference(frame, zones, detections, current_cycles):
+    """Her frame'de her şeyi yeniden çizen yol (karşılaştırma için)"""
+    for box, track_id in zip(detections.xyxy, detections.tracker_id):
+        x1, y1, x2, y2 = map(int, box)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 1)
+        cv2.putText(frame, f"ID: {track_id}", (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 0, 0), 1)
+    for zone_name, zone_info in zones.items():
+        x1, y1, x2, y2 = zone_info["coords"]
+        if zone_info.get("polygon"):
+            cv2.polylines(frame, [zone_polygon(zone_info)], True, (0, 0, 255), 2)
+        else:
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
+        cv2.putText(frame, f"{zone_name}: {zone_info['count']}", (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+    offsets = dict.fromkeys(zones, 0)
+    for track_id, track_zones in current_cycles.items():
+        for zone_name, seconds in track_zones.items():
+            x1, y1 = zones[zone_name]["coords"][:2]
+            cv2.putText(frame, f"ID:{track_id} {seconds:.1f}s", (x1, y1 - 25 - offsets[zone_name] * 15),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
+            offsets[zone_name] += 1
+
+
+def run_scenario(args, n_tracks, n_zones):
+    """Aynı sahneyi iki yolla çiz; frame başı süreler (saniye)"""
+    zones = make_zones(n_zones, tuple(args.frame_size), polygon=args.polygons)
+    analytics = ZoneAnalytics(zones)
+    scene = SyntheticScene(n_tracks, tuple(args.frame_size), args.motion, fps=args.fps, seed=args.seed)
+    width, height = args.frame_size
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    timings = {'reference': [], 'cached': []}
+    active = []
+
+    for timestamp, detections in scene.frames(args.frames):
+        # Sayımlar ilerlesin diye analiz çizimsiz çalışır (ölçülmez)
+        analytics.analyze(frame, detections, timestamp, render=False)
+        active.append(sum(len(zones) for zones in
+                          analytics.cycle_analyzer.get_current_cycle_times(timestamp).values()))
+
+        start = time.perf_counter()
+        current_cycles = analytics.cycle_analyzer.get_current_cycle_times(timestamp)
+        draw_reference(frame, zones, detections, current_cycles)
+        timings['reference'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        analytics.draw(frame, detections, timestamp)
+        timings['cached'].append(time.perf_counter() - start)
+    return timings, float(np.mean(active))
+
+
+def preview_costs(args, scales, repeats=50):
+    width, height = args.frame_size
+    frame = np.random.default_rng(args.seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    costs = {}
+    for scale in scales:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            preview(frame, scale)
+        costs[scale] = (time.perf_counter() - start) / repeats
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tracks', type=int, nargs='+', default=[10, 50, 200, 500])
+    parser.add_argument('--zones', type=int, nargs='+', default=[3, 10, 30])
+    parser.add_argument('--polygons', action='store_true', help="Dikdörtgen yerine poligon zone'lar")
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--motion', choices=MOTIONS, default='conveyor')
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--frame-size', type=int, nargs=2, default=[1920, 1080], metavar=('W', 'H'))
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.5, 0.25],
+                        help="Önizleme ölçekleri")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    width, height = args.frame_size
+    print(f"{width}x{height}, {args.frames} frame, {'poligon' if args.polygons else 'dikdörtgen'} zone'lar")
+    print(f"{'zone':>5} {'track':>6} {'aktif süre':>11} {'referans ms':>12} {'önbellekli ms':>14} {'hızlanma':>9}")
+    for n_zones in args.zones:
+        for n_tracks in args.tracks:
+            # Sayım çıktıları benchmark'ta bastırılır
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                timings, active = run_scenario(args, n_tracks, n_zones)
+            reference = np.median(timings['reference']) * 1000
+            cached = np.median(timings['cached']) * 1000
+            print(f"{n_zones:>5} {n_tracks:>6} {active:>11.1f} {reference:>12.3f} {cached:>14.3f} "
+                  f"{reference / cached:>8.2f}x")
+
+    print("\nEkran kopyası (Display.submit, frame başına):")
+    for scale, seconds in preview_costs(args, args.scales).items():
+        print(f"  ölçek {scale:g}: {seconds * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
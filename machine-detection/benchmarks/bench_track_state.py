@@ -0,0 +1,68 @@
+"""Uzun çalışmada track durumu bellek benchmark'ı.
+
+ByteTrack ID'leri sürekli artan sentetik bir akışı (ör. günlerce çalışan bir
+hat) ZoneCounter + CycleTimeAnalyzer ortak track tablosundan geçirir ve
+track tablosunun ve Python heap'inin zamanla sabit kaldığını gösterir:
+
+    python benchmarks/bench_track_state.py --hours 24
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+# src klasörünü Python path'ine ekle
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from zone_engine import ZoneEngine  # noqa: E402
+from zone_counter import ZoneCounter  # noqa: E402
+from cycle_time_analyzer import CycleTimeAnalyzer  # noqa: E402
+from track_table import TrackTable  # noqa: E402
+from synthetic import SyntheticScene, make_zones  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hours', type=float, default=24.0, help="Simüle edilen çalışma süresi")
+    parser.add_argument('--fps', type=float, default=5.0, help="Simülasyon frame hızı")
+    parser.add_argument('--tracks', type=int, default=10, help="Eşzamanlı nesne sayısı")
+    parser.add_argument('--zones', type=int, default=3)
+    parser.add_argument('--reports', type=int, default=8, help="Ara rapor sayısı")
+    args = parser.parse_args()
+
+    zones = make_zones(args.zones)
+    engine = ZoneEngine(zones)
+    table = TrackTable(len(zones))
+    counter = ZoneCounter(zones, track_table=table)
+    analyzer = CycleTimeAnalyzer(zones, retained_cycles=10000, track_table=table)
+    scene = SyntheticScene(args.tracks, motion='conveyor', fps=args.fps, speed=400.0)
+
+    n_frames = int(args.hours * 3600 * args.fps)
+    report_every = max(n_frames // args.reports, 1)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    print(f"{'sim saat':>9} {'max ID':>8} {'aktif':>6} {'slot':>6} {'tablo KB':>9} {'heap KB':>9} {'cycle':>9}")
+    # Zone sayım/cycle çıktıları benchmark'ta bastırılır
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for frame, (now, detections) in enumerate(scene.frames(n_frames), 1):
+            zone_frame = engine.update(detections.xyxy, detections.tracker_id)
+            counter.update(detections, zone_frame, now)
+            analyzer.update(detections, zone_frame, now)
+            table.evict(now, counter.max_disappeared_time)
+
+            if frame % report_every == 0:
+                heap, _ = tracemalloc.get_traced_memory()
+                line = (f"{now / 3600:>9.1f} {scene.next_id - 1:>8} {len(table):>6} {table.capacity:>6} "
+                        f"{table.memory_bytes() / 1024:>9.1f} {heap / 1024:>9.1f} "
+                        f"{analyzer.cycle_store.total_appended:>9}")
+                print(line, file=sys.__stdout__)
+    tracemalloc.stop()
+    print(f"{n_frames} frame, {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Model ve video gerektirmeyen sentetik tracker çıktısı.
+
+Benchmark'lar bu modülle `best_bwc.pt` ağırlıkları veya gerçek video olmadan
+analiz katmanını (zone sayımı, cycle time, çizim) sürebilir. Üretilen
+nesneler tracker'ın verdiği `DetectionBatch`'tir (src Python path'inde olmalı).
+"""
+import numpy as np
+from detections import DetectionBatch
+
+MOTIONS = ('conveyor', 'random_walk', 'static')
+
+
+def make_zones(n_zones, frame_size=(1920, 1080), band=(0.3, 0.7), polygon=False):
+    """Frame'in orta bandını ızgaraya bölen, çakışmayan dikdörtgen zone'lar
+    (polygon=True: hücreye yerleşen sekizgenler; coords çevreleyen dikdörtgen)"""
+    width, height = frame_size
+    cols = int(np.ceil(np.sqrt(n_zones * width / height)))
+    rows = int(np.ceil(n_zones / cols))
+    top, bottom = band[0] * height, band[1] * height
+    cell_w, cell_h = width / cols, (bottom - top) / rows
+
+    zones = {}
+    for i in range(n_zones):
+        row, col = divmod(i, cols)
+        x1 = int(col * cell_w + 0.1 * cell_w)
+        y1 = int(top + row * cell_h + 0.1 * cell_h)
+        x2 = int((col + 1) * cell_w - 0.1 * cell_w)
+        y2 = int(top + (row + 1) * cell_h - 0.1 * cell_h)
+        zones[f"zone{i + 1}"] = {"coords": [x1, y1, x2, y2], "count": 0}
+        if polygon:
+            angles = np.linspace(0, 2 * np.pi, 8, endpoint=False) + np.pi / 8
+            cx, cy, rx, ry = (x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2, (y2 - y1) / 2
+            corners = np.stack([cx + rx * np.cos(angles), cy + ry * np.sin(angles)], axis=1).astype(int)
+            zones[f"zone{i + 1}"]["polygon"] = corners.tolist()
+            zones[f"zone{i + 1}"]["coords"] = [*corners.min(axis=0).tolist(), *corners.max(axis=0).tolist()]
+    return zones
+
+
+class SyntheticScene:
+    """Sabit sayıda eşzamanlı nesne; her frame tracker çıktısı üretir.
+
+    - motion: 'conveyor' (soldan sağa akış), 'random_walk' (yön değiştiren
+      hareket, sınırlı ömür) veya 'static' (yerinde titreme)
+    - dropout: bir tespitin o frame'de kaçırılma olasılığı
+    - id_switch: bir track'in frame başına yeni ID alma olasılığı (ID switch)
+    Frame'den çıkan veya ömrü dolan nesnelerin yerine yeni ID'li nesne gelir,
+    böylece ID'ler ByteTrack'teki gibi sürekli artar.
+    """
+
+    def __init__(self, n_tracks=20, frame_size=(1920, 1080), motion='conveyor', fps=25.0,
+                 speed=300.0, dropout=0.02, id_switch=0.001, box_size=40, lifetime=20.0, seed=0):
+        if motion not in MOTIONS:
+            raise ValueError(f"Geçersiz hareket modeli: {motion} (seçenekler: {', '.join(MOTIONS)})")
+        self.rng = np.random.default_rng(seed)
+        self.frame_size = np.asarray(frame_size, dtype=np.float64)
+        self.motion = motion
+        self.fps = fps
+        self.speed = speed
+        self.dropout = dropout
+        self.id_switch = id_switch
+        self.half = box_size / 2
+        self.lifetime = lifetime
+        self.frame_index = 0
+        self.next_id = 1
+
+        self.ids = np.zeros(n_tracks, dtype=np.int64)
+        self.positions = np.zeros((n_tracks, 2))
+        self.velocities = np.zeros((n_tracks, 2))
+        self.expires = np.zeros(n_tracks)
+        self._spawn(np.arange(n_tracks), initial=True)
+
+    @property
+    def timestamp(self):
+        return self.frame_index / self.fps
+
+    def _new_ids(self, count):
+        ids = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        self.next_id += count
+        return ids
+
+    def _spawn(self, rows, initial=False):
+        n = len(rows)
+        if n == 0:
+            return
+        width, height = self.frame_size
+        self.ids[rows] = self._new_ids(n)
+        if self.motion == 'conveyor':
+            # Başlangıçta frame'e yayılır, sonra soldan girer
+            x = self.rng.uniform(0, width, n) if initial else np.zeros(n)
+            self.positions[rows] = np.stack([x, self.rng.uniform(0.3 * height, 0.7 * height, n)], axis=1)
+            self.velocities[rows] = np.stack([self.rng.uniform(0.8, 1.2, n) * self.speed, np.zeros(n)], axis=1)
+        else:
+            self.positions[rows] = self.rng.uniform((0, 0), self.frame_size, size=(n, 2))
+            angle = self.rng.uniform(0, 2 * np.pi, n)
+            speed = self.speed if self.motion == 'random_walk' else 0.0
+            self.velocities[rows] = speed * np.stack([np.cos(angle), np.sin(angle)], axis=1)
+        self.expires[rows] = self.timestamp + self.rng.exponential(self.lifetime, n)
+
+    def step(self):
+        """Bir frame ilerlet ve tracker çıktısını döndür"""
+        dt = 1.0 / self.fps
+        self.frame_index += 1
+
+        if self.motion == 'random_walk':
+            # Yön yavaşça değişir, kenarlardan sekilir
+            self.velocities += self.rng.normal(0, 0.1 * self.speed, self.velocities.shape)
+            norms = np.linalg.norm(self.velocities, axis=1, keepdims=True)
+            self.velocities *= self.speed / np.maximum(norms, 1e-9)
+            out = (self.positions < 0) | (self.positions > self.frame_size)
+            self.velocities[out] *= -1
+        self.positions += self.velocities * dt
+        if self.motion == 'static':
+            self.positions += self.rng.normal(0, 1.0, self.positions.shape)
+
+        # Frame dışına çıkan (konveyör) veya ömrü dolan nesnelerin yerine yenisi
+        if self.motion == 'conveyor':
+            gone = self.positions[:, 0] > self.frame_size[0]
+        else:
+            gone = self.expires <= self.timestamp
+        self._spawn(np.flatnonzero(gone))
+
+        # Tracker ID switch: nesne aynı yerde yeni ID ile devam eder
+        switched = np.flatnonzero(self.rng.random(len(self.ids)) < self.id_switch)
+        self.ids[switched] = self._new_ids(len(switched))
+
+        visible = self.rng.random(len(self.ids)) >= self.dropout
+        centers = self.positions[visible]
+        xyxy = np.concatenate([centers - self.half, centers + self.half], axis=1)
+        n = len(centers)
+        return DetectionBatch.from_columns(
+            xyxy, self.ids[visible], self.rng.uniform(0.5, 1.0, n), np.zeros(n, dtype=np.int32))
+
+    def frames(self, n_frames):
+        """(timestamp, detections) üreteci"""
+        for _ in range(n_frames):
+            detections = self.step()
+            yield self.timestamp, detections
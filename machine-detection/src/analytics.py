@@ -0,0 +1,150 @@
+import time
+import numpy as np
+from zone_counter import ZoneCounter
+from cycle_time_analyzer import CycleTimeAnalyzer
+from zone_engine import ZoneEngine
+from render import ZoneOverlay, draw_cycle_timers, draw_tracks
+from config import Config
+from cycle_log import CycleLogWriter
+from cycle_history import CycleHistoryWriter
+from clips import ClipRecorder
+from events import EventTee
+from track_table import TrackTable
+from metrics import NullMetrics
+
+class ZoneAnalytics:
+    """Bir video akışının zone sayımı, cycle time analizi ve çizimi.
+
+    Model'den bağımsızdır; tek kameralı MachineDetector ve çok kameralı
+    çalıştırıcı her akış için kendi ZoneAnalytics örneğini kullanır.
+    """
+
+    def __init__(self, zones, stats_path='cycle_time_stats.json', log_dir=None, metrics=None,
+                 max_disappeared_time=1.0, max_distance=50, save_interval=1000, events=None,
+                 history_path=None, stream='', clip_dir=None, fps=None):
+        self.zones = zones
+        self.save_interval = save_interval  # Periyodik kayıt aralığı (frame); None ise yalnızca close()
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.stats_path = stats_path
+        # Giriş / çıkış / sayım olayları bus'a gider (EventPublisher); G/Ç arka planda
+        # Olay tetikli klipler: frame'ler halkaya yazılır, olaylar kaydediciye de gider
+        self.clips = None
+        if clip_dir is not None:
+            self.clips = ClipRecorder(clip_dir, zones, fps=fps, stream=stream, metrics=self.metrics)
+            events = EventTee(events, self.clips)
+        self.events = events
+        self.zone_engine = ZoneEngine(zones)
+        # Sayaç ve cycle analizi tek track tablosunu paylaşır; süpürme frame başına bir kez
+        self.track_table = TrackTable(len(zones))
+        self.zone_counter = ZoneCounter(zones, max_disappeared_time=max_disappeared_time,
+                                        max_distance=max_distance, track_table=self.track_table,
+                                        events=events)
+        self.cycle_analyzer = CycleTimeAnalyzer(
+            zones,
+            retained_cycles=Config.RETAINED_CYCLES,
+            window_cycles=Config.STATS_WINDOW_CYCLES,
+            window_seconds=Config.STATS_WINDOW_SECONDS,
+            track_table=self.track_table,
+            events=events
+        )
+        
+        # Çizim: zone katmanı bir kez oluşturulur, cycle süreleri zone köşesine yazılır
+        self.overlay = ZoneOverlay(zones)
+        self._timer_anchors = np.asarray([zones[name]["coords"][:2] for name in self.zone_engine.zone_names],
+                                         dtype=np.int64).reshape(-1, 2)
+        
+        # Append-only cycle kaydı: periyodik kayıt dosyayı baştan yazmaz
+        self.cycle_log = None
+        if log_dir is not None:
+            self.cycle_log = CycleLogWriter(
+                log_dir,
+                max_bytes=Config.CYCLE_LOG_MAX_BYTES,
+                max_age_s=Config.CYCLE_LOG_MAX_AGE
+            )
+            self.cycle_analyzer.attach_log(self.cycle_log)
+        
+        # Kalıcı SQLite geçmişi: cycle'lar periyodik kayıtta özet tablolarıyla birlikte eklenir
+        self.history = None
+        if history_path is not None:
+            self.history = CycleHistoryWriter(history_path, stream=stream)
+            self.cycle_analyzer.attach_history(self.history)
+
+    def draw(self, frame, detections, timestamp=None):
+        """Track kutuları, zone katmanı (önbellekten) ve aktif cycle süreleri"""
+        draw_tracks(frame, detections.xyxy, detections.tracker_id)
+        self.overlay.draw(frame)
+        draw_cycle_timers(frame, self._timer_anchors,
+                          *self.cycle_analyzer.current_cycle_arrays(timestamp))
+    
+    def analyze(self, frame, detections, timestamp=None, render=True):
+        """Zone sayımı, cycle time analizi ve (render ise) çizim"""
+        if self.clips is not None and frame is not None:
+            # Çizimden önce: klipler ham frame'den
+            with self.metrics.stage('clips'):
+                self.clips.add(frame, time.time() if timestamp is None else timestamp)
+        
+        if detections is None:
+            return frame
+        
+        # Zone üyeliği frame başına tek sefer hesaplanır, iki analiz de aynı sonucu okur
+        metrics = self.metrics
+        with metrics.stage('zone_engine'):
+            zone_frame = self.zone_engine.update(detections.xyxy, detections.tracker_id)
+        
+        # Bölge sayımlarını güncelle
+        with metrics.stage('zone_counter'):
+            self.zone_counter.update(detections, zone_frame, timestamp)
+        
+        # Cycle time analizi
+        with metrics.stage('cycle_analyzer'):
+            self.cycle_analyzer.update(detections, zone_frame, timestamp)
+        
+        # Eşiği aşan açık cycle'lar aşıldıkları anda klip tetikler
+        now = time.time() if timestamp is None else timestamp
+        if self.clips is not None:
+            with metrics.stage('clips'):
+                self.clips.check_cycles(*self.cycle_analyzer.current_cycle_arrays(now), now)
+        
+        # Uzun süre görünmeyen track'lerin tüm durumunu tek seferde temizle
+        self.track_table.evict(now, self.zone_counter.max_disappeared_time)
+        
+        # Görselleştirme
+        if render:
+            with metrics.stage('draw'):
+                self.draw(frame, detections, timestamp)
+        
+        # Her save_interval frame'de bir istatistikleri kaydet
+        if hasattr(self, 'frame_count'):
+            self.frame_count += 1
+        else:
+            self.frame_count = 0
+            
+        if self.save_interval and self.frame_count % self.save_interval == 0:
+            self.save()
+        
+        return frame
+    
+    def save(self):
+        """Periyodik kayıt: log varsa yalnızca yeni cycle'lar eklenir"""
+        with self.metrics.stage('save'):
+            lost = self.cycle_analyzer.lost_cycles
+            self.cycle_analyzer.flush_log()
+            if self.cycle_analyzer.lost_cycles > lost:
+                self.metrics.inc('cycles_lost', self.cycle_analyzer.lost_cycles - lost)
+            if self.cycle_log is None:
+                self.cycle_analyzer.save_statistics(self.stats_path)
+    
+    def close(self):
+        """Son kaydı yap ve arka plan yazıcısını kapat"""
+        self.save()
+        if self.cycle_log is not None:
+            self.cycle_log.close()
+        if self.history is not None:
+            self.history.close()
+        if self.clips is not None:
+            self.clips.close()
+            self.clips.print_summary()
+        if self.cycle_analyzer.lost_cycles:
+            print(f"  Kayda gönderilmeden atılan cycle: {self.cycle_analyzer.lost_cycles}")
+        if self.cycle_analyzer.error_count:
+            print(f"  Cycle analizi hataları: {self.cycle_analyzer.error_count}")
@@ -0,0 +1,268 @@
+import importlib
+import os
+import time
+import cv2
+import numpy as np
+from config import Config
+from roi import class_aware_nms
+
+BACKENDS = ('ultralytics', 'onnx', 'openvino')
+
+
+def _import_optional(module, purpose):
+    """İsteğe bağlı paketi içe aktar; yoksa eksik paketi adıyla bildiren ImportError"""
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        missing = (e.name or module).split('.')[0]
+        raise ImportError(f"{purpose} için '{missing}' paketi kurulu değil: pip install {missing} "
+                          f"(requirements.txt'deki isteğe bağlı paketler)", name=missing) from e
+
+
+def _empty_detections():
+    return (np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32),
+            np.zeros(0, dtype=np.float32))
+
+
+def letterbox(image, size):
+    """Oranı koruyarak size x size girişe sığdır (kenarlar 114 gri) -> (giriş, oran, (pad_x, pad_y))"""
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    interpolation = cv2.INTER_AREA if ratio < 1 else cv2.INTER_LINEAR
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(image, (new_w, new_h),
+                                                                 interpolation=interpolation)
+    return canvas, ratio, (pad_x, pad_y)
+
+
+def decode_yolo(output, ratio, pad, image_shape, conf_threshold, iou_threshold):
+    """YOLOv8 çıktısını (4 + sınıf, N) frame koordinatlarında (xyxy, conf, cls)'ye çevir"""
+    predictions = output.T  # (N, 4 + sınıf)
+    scores = predictions[:, 4:]
+    cls = scores.argmax(axis=1)
+    conf = scores[np.arange(len(scores)), cls]
+    keep = conf >= conf_threshold
+    if not keep.any():
+        return _empty_detections()
+
+    boxes, conf, cls = predictions[keep, :4], conf[keep], cls[keep].astype(np.float32)
+    xyxy = np.empty_like(boxes)
+    xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+    xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+
+    keep = class_aware_nms(xyxy, conf, cls, iou_threshold)
+    xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+
+    # Letterbox'ı geri al
+    xyxy -= np.asarray([pad[0], pad[1], pad[0], pad[1]], dtype=xyxy.dtype)
+    xyxy /= ratio
+    height, width = image_shape[:2]
+    xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, width)
+    xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, height)
+    return xyxy.astype(np.float32), conf.astype(np.float32), cls
+
+
+class UltralyticsBackend:
+    """Mevcut PyTorch yolu (GPU varsa CUDA); tam frame'de model.track da kullanılır"""
+
+    name = 'ultralytics'
+
+    def __init__(self, model_path, imgsz=None, threads=None, conf=0.25, iou=0.5):
+        import torch
+        from ultralytics import YOLO
+
+        self._torch = torch
+        if threads:
+            torch.set_num_threads(threads)
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        print(f"Using device: {self.device}")
+        self.model = YOLO(model_path)
+        if self.device == 'cuda':
+            self.model.to(self.device)
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+
+    def _size_args(self, imgsz):
+        imgsz = imgsz or self.imgsz
+        return {} if imgsz is None else {'imgsz': imgsz}
+
+    def track(self, frame, tracker_config):
+        """Tespit + Ultralytics'in kendi tracker'ı (persist=True) -> Results"""
+        with self._torch.no_grad():
+            return self.model.track(
+                frame,
+                conf=self.conf,
+                iou=self.iou,
+                tracker=tracker_config,
+                persist=True,
+                device=self.device,
+                **self._size_args(None)
+            )[0]
+
+    def predict(self, images, imgsz=None):
+        with self._torch.no_grad():
+            results = self.model.predict(images, conf=self.conf, iou=self.iou, device=self.device,
+                                         verbose=False, **self._size_args(imgsz))
+        detections = []
+        for result in results:
+            boxes = result.boxes
+            if len(boxes) == 0:
+                detections.append(_empty_detections())
+                continue
+            detections.append((boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(),
+                               boxes.cls.cpu().numpy()))
+        return detections
+
+
+class OnnxBackend:
+    """Dışa aktarılmış ONNX modeli, ONNX Runtime CPU oturumu"""
+
+    name = 'onnx'
+
+    def __init__(self, model_path, imgsz=640, threads=None, int8=False, conf=0.25, iou=0.5):
+        ort = _import_optional('onnxruntime', "ONNX backend'i")
+
+        if int8:
+            model_path = quantize_onnx(model_path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.device = 'cpu'
+        self.model_path = model_path
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Statik dışa aktarımda giriş boyutu modelden gelir
+        self.imgsz = model_input.shape[2] if isinstance(model_input.shape[2], int) else imgsz
+        self.batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.conf = conf
+        self.iou = iou
+        print(f"ONNX Runtime: {os.path.basename(model_path)}, giriş {self.imgsz}, thread {threads or 'auto'}")
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+    def predict(self, images, imgsz=None):
+        """imgsz statik modellerde yok sayılır (dışa aktarım boyutu kullanılır)"""
+        return _predict_batched(self, images)
+
+
+class OpenVinoBackend:
+    """OpenVINO IR (veya ONNX) modeli, CPU üzerinde gecikme odaklı derleme"""
+
+    name = 'openvino'
+
+    def __init__(self, model_path, imgsz=640, threads=None, conf=0.25, iou=0.5):
+        ov = _import_optional('openvino', "OpenVINO backend'i")
+
+        core = ov.Core()
+        if os.path.isdir(model_path):
+            # `yolo export format=openvino` klasörü
+            model_path = next(os.path.join(model_path, name) for name in sorted(os.listdir(model_path))
+                              if name.endswith('.xml'))
+        config = {'PERFORMANCE_HINT': 'LATENCY'}
+        if threads:
+            config['INFERENCE_NUM_THREADS'] = threads
+        self.compiled = core.compile_model(core.read_model(model_path), 'CPU', config)
+        self.device = 'cpu'
+        self.model_path = model_path
+
+        shape = self.compiled.input(0).get_partial_shape()
+        self.imgsz = shape[2].get_length() if shape[2].is_static else imgsz
+        self.batch = shape[0].get_length() if shape[0].is_static else None
+        self.conf = conf
+        self.iou = iou
+        self._request = self.compiled.create_infer_request()
+        print(f"OpenVINO: {os.path.basename(model_path)}, giriş {self.imgsz}, thread {threads or 'auto'}")
+
+    def _run(self, blob):
+        return self._request.infer({0: blob})[self.compiled.output(0)]
+
+    def predict(self, images, imgsz=None):
+        """imgsz statik modellerde yok sayılır (dışa aktarım boyutu kullanılır)"""
+        return _predict_batched(self, images)
+
+
+def _predict_batched(backend, images):
+    """Letterbox + NCHW float blob; model sabit batch'liyse görüntüler ayrı çalıştırılır"""
+    prepared = [letterbox(image, backend.imgsz) for image in images]
+    blobs = np.stack([canvas[:, :, ::-1].transpose(2, 0, 1) for canvas, _, _ in prepared])
+    blobs = np.ascontiguousarray(blobs, dtype=np.float32) / 255.0
+
+    if backend.batch is None:
+        outputs = backend._run(blobs)
+    else:
+        outputs = np.concatenate([backend._run(blobs[i:i + backend.batch])
+                                  for i in range(0, len(blobs), backend.batch)])
+
+    return [decode_yolo(output, ratio, pad, image.shape, backend.conf, backend.iou)
+            for output, (_, ratio, pad), image in zip(outputs, prepared, images)]
+
+
+def quantize_onnx(model_path):
+    """ONNX modelinin dinamik INT8 kopyasını oluştur (bir kez) ve yolunu döndür"""
+    if model_path.endswith('.int8.onnx'):
+        return model_path
+    int8_path = model_path[:-len('.onnx')] + '.int8.onnx'
+    if not os.path.exists(int8_path):
+        # onnxruntime.quantization onnx paketini de gerektirir
+        quantization = _import_optional('onnxruntime.quantization', "ONNX INT8 niceleme")
+        print(f"INT8 ağırlıklar oluşturuluyor: {int8_path}")
+        quantization.quantize_dynamic(model_path, int8_path, weight_type=quantization.QuantType.QUInt8)
+    return int8_path
+
+
+def export_model(model_path, backend, imgsz=640, int8=False):
+    """PyTorch ağırlıklarını ONNX / OpenVINO'ya dışa aktar (zaten varsa yeniden yapılmaz)"""
+    stem = os.path.splitext(model_path)[0]
+    if backend == 'onnx':
+        exported = stem + '.onnx'
+    else:
+        exported = stem + ('_int8' if int8 else '') + '_openvino_model'
+    if os.path.exists(exported):
+        return exported
+
+    from ultralytics import YOLO
+    print(f"Model dışa aktarılıyor ({backend}, imgsz={imgsz}): {model_path}")
+    path = YOLO(model_path).export(format=backend, imgsz=imgsz, int8=(int8 and backend == 'openvino'))
+    if os.path.abspath(path) != os.path.abspath(exported):
+        os.replace(path, exported)
+    return exported
+
+
+def create_backend(model_path, backend=None):
+    """Config.BACKEND'e göre inference backend'ini oluştur"""
+    backend = backend or Config.BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Bilinmeyen backend: {backend} (seçenekler: {', '.join(BACKENDS)})")
+
+    common = {'conf': Config.CONFIDENCE_THRESHOLD, 'iou': Config.IOU_THRESHOLD}
+    if backend == 'ultralytics':
+        instance = UltralyticsBackend(model_path, Config.BACKEND_IMGSZ, Config.BACKEND_THREADS, **common)
+    else:
+        exported = Config.BACKEND_MODEL_PATH or export_model(
+            model_path, backend, Config.BACKEND_IMGSZ or 640, Config.BACKEND_INT8)
+        if backend == 'onnx':
+            instance = OnnxBackend(exported, Config.BACKEND_IMGSZ or 640, Config.BACKEND_THREADS,
+                                   int8=Config.BACKEND_INT8, **common)
+        else:
+            instance = OpenVinoBackend(exported, Config.BACKEND_IMGSZ or 640, Config.BACKEND_THREADS,
+                                       **common)
+    return instance
+
+
+def warmup(backend, images, imgsz=None, runs=None):
+    """Gerçek giriş şekilleriyle boş geçişler: ilk frame'lerin gecikmesi başlangıca taşınır"""
+    runs = Config.BACKEND_WARMUP if runs is None else runs
+    if not runs or not images:
+        return
+    start = time.perf_counter()
+    for _ in range(runs):
+        backend.predict(images, imgsz)
+    print(f"Warmup ({backend.name}, {runs} geçiş): {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,425 @@
+import argparse
+import contextlib
+import math
+import os
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from config import Config
+from clock import MediaClock
+from cycle_time_analyzer import CycleTimeAnalyzer
+from cycle_history import CycleHistoryWriter
+from reassociation import associate
+from track_table import mask_to_indices
+from zone_engine import load_zones
+
+
+def plan_segments(frame_count, fps, workers, segment_seconds=None, overlap_seconds=10.0):
+    """Videoyu frame aralıklarına böl -> [(ısınma başı, başlangıç, bitiş)].
+
+    [ısınma başı, başlangıç) bir önceki segmentin son frame'leriyle örtüşür:
+    tracker ve analiz durumu burada oturur, track'ler bu frame'lerde eşleştirilir.
+    Son segmentin bitişi None'dır (video sonuna kadar okunur).
+    """
+    overlap = int(round(overlap_seconds * fps))
+    if frame_count <= 0:
+        return [(0, 0, None)], overlap
+    if segment_seconds:
+        length = int(round(segment_seconds * fps))
+    else:
+        length = math.ceil(frame_count / max(workers, 1))
+    # Isınma payı segmentin kendisinden uzun olmamalı
+    length = max(length, 2 * overlap, 1)
+
+    segments = [(max(start - overlap, 0), start, min(start + length, frame_count))
+                for start in range(0, frame_count, length)]
+    warmup_start, start, _ = segments[-1]
+    segments[-1] = (warmup_start, start, None)
+    return segments, overlap
+
+
+def _create_detector(video_path, fps, frame_size):
+    from detect import MachineDetector
+    return MachineDetector(Config.MODEL_PATH, video_path, fps=fps, frame_size=frame_size)
+
+
+def _track_positions(detections):
+    """Eşleştirme için frame'in track merkezleri ve ID'leri"""
+    if detections is None or len(detections.tracker_id) == 0:
+        return np.zeros((0, 2), dtype=np.float32), np.zeros(0, dtype=np.int64)
+    xyxy = np.asarray(detections.xyxy, dtype=np.float32)
+    centers = (xyxy[:, :2] + xyxy[:, 2:]) / 2
+    return centers, np.asarray(detections.tracker_id, dtype=np.int64)
+
+
+def _open_entries(analyzer):
+    """Zone'da olup henüz çıkmamış nesneler -> [(track_id, zone indeksi, giriş zamanı)]"""
+    table = analyzer.track_table
+    entries = []
+    for track_id, slot in table.slot_of.items():
+        for zone_idx in np.flatnonzero(~np.isnan(table.entry_time[slot])).tolist():
+            entries.append((track_id, zone_idx, float(table.entry_time[slot, zone_idx])))
+    return entries
+
+
+def _completed_zones(counter):
+    """Sayımı yapılmış (track_id, zone indeksi) çiftleri; ID devirleriyle taşınan durum dahil"""
+    table = counter.track_table
+    n_zones = len(counter.zone_engine.zone_names)
+    return [(track_id, zone_idx) for track_id, slot in table.slot_of.items()
+            for zone_idx in mask_to_indices(int(table.completed_mask[slot]), n_zones)]
+
+
+@contextlib.contextmanager
+def _config_overrides(**values):
+    """Config değerlerini blok süresince değiştir, çıkışta geri yükle
+    (workers == 1'de segment ana süreçte çalışır, Config kalıcı değişmemeli)"""
+    saved = {name: getattr(Config, name) for name in values}
+    for name, value in values.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+
+def seek_frame(cap, video_path, target):
+    """Videoyu target frame'ine konumla -> (cap, gerçek konum, yöntem).
+
+    CAP_PROP_POS_FRAMES ile atlama birçok codec'te anahtar frame'e göre
+    yaklaşıktır. Atlamadan sonra CAP_PROP_POS_FRAMES ve CAP_PROP_POS_MSEC
+    (son çözülen frame'in zamanı) geri okunur: konum hedefin gerisindeyse
+    ileriye çözülür; hedefi geçtiyse ya da iki değer tutarsızsa video baştan
+    açılıp hedefe kadar çözülür (kesin ama yavaş). Değişken frame hızlı
+    videolarda POS_MSEC frame sayısıyla uyuşmayabilir; bu durumda da yavaş
+    yol kullanılır. Yöntem: 'seek', 'forward' veya 'reopen'.
+    """
+    if target <= 0:
+        return cap, 0, 'seek'
+    cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+    position = int(round(cap.get(cv2.CAP_PROP_POS_FRAMES)))
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    # POS_MSEC, position - 1 numaralı frame'in zamanıdır
+    consistent = not (msec > 0 and fps > 0) or abs(msec * fps / 1000.0 - (position - 1)) <= 1.0
+    if position == target and consistent:
+        return cap, position, 'seek'
+
+    method = 'forward'
+    if position > target or position < 0 or not consistent:
+        cap.release()
+        cap = cv2.VideoCapture(video_path)
+        position, method = 0, 'reopen'
+    while position < target and cap.grab():
+        position += 1
+    return cap, position, method
+
+
+def process_segment(video_path, zones_path, warmup_start, start, end, overlap, origin, threads=None):
+    """Bir segmenti kendi detector / tracker / analiz örneğiyle işle (işçi süreçte çalışır)"""
+    # Segmentler dosya yazmaz; tüm cycle'lar birleştirme için bellekte kalır
+    overrides = {
+        'ZONES_PATH': zones_path,
+        'CYCLE_LOG_DIR': None,
+        'RETAINED_CYCLES': None,
+        'BACKEND_THREADS': Config.BACKEND_THREADS if Config.BACKEND_THREADS is not None else threads,
+    }
+    cv_threads = cv2.getNumThreads()
+    if threads:
+        cv2.setNumThreads(threads)
+    try:
+        with _config_overrides(**overrides):
+            return _process_segment(video_path, warmup_start, start, end, overlap, origin)
+    finally:
+        cv2.setNumThreads(cv_threads)
+
+
+def _process_segment(video_path, warmup_start, start, end, overlap, origin):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    # Frame index'leri (örtüşme eşleştirmesi, start) gerçek konumdan sayılır
+    # (hedefe ulaşılamadıysa video tahmin edilenden kısadır; okuma hemen biter)
+    cap, _, seek = seek_frame(cap, video_path, warmup_start)
+    # Tüm segmentler aynı başlangıç anına göre damgalanır
+    clock = MediaClock(fps, origin)
+
+    result = {'warmup_start': warmup_start, 'start': start, 'seek': seek, 'first_time': None,
+              'start_time': None, 'end_time': None, 'frames': 0, 'head': [], 'tail': deque(maxlen=overlap)}
+    run_start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        detector = _create_detector(video_path, fps, frame_size)
+        analytics = detector.analytics
+        analytics.save_interval = None
+        # Sayımlar track ID'leriyle toplanır; birleştirmede global ID'ye göre tekilleşir
+        completions = []
+        analytics.zone_counter.on_count = lambda *event: completions.append(event)
+
+        frame_index = warmup_start
+        while end is None or frame_index < end:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timestamp = clock.stamp(frame_index, cap.get(cv2.CAP_PROP_POS_MSEC))
+            detections = detector.detect(frame)
+            detector.analyze(frame, detections, timestamp, render=False)
+
+            if result['first_time'] is None:
+                result['first_time'] = timestamp
+            if frame_index == start:
+                result['start_time'] = timestamp
+            positions = (frame_index, *_track_positions(detections))
+            if frame_index < start:
+                result['head'].append(positions)
+            result['tail'].append(positions)
+            result['end_time'] = timestamp
+            frame_index += 1
+    cap.release()
+
+    result.update({
+        'frames': frame_index - warmup_start,
+        'elapsed_s': time.perf_counter() - run_start,
+        'tail': list(result['tail']),
+        'cycles': analytics.cycle_analyzer.cycle_store.view().copy(),
+        'open_entries': _open_entries(analytics.cycle_analyzer),
+        'completions': completions,
+        'completed': _completed_zones(analytics.zone_counter),
+    })
+    return result
+
+
+def _segment_job(job):
+    try:
+        return process_segment(**job)
+    except Exception as e:
+        return {**job, 'error': f"{str(e)}\n{traceback.format_exc()}"}
+
+
+def match_tracks(tail, head, max_distance=50):
+    """Örtüşme frame'lerinde iki segmentin track'lerini eşleştir -> {yeni ID: önceki ID}.
+
+    Her frame'de merkezler ZoneCounter'ın yeniden ilişkilendirmesiyle eşlenir;
+    en çok frame'de eşleşen çiftler birebir seçilir.
+    """
+    previous = {frame_index: (centers, ids) for frame_index, centers, ids in tail}
+    votes = {}
+    for frame_index, centers, ids in head:
+        if frame_index not in previous or len(ids) == 0:
+            continue
+        previous_centers, previous_ids = previous[frame_index]
+        if len(previous_ids) == 0:
+            continue
+        rows, cols = associate(centers, previous_centers, max_distance)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            pair = (int(ids[row]), int(previous_ids[col]))
+            votes[pair] = votes.get(pair, 0) + 1
+
+    mapping, used = {}, set()
+    for (new_id, old_id), _ in sorted(votes.items(), key=lambda item: -item[1]):
+        if new_id not in mapping and old_id not in used:
+            mapping[new_id] = old_id
+            used.add(old_id)
+    return mapping
+
+
+def merge_segments(results, zones, max_distance=50):
+    """Segment sonuçlarını tek rapora birleştir -> (CycleTimeAnalyzer, sayımlar).
+
+    - Her cycle, çıkış zamanı kendi aralığına düşen segmentten alınır
+      (örtüşmedeki tekrarlar böylece elenir).
+    - Segment başında zaten zone'da olan nesnelerin giriş zamanı, örtüşmede
+      eşleşen track üzerinden önceki segmentin açık girişinden düzeltilir.
+    - Track ID'leri segmentler boyunca tek ID uzayına taşınır; sayımda her
+      global track bir zone için bir kez sayılır (seri ZoneCounter gibi).
+    - İstatistikler cycle'lar çıkış sırasıyla yeniden eklenerek kurulur
+      (seri çalıştırmayla aynı özetler ve pencereler).
+    """
+    analyzer = CycleTimeAnalyzer(
+        zones,
+        retained_cycles=Config.RETAINED_CYCLES,
+        window_cycles=Config.STATS_WINDOW_CYCLES,
+        window_seconds=Config.STATS_WINDOW_SECONDS
+    )
+    zone_names = analyzer.zone_engine.zone_names
+    counts = {zone: 0 for zone in zone_names}
+    counted = set()  # (global ID, zone) - sayılmış track'ler
+
+    merged = []
+    previous = None
+    previous_open = {}    # (global ID, zone) -> düzeltilmiş giriş zamanı
+    previous_global = {}  # Önceki segmentin {yerel ID: global ID}
+    next_global = 0
+
+    for result in results:
+        if result['start_time'] is None:
+            continue  # Video tahmin edilenden kısa: segment kendi aralığına ulaşmadı
+        mapping = match_tracks(previous['tail'], result['head'], max_distance) if previous else {}
+        global_ids = {}
+
+        def global_id(track_id):
+            nonlocal next_global
+            if track_id not in global_ids:
+                if previous is None:
+                    global_ids[track_id] = track_id
+                elif track_id in mapping and mapping[track_id] in previous_global:
+                    global_ids[track_id] = previous_global[mapping[track_id]]
+                else:
+                    global_ids[track_id] = next_global
+                next_global = max(next_global, global_ids[track_id] + 1)
+            return global_ids[track_id]
+
+        def entry_time(track_id, zone_idx, entered_at):
+            # Isınma bölgesindeki giriş: nesne zaten içerideydi ya da önceki segment de
+            # girişi gördü; doğru zaman önceki segmentin açık girişidir
+            if previous is not None and entered_at < result['start_time']:
+                return previous_open.get((global_id(track_id), zone_idx), entered_at)
+            return entered_at
+
+        # Segment ID'leri görüldükleri sırayla global uzaya taşınır
+        for _, _, ids in result['head'] + result['tail']:
+            for track_id in ids.tolist():
+                global_id(track_id)
+
+        cycles = result['cycles']
+        if previous is not None:
+            cycles = cycles[cycles['exit_time'] >= result['start_time']]
+        for track_id, zone_idx, entered_at, exited_at, _ in cycles.tolist():
+            entered_at = entry_time(track_id, zone_idx, entered_at)
+            merged.append((global_id(track_id), zone_idx, entered_at, exited_at))
+
+        open_entries = {}
+        for track_id, zone_idx, entered_at in result['open_entries']:
+            open_entries[(global_id(track_id), zone_idx)] = entry_time(track_id, zone_idx, entered_at)
+
+        for track_id, zone_name, timestamp in result['completions']:
+            key = (global_id(track_id), zone_name)
+            # Isınma bölgesindeki sayımlar önceki segmentindir
+            if previous is not None and timestamp < result['start_time']:
+                counted.add(key)
+            elif key not in counted:
+                counted.add(key)
+                counts[zone_name] += 1
+        # Segment sonunda sayılmış durumdaki track'ler (kayıp track'ten devralınanlar dahil)
+        counted.update((global_id(track_id), zone_names[zone_idx])
+                       for track_id, zone_idx in result['completed'])
+        previous, previous_open, previous_global = result, open_entries, global_ids
+
+    # Cycle'lar çıkış sırasıyla eklenir (kayan pencereler seri çalıştırmadaki gibi)
+    merged.sort(key=lambda cycle: cycle[3])
+    for track_id, zone_idx, entered_at, exited_at in merged:
+        zone_name = zone_names[zone_idx]
+        analyzer.cycle_stats[zone_name].add(exited_at - entered_at, exited_at)
+        analyzer.cycle_store.append(track_id, zone_name, entered_at, exited_at)
+
+    # Son segmentin açık girişleri: video sonunda zone'da olan nesneler
+    table = analyzer.track_table
+    for (track_id, zone_idx), entered_at in previous_open.items():
+        table.entry_time[table.slots([track_id])[0], zone_idx] = entered_at
+    if previous is not None:
+        analyzer._last_time = previous['end_time']
+    return analyzer, counts
+
+
+def run_batch(video_path, zones_path, workers=None, segment_seconds=None, overlap_seconds=10.0,
+              max_distance=50):
+    """Videoyu segmentlere bölüp paralel işle ve sonuçları birleştir"""
+    workers = workers or os.cpu_count()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+
+    segments, overlap = plan_segments(frame_count, fps, workers, segment_seconds, overlap_seconds)
+    workers = max(1, min(workers, len(segments)))
+    # Çekirdekler süreçler arasında paylaştırılır (aşırı thread oluşmasın)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    origin = time.time()
+    jobs = [{'video_path': video_path, 'zones_path': zones_path, 'warmup_start': warmup_start,
+             'start': start, 'end': end, 'overlap': overlap, 'origin': origin, 'threads': threads}
+            for warmup_start, start, end in segments]
+    print(f"{frame_count} frame, {len(segments)} segment, {workers} süreç, "
+          f"örtüşme {overlap} frame ({overlap_seconds:g} s)")
+
+    if workers == 1:
+        results = [_segment_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_segment_job, jobs))
+
+    failed = [result for result in results if 'error' in result]
+    if failed:
+        for result in failed:
+            print(f"Segment {result['start']} hata: {result['error']}")
+        raise RuntimeError(f"{len(failed)} segment işlenemedi")
+
+    zones = load_zones(zones_path, video_path, frame_size=frame_size)
+    analyzer, counts = merge_segments(results, zones, max_distance)
+    return analyzer, counts, results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Uzun kayıtları segmentlere bölüp tüm çekirdeklerde işle")
+    parser.add_argument('--video', default=Config.VIDEO_PATH)
+    parser.add_argument('--zones', default=Config.ZONES_PATH)
+    parser.add_argument('--workers', type=int, default=Config.BATCH_WORKERS,
+                        help="Paralel süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument('--segment-minutes', type=float, default=None,
+                        help="Segment uzunluğu (varsayılan: video / süreç sayısı)")
+    parser.add_argument('--overlap', type=float, default=Config.BATCH_OVERLAP_SECONDS,
+                        help="Segmentler arası örtüşme (saniye)")
+    parser.add_argument('--max-distance', type=float, default=50,
+                        help="Örtüşmede track eşleştirme mesafesi (piksel)")
+    parser.add_argument('--output', default='cycle_time_stats.json', help="Birleşik istatistik dosyası")
+    parser.add_argument('--export', default=None, help="Tüm cycle'ları .csv veya .npz olarak dışa aktar")
+    parser.add_argument('--history', default=None, metavar='DB',
+                        help="Birleşik cycle'ları kalıcı geçmişe ekle (ör. cycle_history.db)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    segment_seconds = args.segment_minutes * 60 if args.segment_minutes else Config.BATCH_SEGMENT_SECONDS
+
+    start = time.perf_counter()
+    try:
+        analyzer, counts, results = run_batch(args.video, args.zones, args.workers, segment_seconds,
+                                              args.overlap, args.max_distance)
+    except Exception as e:
+        print(f"Bir hata oluştu: {str(e)}")
+        print(traceback.format_exc())
+        return
+    elapsed = time.perf_counter() - start
+
+    analyzer.save_statistics(args.output)
+    if args.export:
+        analyzer.export_cycles(args.export)
+    if args.history:
+        history = CycleHistoryWriter(args.history)
+        history.append(analyzer.cycle_store.to_records())
+        history.close()
+
+    frames = sum(result['frames'] for result in results)
+    reopened = sum(result['seek'] == 'reopen' for result in results)
+    if reopened:
+        print(f"Uyarı: {reopened} segmentte frame'e atlama kesin değildi; video baştan çözüldü")
+    warmup_frames = sum(result['start'] - result['warmup_start'] for result in results)
+    print(f"\n{frames} frame ({warmup_frames} örtüşme), {elapsed:.1f} s, "
+          f"{(frames - warmup_frames) / max(elapsed, 1e-9):.1f} fps")
+    statistics = analyzer.get_zone_statistics()
+    for zone, count in counts.items():
+        print(f"  {zone}: sayım {count}, cycle {statistics[zone]['total_objects']}, "
+              f"ort {statistics[zone]['avg_time']:.2f} s")
+    print(f"İstatistikler: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
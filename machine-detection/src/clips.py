@@ -0,0 +1,270 @@
+import math
+import os
+import queue
+import re
+import threading
+import time
+import traceback
+from datetime import datetime
+import cv2
+import numpy as np
+from config import Config
+from events import ZONE_ENTER
+from zone_engine import zone_polygon
+
+
+class FrameRing:
+    """Son frame'ler için sabit boyutlu halka: bellek bir kez ayrılır, slotlar yeniden yazılır.
+
+    Yazan (frame döngüsü) hiç beklemez. Okuyan (encoder) bir frame'i sıra
+    numarasıyla ister; slotun sıra numarası kopyadan önce ve sonra kontrol
+    edilir, okuma sırasında üzerine yazılan frame geçersiz sayılır.
+    """
+
+    def __init__(self, capacity, shape):
+        self.capacity = capacity
+        self.frames = np.empty((capacity, *shape), dtype=np.uint8)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.seq = np.full(capacity, -1, dtype=np.int64)  # Slottaki frame'in sıra numarası (-1: geçersiz)
+        self.next_seq = 0
+
+    @property
+    def nbytes(self):
+        return self.frames.nbytes
+
+    def push(self, frame, timestamp):
+        slot = self.next_seq % self.capacity
+        self.seq[slot] = -1  # Yazım sürüyor
+        target = self.frames[slot]
+        if frame.shape == target.shape:
+            np.copyto(target, frame)
+        else:
+            cv2.resize(frame, (target.shape[1], target.shape[0]), dst=target, interpolation=cv2.INTER_AREA)
+        self.timestamps[slot] = timestamp
+        self.seq[slot] = self.next_seq
+        self.next_seq += 1
+
+    def first_after(self, timestamp):
+        """Halkadaki, zaman damgası timestamp'ten küçük olmayan ilk frame'in sıra numarası"""
+        oldest = max(self.next_seq - self.capacity, 0)
+        for seq in range(oldest, self.next_seq):
+            slot = seq % self.capacity
+            if self.seq[slot] == seq and self.timestamps[slot] >= timestamp:
+                return seq
+        return self.next_seq
+
+    def read(self, seq, out):
+        """Frame'i out'a kopyala ve zaman damgasını döndür; üzerine yazıldıysa None"""
+        slot = seq % self.capacity
+        if self.seq[slot] != seq:
+            return None
+        np.copyto(out, self.frames[slot])
+        timestamp = float(self.timestamps[slot])
+        return timestamp if self.seq[slot] == seq else None
+
+
+class ClipJob:
+    """Kaydedilecek aralık; bitmeden gelen tetikler end'i uzatır"""
+
+    __slots__ = ('start', 'end', 'limit', 'reasons', 'trigger_time', 'done')
+
+    def __init__(self, start, end, limit, reason, trigger_time):
+        self.start = start
+        self.end = end
+        self.limit = limit  # start + en uzun klip süresi
+        self.reasons = [reason]
+        self.trigger_time = trigger_time
+        self.done = False  # Encoder son frame'i geçti; artık uzatılamaz
+
+
+class ClipRecorder:
+    """Zone olaylarında ön / son kayıtlı kısa klipler.
+
+    Frame'ler clip_fps hızında, scale ile küçültülerek sabit boyutlu halkaya
+    (FrameRing) yazılır; bellek max_bytes ile sınırlıdır ve bir kez ayrılır.
+    Tetik anındaki klip [t - pre_roll, t + post_roll] aralığıdır. Tetikler:
+    zone'a giriş (emit) ve açık bir cycle'ın geçen süresinin zone eşiğini ilk
+    aştığı an (check_cycles, her frame; track ve zone başına bir kez); klip bitmeden gelen tetikler aynı klibi uzatır.
+    Klipler arka plan thread'inde halkadan okunup kodlanır; frame döngüsü
+    encoder'ı beklemez. Encoder geride kalıp üzerine yazılan frame'ler klipten
+    düşer ve sayılır. Olay hedefi olarak EventPublisher ile aynı emit() arayüzünü
+    kullanır (EventTee ile analizöre bağlanır).
+    """
+
+    def __init__(self, output_dir, zones, fps=None, stream='', metrics=None):
+        self.output_dir = output_dir
+        self.zones = zones
+        self.stream = stream
+        self.metrics = metrics
+        self.pre_roll = Config.CLIP_PRE_ROLL
+        self.post_roll = Config.CLIP_POST_ROLL
+        self.max_seconds = Config.CLIP_MAX_SECONDS
+        self.scale = Config.CLIP_SCALE
+        self.fps = min(Config.CLIP_FPS, fps) if fps else Config.CLIP_FPS
+        self.max_bytes = int(Config.CLIP_MAX_MEMORY_MB * 1024 * 1024)
+        self.enter_zones = set(Config.CLIP_ENTER_ZONES)
+        self.cycle_thresholds = dict(Config.CLIP_CYCLE_THRESHOLDS)  # '*': tüm zone'lar için varsayılan
+        # Zone indeksine göre eşikler (ZoneEngine sırası); eşiksiz zone: inf
+        self.zone_names = list(zones.keys())
+        default = self.cycle_thresholds.get('*')
+        thresholds = [self.cycle_thresholds.get(name, default) for name in self.zone_names]
+        self._thresholds = (np.asarray([math.inf if t is None else t for t in thresholds], dtype=np.float64)
+                            if any(t is not None for t in thresholds) else None)
+        self._fired = set()  # Eşiği aşıp klip tetiklemiş açık cycle'lar: (track_id, zone indeksi)
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.ring = None  # İlk frame'de (boyut belli olunca) ayrılır
+        self._interval = 1.0 / self.fps
+        self._next_store = -math.inf
+        self._job = None  # Son tetiklenen, henüz bitmemiş klip
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()  # Klibin uzatılması ile encoder'ın bitirmesi arasında
+        self._closed = threading.Event()
+
+        self.triggers = 0
+        self.dropped_triggers = 0  # Bekleyen klip sınırı aşıldı
+        self.dropped_frames = 0    # Encoder yetişemeden üzerine yazılan frame
+        self.clips = []            # Yazılan klip dosyaları
+        self._thread = threading.Thread(target=self._run, name='clip-encoder', daemon=True)
+        self._thread.start()
+
+    def _allocate(self, frame):
+        height, width = frame.shape[:2]
+        shape = (max(int(round(height * self.scale)), 2) // 2 * 2,
+                 max(int(round(width * self.scale)), 2) // 2 * 2, 3)
+        frame_bytes = shape[0] * shape[1] * 3
+        # Ön + son kayıt ve encoder'ın geride kalabileceği 2 saniye
+        wanted = math.ceil((self.pre_roll + self.post_roll + 2) * self.fps)
+        capacity = max(min(wanted, self.max_bytes // frame_bytes), 2)
+        self.ring = FrameRing(capacity, shape)
+        if capacity < wanted:
+            print(f"Klip halkası bellek sınırında: {capacity} frame ({capacity / self.fps:.1f} s), "
+                  f"ön + son kayıt {self.pre_roll + self.post_roll:g} s istendi")
+        print(f"Klip halkası: {capacity} frame, {shape[1]}x{shape[0]}, {self.ring.nbytes / 1e6:.0f} MB")
+        if self.metrics is not None:
+            self.metrics.set_gauge('clip_ring_bytes', self.ring.nbytes)
+
+    def add(self, frame, timestamp):
+        """Frame'i halkaya yaz (clip_fps hızında örneklenir)"""
+        if timestamp + 1e-6 < self._next_store:
+            return
+        self._next_store = max(self._next_store + self._interval, timestamp - self._interval)
+        if self.ring is None:
+            self._allocate(frame)
+        self.ring.push(frame, timestamp)
+
+    def emit(self, type, timestamp, track_id, zone=None, **fields):
+        """Olay hedefi: CLIP_ENTER_ZONES'a giriş klip tetikler"""
+        if type == ZONE_ENTER and zone in self.enter_zones:
+            self.trigger(timestamp, f"{zone} giris ID {track_id}")
+
+    def check_cycles(self, track_ids, zone_indices, elapsed, timestamp):
+        """Açık cycle'lar (CycleTimeAnalyzer.current_cycle_arrays): geçen süre zone
+        eşiğini ilk aştığında, aşma anında klip tetiklenir (cycle başına bir kez)"""
+        if self._thresholds is None:
+            return
+        if self._fired:
+            # Biten cycle'lar unutulur; aynı track zone'a yeniden girerse yeniden tetikler
+            self._fired.intersection_update(zip(track_ids.tolist(), zone_indices.tolist()))
+        excess = elapsed - self._thresholds[zone_indices]
+        for i in np.flatnonzero(excess > 0).tolist():
+            key = (int(track_ids[i]), int(zone_indices[i]))
+            if key in self._fired:
+                continue
+            self._fired.add(key)
+            threshold = self._thresholds[key[1]]
+            self.trigger(timestamp - float(excess[i]),
+                         f"{self.zone_names[key[1]]} cycle {threshold:g}s asildi ID {key[0]}")
+
+    def trigger(self, timestamp, reason):
+        """[timestamp - pre_roll, timestamp + post_roll] aralığını kaydet"""
+        self.triggers += 1
+        job = self._job
+        end = timestamp + self.post_roll
+        if job is not None and timestamp - self.pre_roll <= job.end and end <= job.limit:
+            with self._lock:
+                if not job.done:
+                    job.end = max(job.end, end)
+                    job.reasons.append(reason)
+                    return
+        if self._jobs.qsize() >= Config.CLIP_MAX_PENDING:
+            self.dropped_triggers += 1
+            return
+        start = timestamp - self.pre_roll
+        self._job = ClipJob(start, end, start + self.max_seconds, reason, timestamp)
+        self._jobs.put(self._job)
+
+    def _clip_path(self, job):
+        stamp = datetime.fromtimestamp(job.trigger_time).strftime('%Y%m%d_%H%M%S')
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', job.reasons[0]).strip('_')
+        prefix = f'{self.stream}_' if self.stream else ''
+        path = os.path.join(self.output_dir, f'{prefix}{stamp}_{slug}.mp4')
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.output_dir, f'{prefix}{stamp}_{slug}_{suffix}.mp4')
+            suffix += 1
+        return path
+
+    def _annotate(self, image, job, timestamp):
+        """Zone çerçeveleri ve klip nedeni (yalnızca kodlanan frame'lere, encoder thread'inde)"""
+        for zone_info in self.zones.values():
+            polygon = np.round(zone_polygon(zone_info) * self.scale).astype(np.int32)
+            cv2.polylines(image, [polygon], True, (0, 0, 255), 1)
+        cv2.putText(image, f"{datetime.fromtimestamp(timestamp).strftime('%H:%M:%S.%f')[:-3]}  "
+                    f"{', '.join(job.reasons[:3])}", (8, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+
+    def _encode(self, job):
+        ring = self.ring
+        seq = ring.first_after(job.start)
+        image = np.empty_like(ring.frames[0])
+        writer = None
+        path = self._clip_path(job)
+        try:
+            while True:
+                # Son frame henüz gelmediyse bekle (video bittiyse close ile çıkılır)
+                while seq >= ring.next_seq and not self._closed.is_set():
+                    time.sleep(0.02)
+                if seq >= ring.next_seq:
+                    break
+                timestamp = ring.read(seq, image)
+                seq += 1
+                if timestamp is None:
+                    self.dropped_frames += 1
+                    continue
+                with self._lock:
+                    job.done = timestamp > job.end
+                if job.done:
+                    break
+                if writer is None:
+                    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*Config.CLIP_CODEC), self.fps,
+                                             (image.shape[1], image.shape[0]))
+                self._annotate(image, job, timestamp)
+                writer.write(image)
+        finally:
+            if writer is not None:
+                writer.release()
+                self.clips.append(path)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            try:
+                if self.ring is not None:
+                    self._encode(job)
+            except Exception as e:
+                print(f"Klip kaydedilirken hata: {str(e)}")
+                print(traceback.format_exc())
+            job.done = True
+
+    def close(self):
+        """Bekleyen klipleri eldeki frame'lerle bitir ve encoder'ı kapat"""
+        self._closed.set()
+        self._jobs.put(None)
+        self._thread.join()
+
+    def print_summary(self):
+        memory = f"{self.ring.nbytes / 1e6:.0f} MB halka" if self.ring is not None else "halka ayrılmadı"
+        print(f"  Klipler: {len(self.clips)} klip, {self.triggers} tetik ({self.dropped_triggers} atıldı), "
+              f"{self.dropped_frames} frame encoder'a yetişmedi, {memory}")
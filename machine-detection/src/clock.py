@@ -0,0 +1,84 @@
+import time
+import cv2
+
+
+class SystemClock:
+    """Olayları duvar saatiyle (time.time) damgalar - canlı kamera için"""
+
+    def stamp(self, frame_index, pos_msec=None):
+        return time.time()
+
+
+class MediaClock:
+    """Olayları frame'in medya zaman damgasıyla damgalar.
+
+    Kayıtlı video gerçek zamandan hızlı ya da yavaş işlense de cycle süreleri
+    videodaki gerçek süreye göre hesaplanır. Zaman damgası origin + medya
+    ofseti olarak döner, böylece kaydedilen tarihler okunabilir kalır.
+    """
+
+    def __init__(self, fps, origin=None):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.origin = time.time() if origin is None else origin
+        self._last = None
+
+    @classmethod
+    def from_capture(cls, cap, origin=None):
+        return cls(cap.get(cv2.CAP_PROP_FPS), origin)
+
+    def stamp(self, frame_index, pos_msec=None):
+        # CAP_PROP_POS_MSEC varsa onu kullan, yoksa frame index / fps
+        if pos_msec is not None and pos_msec > 0:
+            offset = pos_msec / 1000.0
+        else:
+            offset = frame_index / self.fps
+        timestamp = self.origin + offset
+
+        # Bazı container'larda pts geri gidebilir, zaman monoton kalmalı
+        if self._last is not None and timestamp < self._last:
+            timestamp = self._last
+        self._last = timestamp
+        return timestamp
+
+
+class FrameGapCounter:
+    """Kaynağın ardışık okumalar arasında atladığı frame'leri sayar.
+
+    Canlı kaynakta okuma gecikirse (ör. dolu kuyrukta bekleyen capture thread'i)
+    cihaz frame'leri sessizce atar. Atlama CAP_PROP_POS_FRAMES farkından ve
+    medya zamanı 1.5 frame süresinden fazla ilerlediyse zaman farkından bulunur;
+    ikisinden büyük olanı sayılır. Konum bilgisi vermeyen kaynakta (0) sayılmaz.
+    """
+
+    def __init__(self, fps):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.dropped = 0
+        self._last_pos = None
+        self._last_msec = None
+
+    def update(self, cap):
+        """Son okumanın konumunu al; önceki okumadan beri atlanan frame sayısını döndür"""
+        pos = cap.get(cv2.CAP_PROP_POS_FRAMES)
+        msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+        gap = 0
+        if self._last_pos is not None and pos > 0 and self._last_pos > 0:
+            gap = int(round(pos - self._last_pos)) - 1
+        if self._last_msec is not None and msec > 0 and self._last_msec > 0:
+            frames = (msec - self._last_msec) * self.fps / 1000.0
+            if frames > 1.5:
+                gap = max(gap, int(round(frames)) - 1)
+        self._last_pos, self._last_msec = pos, msec
+        gap = max(gap, 0)
+        self.dropped += gap
+        return gap
+
+
+def create_clock(mode, cap=None, origin=None):
+    """Config.CLOCK değerine göre saat oluştur ('media' veya 'system')"""
+    if mode == 'media':
+        if cap is None:
+            raise ValueError("Media clock için video kaynağı gerekli")
+        return MediaClock.from_capture(cap, origin)
+    if mode == 'system':
+        return SystemClock()
+    raise ValueError(f"Bilinmeyen clock tipi: {mode}")
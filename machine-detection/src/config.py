@@ -9,4 +9,128 @@ class Config:
     
     # Tracking parametreleri
     CONFIDENCE_THRESHOLD = 0.25
-    IOU_THRESHOLD = 0.5
\ No newline at end of file
+    IOU_THRESHOLD = 0.5
+    
+    # Zaman kaynağı: 'media' (videonun zaman damgası) veya 'system' (duvar saati)
+    # Kayıtlı videolar 'media' ile gerçek zamandan hızlı analiz edilebilir
+    CLOCK = 'media'
+    
+    # Headless mod: çizim ve pencere gösterimi yapılmaz, yalnızca analiz çıktısı üretilir
+    # Komut satırından --headless ile de açılabilir
+    HEADLESS = False
+    
+    # Decode / inference / analiz aşamalarını ayrı thread'lerde çalıştır
+    # Komut satırından --serial ile tek thread'li döngüye dönülebilir
+    PIPELINE = True
+    PIPELINE_QUEUE_SIZE = 4  # Aşamalar arası kuyruk kapasitesi (frame)
+    
+    # Operatör ekranı ayrı thread'de, saniyede en fazla DISPLAY_FPS kez güncellenir;
+    # gösterilmeyecek frame'ler çizilmez, analiz ekranı beklemez
+    DISPLAY_FPS = 15
+    DISPLAY_SCALE = 1.0  # Önizleme ölçeği (ör. 0.5: yarı çözünürlük)
+    
+    # Çok kameralı çalıştırma (src/multi_stream.py) için akışlar
+    # Örnek: {"name": "cam1", "video_path": "...", "zones_path": "..."}
+    STREAMS = []
+    
+    # Inference stride: detector her N frame'de bir çalışır, aradaki frame'lerde
+    # kutular track hızından tahmin edilir (zone/cycle analizi her frame çalışır)
+    INFERENCE_STRIDE = 1
+    ADAPTIVE_STRIDE = False  # Stride'ı track hızına göre otomatik seç
+    # Cycle time hata sınırı (saniye); stride en fazla 1 + tolerans * fps / 2 olabilir
+    STRIDE_CYCLE_TOLERANCE = 0.2
+    # Tahmin edilen kutunun son inference'tan en fazla kayabileceği mesafe (piksel);
+    # adaptif stride da en hızlı track'in bu kadar ilerleyeceği şekilde seçilir
+    STRIDE_MAX_DISPLACEMENT = 8.0
+    
+    # Hareket kapısı: zone'larda hareket yoksa detector çalıştırılmaz
+    MOTION_GATE = False
+    MOTION_GATE_SCALE = 0.25         # Fark alınmadan önce küçültme oranı
+    MOTION_GATE_THRESHOLD = 25       # Piksel değişim eşiği (gri ton)
+    MOTION_GATE_MIN_AREA = 0.002     # Hareket sayılması için değişen piksel oranı
+    MOTION_GATE_HOLD_FRAMES = 30     # Hareket bittikten sonra detector'ın çalışmaya devam ettiği frame
+    
+    # Inference bölgesi: 'full' (tam frame), 'union' (zone'ların birleşimi),
+    # 'zones' (her zone ayrı kırpıntı, tek batch). Kırpıntılar doğal çözünürlükte işlenir
+    INFERENCE_MODE = 'full'
+    ROI_MARGIN = 32          # Kırpıntılara eklenen kenar payı (piksel)
+    ROI_MAX_IMGSZ = 1280     # Kırpıntı model giriş boyutu üst sınırı
+    
+    # Append-only cycle kaydı (JSON Lines segmentleri + özet dosyası)
+    # None ise eski davranış: tüm istatistikler cycle_time_stats.json'a yeniden yazılır
+    CYCLE_LOG_DIR = 'cycle_logs'
+    CYCLE_LOG_MAX_BYTES = 64 * 1024 * 1024  # Segment döndürme boyutu
+    CYCLE_LOG_MAX_AGE = 3600                # Segment döndürme süresi (saniye)
+    
+    # Kalıcı cycle geçmişi (SQLite, WAL): cycle'lar ve dakika / saat / vardiya özetleri
+    # src/cycle_history.py ile zaman aralığı sorguları yapılır. Varsayılan kapalı (None):
+    # satırlarda çalıştırma / video kimliği yok, aynı video tekrar işlenirse cycle'lar
+    # iki kez eklenir. Komut satırından --history DB ile de açılabilir
+    HISTORY_DB_PATH = None
+    HISTORY_SHIFT_HOURS = (6, 14, 22)  # Vardiya başlangıç saatleri (yerel saat)
+    
+    # Zone olayları (giriş, çıkış, sayım, track yeniden eşleşmesi) frame döngüsünü
+    # beklemeyen kuyruktan arka planda sink'lere yazılır: 'console', 'jsonl', 'sqlite',
+    # 'socket' (yerel Unix soketi, JSON Lines). Boş liste: olay üretilmez
+    EVENT_SINKS = ['console']
+    EVENT_JSONL_PATH = 'events.jsonl'
+    EVENT_SQLITE_PATH = 'events.db'
+    EVENT_SOCKET_PATH = '/tmp/machine-detection-events.sock'
+    EVENT_QUEUE_SIZE = 10000           # Kuyruk kapasitesi (olay)
+    # Kuyruk doluyken: 'drop_oldest', 'drop_newest' veya 'block' (en fazla EVENT_BLOCK_TIMEOUT bekler)
+    EVENT_DROP_POLICY = 'drop_oldest'
+    EVENT_BLOCK_TIMEOUT = 0.05         # saniye
+    EVENT_BATCH_SIZE = 500             # Sink'e tek seferde yazılan olay
+    EVENT_FLUSH_INTERVAL = 0.2         # Kuyruğun boşaltılma aralığı (saniye)
+    
+    # Olay tetikli klipler: son birkaç saniye küçültülmüş ve seyreltilmiş olarak sabit
+    # boyutlu halkada tutulur; tetikte ön / son kayıtlı klip arka planda kodlanır
+    # Komut satırından --clips DIR ile de açılabilir
+    CLIPS = False
+    CLIP_DIR = 'clips'
+    CLIP_ENTER_ZONES = []           # Bu zone'lara girişte klip (ör. ['zone1'])
+    CLIP_CYCLE_THRESHOLDS = {}      # Cycle bu süreyi aşınca klip, saniye (ör. {'zone1': 45, '*': 120})
+    CLIP_PRE_ROLL = 5.0             # Tetikten önceki süre (saniye)
+    CLIP_POST_ROLL = 5.0            # Tetikten sonraki süre (saniye)
+    CLIP_MAX_SECONDS = 60           # Art arda tetiklerle uzayan klibin üst sınırı
+    CLIP_FPS = 10                   # Halkaya yazılan ve kodlanan frame hızı
+    CLIP_SCALE = 0.5                # Klip çözünürlüğü (frame'e oranla)
+    CLIP_MAX_MEMORY_MB = 256        # Halka bellek sınırı; aşılırsa ön kayıt kısalır
+    CLIP_MAX_PENDING = 8            # Kodlanmayı bekleyen klip sınırı (fazlası atılır)
+    CLIP_CODEC = 'mp4v'
+    
+    # Cycle istatistikleri: bellek sabit kalır, yüzdelikler (p50/p90/p99) akan taslaktan
+    RETAINED_CYCLES = 100000       # Bellekte tutulan son cycle kaydı (tüm zone'lar, 32 byte/cycle)
+    STATS_WINDOW_CYCLES = 100      # "Son N cycle" penceresi
+    STATS_WINDOW_SECONDS = 600     # "Son N dakika" penceresi (saniye)
+    
+    # Aşama gecikmeleri, fps ve sayaçlar (kapalıyken maliyet ~0)
+    # Port verilirse http://127.0.0.1:<port>/metrics Prometheus formatında yayınlanır
+    # Komut satırından --metrics-port ile de açılabilir
+    METRICS = False
+    METRICS_PORT = None
+    METRICS_HOST = '127.0.0.1'
+    METRICS_SNAPSHOT_PATH = None      # Periyodik JSON anlık görüntüsü (ör. 'metrics.json')
+    METRICS_SNAPSHOT_INTERVAL = 10    # saniye
+    METRICS_WINDOW = 2048             # Yüzdelikler ve kayan fps için son N ölçüm
+    
+    # Tracker çıktısı kaydı: zone / parametre denemeleri modeli yeniden çalıştırmadan
+    # src/replay.py ile yapılır. Komut satırından --record DIR ile de açılabilir
+    RECORD_PATH = None
+    
+    # Inference backend: 'ultralytics' (PyTorch, GPU varsa CUDA), 'onnx' (ONNX Runtime CPU),
+    # 'openvino' (OpenVINO CPU). ONNX / OpenVINO modeli yoksa MODEL_PATH'ten bir kez dışa aktarılır
+    BACKEND = 'ultralytics'
+    BACKEND_MODEL_PATH = None   # Hazır .onnx dosyası veya OpenVINO klasörü (None: otomatik dışa aktarım)
+    BACKEND_IMGSZ = None        # Model giriş boyutu (None: ultralytics varsayılanı, ONNX/OpenVINO için 640)
+    BACKEND_THREADS = None      # CPU thread sayısı (None: kütüphane varsayılanı)
+    BACKEND_INT8 = False        # INT8 ağırlıklar (ONNX: dinamik nicemleme, OpenVINO: INT8 dışa aktarım)
+    BACKEND_WARMUP = 2          # Başlangıçta gerçek frame boyutuyla yapılan boş geçiş sayısı
+    # Model yükleme ve warmup arka planda yapılır; video açma ve zone hazırlığı beklemez
+    BACKGROUND_MODEL_LOAD = True
+    
+    # Uzun kayıtların paralel işlenmesi (src/batch.py): video örtüşen segmentlere bölünür,
+    # her segment ayrı süreçte kendi detector / tracker / analiziyle işlenip birleştirilir
+    BATCH_WORKERS = None            # Süreç sayısı (None: çekirdek sayısı)
+    BATCH_SEGMENT_SECONDS = None    # Segment uzunluğu (None: video / süreç sayısı)
+    BATCH_OVERLAP_SECONDS = 10      # Örtüşme: tracker ısınması ve kenarda track eşleştirme
@@ -0,0 +1,316 @@
+import argparse
+import math
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from config import Config
+from cycle_store import format_timestamp
+
+# Özet tabloları: dakika ve saat kovaları epoch'a hizalı, vardiya kovaları yerel saatle
+RESOLUTIONS = ('minute', 'hour', 'shift')
+_BUCKET_SECONDS = {'minute': 60, 'hour': 3600}
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cycles (stream TEXT NOT NULL, zone TEXT NOT NULL, track_id INTEGER, '
+    'entry_time REAL NOT NULL, exit_time REAL NOT NULL, cycle_time REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS cycles_zone_exit ON cycles (zone, exit_time)',
+    'CREATE INDEX IF NOT EXISTS cycles_exit ON cycles (exit_time)',
+    # Kova başına toplamlar: ortalama / std / min / max birleştirilebilir
+    'CREATE TABLE IF NOT EXISTS rollups (resolution TEXT NOT NULL, bucket REAL NOT NULL, '
+    'stream TEXT NOT NULL, zone TEXT NOT NULL, count INTEGER NOT NULL, total REAL NOT NULL, '
+    'total_sq REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL, '
+    'PRIMARY KEY (resolution, bucket, stream, zone)) WITHOUT ROWID',
+)
+
+_UPSERT_ROLLUP = (
+    'INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+    'ON CONFLICT (resolution, bucket, stream, zone) DO UPDATE SET '
+    'count = count + excluded.count, total = total + excluded.total, '
+    'total_sq = total_sq + excluded.total_sq, '
+    'min = MIN(min, excluded.min), max = MAX(max, excluded.max)'
+)
+
+
+def connect(path, check_same_thread=True):
+    """WAL modunda bağlantı: yazıcı okuyucuları bekletmez, okuyucular yazıcıyı"""
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=check_same_thread)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    with conn:
+        for statement in _SCHEMA:
+            conn.execute(statement)
+    return conn
+
+
+def shift_start(timestamp, shift_hours):
+    """Zaman damgasının düştüğü vardiyanın başlangıcı (yerel saat, ör. (6, 14, 22))"""
+    moment = datetime.fromtimestamp(timestamp)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    started = [hour for hour in sorted(shift_hours) if hour <= moment.hour]
+    if started:
+        return day.replace(hour=started[-1]).timestamp()
+    # Gece yarısından sonra, ilk vardiyadan önce: önceki günün son vardiyası
+    return (day - timedelta(days=1)).replace(hour=max(shift_hours)).timestamp()
+
+
+def rollup_rows(cycles, stream, shift_hours):
+    """Cycle kayıtlarından (CycleStore.to_records) kova başına toplam satırları"""
+    buckets = {}
+    for cycle in cycles:
+        exit_time, cycle_time = cycle['exit_time'], cycle['cycle_time']
+        keys = [(resolution, math.floor(exit_time / seconds) * seconds)
+                for resolution, seconds in _BUCKET_SECONDS.items()]
+        if shift_hours:
+            keys.append(('shift', shift_start(exit_time, shift_hours)))
+        for resolution, bucket in keys:
+            key = (resolution, float(bucket), stream, cycle['zone'])
+            row = buckets.get(key)
+            if row is None:
+                buckets[key] = [1, cycle_time, cycle_time * cycle_time, cycle_time, cycle_time]
+            else:
+                row[0] += 1
+                row[1] += cycle_time
+                row[2] += cycle_time * cycle_time
+                row[3] = min(row[3], cycle_time)
+                row[4] = max(row[4], cycle_time)
+    return [(*key, *row) for key, row in buckets.items()]
+
+
+def _describe(count, total, total_sq, minimum, maximum):
+    """Toplamlardan get_zone_statistics ile aynı adlı alanlar"""
+    if not count:
+        return {'count': 0, 'min_time': 0.0, 'max_time': 0.0, 'avg_time': 0.0, 'std_time': 0.0}
+    mean = total / count
+    variance = max(total_sq - count * mean * mean, 0.0) / (count - 1) if count > 1 else 0.0
+    return {'count': count, 'min_time': minimum, 'max_time': maximum, 'avg_time': mean,
+            'std_time': math.sqrt(variance)}
+
+
+class CycleHistoryWriter:
+    """Tamamlanan cycle'ları arka planda kalıcı SQLite geçmişine yazar.
+
+    Her append tek transaction'da cycles tablosuna eklenir ve aynı
+    transaction'da dakika / saat / vardiya özet satırları güncellenir; sorgular
+    böylece geçmişin boyutundan bağımsız kalır. Kuyrukta biriken append'ler
+    tek transaction'da yazılır. Frame döngüsü yalnızca kuyruğa ekler.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, path, stream='', shift_hours=None):
+        self.path = path
+        self.stream = stream or ''
+        self.shift_hours = tuple(Config.HISTORY_SHIFT_HOURS if shift_hours is None else shift_hours)
+        self.written_cycles = 0
+        self._queue = queue.Queue()
+        self._history = None
+        # Şema ve WAL modu burada kurulur; hatalı yol başlangıçta fark edilir
+        connect(path).close()
+        self._thread = threading.Thread(target=self._run, name='cycle-history', daemon=True)
+        self._thread.start()
+
+    def append(self, cycles):
+        """Yeni cycle kayıtlarını kuyruğa ekle (frame döngüsünü bekletmez)"""
+        if cycles:
+            self._queue.put(cycles)
+
+    def close(self):
+        """Bekleyen kayıtları yaz ve thread'i kapat"""
+        self._queue.put(self._CLOSE)
+        self._thread.join()
+        if self._history is not None:
+            self._history.close()
+
+    def query(self):
+        """Aynı veritabanı üzerinde CycleHistory (yazılmamış kuyruk hariç)"""
+        if self._history is None:
+            self._history = CycleHistory(self.path)
+        return self._history
+
+    def _write(self, conn, cycles):
+        with conn:
+            conn.executemany(
+                'INSERT INTO cycles VALUES (?, ?, ?, ?, ?, ?)',
+                [(self.stream, cycle['zone'], cycle['track_id'], cycle['entry_time'],
+                  cycle['exit_time'], cycle['cycle_time']) for cycle in cycles])
+            conn.executemany(_UPSERT_ROLLUP, rollup_rows(cycles, self.stream, self.shift_hours))
+        self.written_cycles += len(cycles)
+
+    def _run(self):
+        conn = connect(self.path)
+        closing = False
+        while not closing:
+            cycles = self._queue.get()
+            if cycles is self._CLOSE:
+                break
+            # Bu arada biriken append'ler aynı transaction'a
+            cycles = list(cycles)
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is self._CLOSE:
+                    closing = True
+                    break
+                cycles.extend(job)
+            try:
+                self._write(conn, cycles)
+            except Exception as e:
+                print(f"Cycle geçmişi yazılırken hata: {str(e)}")
+                print(traceback.format_exc())
+        conn.close()
+
+
+class CycleHistory:
+    """Cycle geçmişi sorguları.
+
+    Zaman aralığı istatistikleri özet tablolarından okunur: aralığın tam saat
+    kısmı saat kovalarından, kenarlardaki tam dakikalar dakika kovalarından,
+    bir dakikadan kısa uçlar çıkış zamanı indeksleriyle ham cycle'lardan.
+    Sonuç ham tabloyu taramakla aynıdır, maliyeti aralığın uzunluğuyla değil
+    kova sayısıyla büyür. Zaman aralıkları çıkış zamanına göre [start, end).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Bağlantı thread'ler arasında paylaşılabilir; sorgular kilitle sıralanır
+        self._conn = connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def _execute(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _filters(zones, stream):
+        clauses, params = [], []
+        if zones is not None:
+            zones = [zones] if isinstance(zones, str) else list(zones)
+            clauses.append(f"zone IN ({', '.join('?' * len(zones))})")
+            params.extend(zones)
+        if stream is not None:
+            clauses.append('stream = ?')
+            params.append(stream)
+        return ''.join(f' AND {clause}' for clause in clauses), params
+
+    def _rollup_totals(self, resolution, start, end, zones, stream):
+        where, params = self._filters(zones, stream)
+        return self._execute(
+            'SELECT zone, SUM(count), SUM(total), SUM(total_sq), MIN(min), MAX(max) FROM rollups '
+            f'WHERE resolution = ? AND bucket >= ? AND bucket < ?{where} GROUP BY zone',
+            [resolution, start, end, *params])
+
+    def _raw_totals(self, start, end, zones, stream):
+        where, params = self._filters(zones, stream)
+        return self._execute(
+            'SELECT zone, COUNT(*), SUM(cycle_time), SUM(cycle_time * cycle_time), MIN(cycle_time), '
+            f'MAX(cycle_time) FROM cycles WHERE exit_time >= ? AND exit_time < ?{where} GROUP BY zone',
+            [start, end, *params])
+
+    def _bound(self, function):
+        # MIN ve MAX ayrı sorgularda: SQLite her birini birincil anahtarla tek adımda bulur
+        (bucket,), = self._execute(f'SELECT {function}(bucket) FROM rollups WHERE resolution = ?', ['minute'])
+        return 0.0 if bucket is None else bucket
+
+    def zone_statistics(self, start=None, end=None, zones=None, stream=None):
+        """Zone başına sayı / ortalama / std / min / max (çıkış zamanı [start, end))"""
+        start = self._bound('MIN') if start is None else start
+        end = self._bound('MAX') + 60 if end is None else end
+
+        pieces = []
+        minute_start, minute_end = math.ceil(start / 60) * 60, math.floor(end / 60) * 60
+        if minute_start >= minute_end:
+            pieces.append(self._raw_totals(start, end, zones, stream))
+        else:
+            hour_start = math.ceil(minute_start / 3600) * 3600
+            hour_end = math.floor(minute_end / 3600) * 3600
+            if hour_start >= hour_end:
+                hour_start = hour_end = minute_end
+            pieces += [
+                self._raw_totals(start, minute_start, zones, stream),
+                self._rollup_totals('minute', minute_start, hour_start, zones, stream),
+                self._rollup_totals('hour', hour_start, hour_end, zones, stream),
+                self._rollup_totals('minute', hour_end, minute_end, zones, stream),
+                self._raw_totals(minute_end, end, zones, stream),
+            ]
+
+        totals = {}
+        for rows in pieces:
+            for zone, count, total, total_sq, minimum, maximum in rows:
+                merged = totals.get(zone)
+                if merged is None:
+                    totals[zone] = [count, total, total_sq, minimum, maximum]
+                else:
+                    merged[0] += count
+                    merged[1] += total
+                    merged[2] += total_sq
+                    merged[3] = min(merged[3], minimum)
+                    merged[4] = max(merged[4], maximum)
+        return {zone: _describe(*totals[zone]) for zone in sorted(totals)}
+
+    def series(self, resolution='hour', start=None, end=None, zones=None, stream=None):
+        """Kova başına zone istatistikleri (başlangıcı [start, end) içinde kalan kovalar)"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Geçersiz çözünürlük: {resolution} ({', '.join(RESOLUTIONS)})")
+        where, params = self._filters(zones, stream)
+        rows = self._execute(
+            'SELECT bucket, zone, SUM(count), SUM(total), SUM(total_sq), MIN(min), MAX(max) FROM rollups '
+            f'WHERE resolution = ? AND bucket >= ? AND bucket < ?{where} GROUP BY bucket, zone '
+            'ORDER BY bucket, zone',
+            [resolution, -math.inf if start is None else start, math.inf if end is None else end, *params])
+        return [{'bucket': bucket, 'zone': zone, **_describe(*totals)} for bucket, zone, *totals in rows]
+
+    def cycles(self, start, end, zones=None, stream=None, limit=None):
+        """Ham cycle kayıtları (çıkış zamanı sırasıyla)"""
+        where, params = self._filters(zones, stream)
+        rows = self._execute(
+            'SELECT stream, zone, track_id, entry_time, exit_time, cycle_time FROM cycles '
+            f'WHERE exit_time >= ? AND exit_time < ?{where} ORDER BY exit_time'
+            + (' LIMIT ?' if limit is not None else ''),
+            [start, end, *params] + ([limit] if limit is not None else []))
+        return [dict(zip(('stream', 'zone', 'track_id', 'entry_time', 'exit_time', 'cycle_time'), row))
+                for row in rows]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cycle geçmişinden zone başına zaman aralığı raporu")
+    parser.add_argument('--db', default=Config.HISTORY_DB_PATH or 'cycle_history.db', help="Geçmiş veritabanı")
+    parser.add_argument('--days', type=float, default=30, help="Son N gün")
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='hour')
+    parser.add_argument('--zone', action='append', default=None, help="Yalnızca bu zone (tekrarlanabilir)")
+    parser.add_argument('--stream', default=None, help="Yalnızca bu akış")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    history = CycleHistory(args.db)
+    end = time.time()
+    start = end - args.days * 86400
+
+    query_start = time.perf_counter()
+    rows = history.series(args.resolution, start, end, args.zone, args.stream)
+    statistics = history.zone_statistics(start, end, args.zone, args.stream)
+    elapsed_ms = (time.perf_counter() - query_start) * 1000
+
+    print(f"{'kova':<26} {'zone':<12} {'sayı':>7} {'ort s':>8} {'min s':>8} {'max s':>8}")
+    for row in rows:
+        print(f"{format_timestamp(row['bucket'])[:19]:<26} {row['zone']:<12} {row['count']:>7} "
+              f"{row['avg_time']:>8.2f} {row['min_time']:>8.2f} {row['max_time']:>8.2f}")
+    print(f"\nSon {args.days:g} gün:")
+    for zone, stats in statistics.items():
+        print(f"  {zone}: {stats['count']} cycle, ort {stats['avg_time']:.2f} s, "
+              f"std {stats['std_time']:.2f} s, min {stats['min_time']:.2f} s, max {stats['max_time']:.2f} s")
+    print(f"Sorgu süresi: {elapsed_ms:.1f} ms")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
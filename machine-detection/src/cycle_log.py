@@ -0,0 +1,112 @@
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime
+
+
+class CycleLogWriter:
+    """Tamamlanan cycle'ları arka planda append-only JSON Lines dosyalarına yazar.
+
+    Her flush yalnızca son flush'tan beri tamamlanan cycle'ları ekler, böylece
+    kayıt maliyeti dosya boyutundan bağımsızdır. Segment dosyaları boyut veya
+    yaşa göre döndürülür; toplu istatistikler küçük bir özet dosyasına atomik
+    olarak yazılır.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, directory, summary_path=None, prefix='cycles',
+                 max_bytes=64 * 1024 * 1024, max_age_s=3600):
+        self.directory = directory
+        self.summary_path = summary_path or os.path.join(directory, 'summary.json')
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue()
+        self._file = None
+        self._opened_at = 0.0
+        self.segment_path = None
+        self.written_cycles = 0
+
+        self._thread = threading.Thread(target=self._run, name='cycle-log', daemon=True)
+        self._thread.start()
+
+    def append(self, cycles):
+        """Yeni cycle kayıtlarını kuyruğa ekle (frame döngüsünü bekletmez)"""
+        if cycles:
+            self._queue.put(('cycles', cycles))
+
+    def write_summary(self, summary):
+        self._queue.put(('summary', summary))
+
+    def close(self):
+        """Bekleyen kayıtları yaz ve thread'i kapat"""
+        self._queue.put(self._CLOSE)
+        self._thread.join()
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.directory, f'{self.prefix}_{stamp}.jsonl')
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f'{self.prefix}_{stamp}_{suffix}.jsonl')
+            suffix += 1
+        self._file = open(path, 'a', encoding='utf-8')
+        self._opened_at = time.time()
+        self.segment_path = path
+
+    def _needs_rotation(self):
+        if self._file is None:
+            return True
+        return (self._file.tell() >= self.max_bytes
+                or time.time() - self._opened_at >= self.max_age_s)
+
+    def _write_cycles(self, cycles):
+        if self._needs_rotation():
+            self._open_segment()
+        self._file.write(''.join(json.dumps(cycle, separators=(',', ':')) + '\n' for cycle in cycles))
+        self._file.flush()
+        self.written_cycles += len(cycles)
+
+    def _write_summary(self, summary):
+        # Yarım yazılmış özet okunmasın diye geçici dosya + rename
+        tmp_path = self.summary_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=4)
+        os.replace(tmp_path, self.summary_path)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is self._CLOSE:
+                break
+            kind, payload = job
+            try:
+                if kind == 'cycles':
+                    self._write_cycles(payload)
+                else:
+                    self._write_summary(payload)
+            except Exception as e:
+                print(f"Cycle log yazılırken hata: {str(e)}")
+                print(traceback.format_exc())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_cycle_log(directory, prefix='cycles'):
+    """Segment dosyalarındaki tüm cycle kayıtlarını sırayla oku"""
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith(prefix) and name.endswith('.jsonl'))
+    for name in names:
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,204 @@
+import math
+from collections import deque
+import numpy as np
+
+
+class RunningStats:
+    """Sabit bellekli sayı / ortalama / varyans / min / max (Welford)"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Başka bir RunningStats'ı bu nesneye ekle (paralel Welford birleşimi)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Birleştirilebilir, göreli hata sınırlı yüzdelik taslağı (DDSketch benzeri).
+
+    Değerler logaritmik kovalara sayılır; her yüzdelik `relative_accuracy`
+    göreli hata içinde döner. Kova sayısı `max_buckets` ile sınırlıdır, aşılırsa
+    en küçük kovalar birleştirilir (düşük yüzdeliklerde doğruluk azalır).
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048, min_value=1e-3):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.buckets = {}      # {kova anahtarı: sayı}
+        self.zero_count = 0    # min_value altındaki değerler
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value < self.min_value:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        extra = len(keys) - self.max_buckets
+        target = keys[extra]
+        for key in keys[:extra]:
+            self.buckets[target] += self.buckets.pop(key)
+
+    def merge(self, other):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Kovanın temsil değeri: göreli hatayı ortalayan nokta
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class TimeWindow:
+    """Son `window_s` saniyenin istatistikleri; `bucket_s` genişliğinde kovalarda tutulur"""
+
+    def __init__(self, window_s=600, bucket_s=60, relative_accuracy=0.01):
+        self.window_s = window_s
+        self.bucket_s = bucket_s
+        self.relative_accuracy = relative_accuracy
+        self._buckets = deque()  # [(kova no, RunningStats, QuantileSketch)]
+
+    def _evict(self, now):
+        oldest = math.floor((now - self.window_s) / self.bucket_s)
+        while self._buckets and self._buckets[0][0] <= oldest:
+            self._buckets.popleft()
+
+    def add(self, timestamp, value):
+        index = math.floor(timestamp / self.bucket_s)
+        if not self._buckets or self._buckets[-1][0] < index:
+            self._buckets.append((index, RunningStats(), QuantileSketch(self.relative_accuracy)))
+        # Geç gelen (sıra dışı) değer son kovaya yazılır
+        _, stats, sketch = self._buckets[-1]
+        stats.add(value)
+        sketch.add(value)
+        self._evict(timestamp)
+
+    def merged(self, now):
+        self._evict(now)
+        stats = RunningStats()
+        sketch = QuantileSketch(self.relative_accuracy)
+        for _, bucket_stats, bucket_sketch in self._buckets:
+            stats.merge(bucket_stats)
+            sketch.merge(bucket_sketch)
+        return stats, sketch
+
+
+class ZoneCycleStats:
+    """Bir zone'un cycle süreleri için sabit bellekli akan istatistikler.
+
+    - Tüm çalışma: sayı / ortalama / std / min / max ve p50 / p90 / p99
+    - Son N cycle ve son N dakika kayan pencereleri
+    Her yeni cycle O(1) maliyetlidir, bellek çalışma süresinden bağımsızdır.
+    """
+
+    def __init__(self, window_cycles=100, window_seconds=600, relative_accuracy=0.01):
+        self.total = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.last_cycles = deque(maxlen=window_cycles)
+        self.time_window = TimeWindow(window_seconds, relative_accuracy=relative_accuracy)
+        self.window_seconds = window_seconds
+
+    def add(self, cycle_time, exit_time):
+        self.total.add(cycle_time)
+        self.sketch.add(cycle_time)
+        self.last_cycles.append(cycle_time)
+        self.time_window.add(exit_time, cycle_time)
+
+    def __len__(self):
+        return self.total.count
+
+    @staticmethod
+    def _describe(stats, sketch):
+        if stats.count == 0:
+            return {'count': 0, 'min_time': 0.0, 'max_time': 0.0, 'avg_time': 0.0, 'std_time': 0.0,
+                    'p50_time': 0.0, 'p90_time': 0.0, 'p99_time': 0.0}
+        return {
+            'count': stats.count,
+            'min_time': float(stats.min),
+            'max_time': float(stats.max),
+            'avg_time': float(stats.mean),
+            'std_time': float(stats.std),
+            'p50_time': float(sketch.quantile(0.50)),
+            'p90_time': float(sketch.quantile(0.90)),
+            'p99_time': float(sketch.quantile(0.99)),
+        }
+
+    def summary(self, now):
+        summary = self._describe(self.total, self.sketch)
+
+        if self.last_cycles:
+            values = np.fromiter(self.last_cycles, dtype=np.float64)
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            summary['last_cycles'] = {
+                'count': len(values),
+                'avg_time': float(values.mean()),
+                'p50_time': float(p50), 'p90_time': float(p90), 'p99_time': float(p99),
+            }
+        else:
+            summary['last_cycles'] = {'count': 0, 'avg_time': 0.0,
+                                      'p50_time': 0.0, 'p90_time': 0.0, 'p99_time': 0.0}
+
+        summary['last_minutes'] = self._describe(*self.time_window.merged(now))
+        summary['last_minutes']['window_s'] = self.window_seconds
+        return summary
@@ -0,0 +1,138 @@
+import csv
+from datetime import datetime
+import numpy as np
+
+# Cycle başına 32 byte: track_id, zone indeksi, giriş, çıkış, süre
+CYCLE_DTYPE = np.dtype([
+    ('track_id', '<i4'),
+    ('zone', '<i4'),
+    ('entry_time', '<f8'),
+    ('exit_time', '<f8'),
+    ('cycle_time', '<f8'),
+])
+
+
+def format_timestamp(timestamp):
+    """Unix timestamp'i okunabilir formata çevir"""
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+class CycleStore:
+    """Tamamlanan cycle'lar için büyüyebilen NumPy structured array.
+
+    Tüm zone'lar tek dizide, zone indeksi sütunuyla tutulur. Kayıtlar çıkış
+    zamanına göre sıralı eklendiği için zaman aralığı sorguları kopyasız
+    dilimdir. `max_cycles` aşılırsa en eski yarı atılır (bellek sınırlı kalır);
+    on_drop verilmişse atmadan önce çağrılır (ör. henüz kayda gönderilmemiş
+    cycle'ları göndermek için).
+    Zaman damgaları yalnızca okuma/dışa aktarma sırasında biçimlendirilir.
+    """
+
+    def __init__(self, zone_names, capacity=1024, max_cycles=None):
+        self.zone_names = list(zone_names)
+        self.zone_index = {name: i for i, name in enumerate(self.zone_names)}
+        self.max_cycles = max_cycles
+        self._data = np.empty(capacity, dtype=CYCLE_DTYPE)
+        self._size = 0
+        self.total_appended = 0  # Başlangıçtan beri eklenen (atılanlar dahil)
+        self.dropped = 0         # Bellek sınırı nedeniyle atılan eski kayıt
+        self.on_drop = None      # Eski kayıtlar atılmadan önce çağrılır
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def append(self, track_id, zone_name, entry_time, exit_time):
+        if self.max_cycles is not None and self._size >= self.max_cycles:
+            self._drop_oldest(max(self._size // 2, 1))
+        if self._size == len(self._data):
+            grown = np.empty(max(2 * len(self._data), 16), dtype=CYCLE_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+        self._data[self._size] = (track_id, self.zone_index[zone_name],
+                                  entry_time, exit_time, exit_time - entry_time)
+        self._size += 1
+        self.total_appended += 1
+
+    def _drop_oldest(self, count):
+        if self.on_drop is not None:
+            self.on_drop()
+        self._data[:self._size - count] = self._data[count:self._size]
+        self._size -= count
+        self.dropped += count
+
+    def view(self):
+        """Tüm kayıtlar (kopyasız view)"""
+        return self._data[:self._size]
+
+    def since(self, absolute_index):
+        """total_appended sayacına göre verilen indeksten sonraki kayıtlar (kopyasız).
+        Bu indeksten sonra atılmış kayıtlar dönmez; sayısı lost_since() ile bulunur."""
+        start = max(absolute_index - self.dropped, 0)
+        return self._data[start:self._size]
+
+    def lost_since(self, absolute_index):
+        """Verilen indeksten sonra eklenip okunmadan atılmış kayıt sayısı"""
+        return max(self.dropped - absolute_index, 0)
+
+    def between(self, start_time, end_time):
+        """Çıkış zamanı [start_time, end_time) aralığındaki kayıtlar (kopyasız)"""
+        exit_times = self._data['exit_time'][:self._size]
+        lo, hi = np.searchsorted(exit_times, [start_time, end_time], side='left')
+        return self._data[lo:hi]
+
+    def zone(self, zone_name):
+        """Bir zone'un kayıtları"""
+        data = self.view()
+        return data[data['zone'] == self.zone_index[zone_name]]
+
+    def summary(self):
+        """Zone başına sayı / ortalama / min / max (vektörel)"""
+        data = self.view()
+        n_zones = len(self.zone_names)
+        counts = np.bincount(data['zone'], minlength=n_zones)
+        sums = np.bincount(data['zone'], weights=data['cycle_time'], minlength=n_zones)
+        mins = np.full(n_zones, np.inf)
+        maxs = np.full(n_zones, -np.inf)
+        np.minimum.at(mins, data['zone'], data['cycle_time'])
+        np.maximum.at(maxs, data['zone'], data['cycle_time'])
+
+        summary = {}
+        for i, zone_name in enumerate(self.zone_names):
+            if counts[i]:
+                summary[zone_name] = {'count': int(counts[i]), 'avg_time': float(sums[i] / counts[i]),
+                                      'min_time': float(mins[i]), 'max_time': float(maxs[i])}
+            else:
+                summary[zone_name] = {'count': 0, 'avg_time': 0.0, 'min_time': 0.0, 'max_time': 0.0}
+        return summary
+
+    def to_records(self, data=None):
+        """Kayıtları dict listesine çevir (JSON / log için)"""
+        data = self.view() if data is None else data
+        return [{'zone': self.zone_names[zone], 'track_id': track_id, 'entry_time': entry,
+                 'exit_time': exit_, 'cycle_time': cycle_time}
+                for track_id, zone, entry, exit_, cycle_time in data.tolist()]
+
+    def to_npz(self, path):
+        np.savez_compressed(path, cycles=self.view(), zone_names=np.asarray(self.zone_names))
+
+    def to_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['zone', 'track_id', 'entry_time', 'exit_time', 'cycle_time'])
+            for track_id, zone, entry, exit_, cycle_time in self.view().tolist():
+                writer.writerow([self.zone_names[zone], track_id, format_timestamp(entry),
+                                 format_timestamp(exit_), f"{cycle_time:.3f}"])
+
+    @classmethod
+    def from_npz(cls, path):
+        with np.load(path) as archive:
+            store = cls(archive['zone_names'].tolist(), capacity=max(len(archive['cycles']), 16))
+            cycles = archive['cycles']
+        store._data[:len(cycles)] = cycles
+        store._size = store.total_appended = len(cycles)
+        return store
@@ -1,11 +1,13 @@
 from dataclasses import dataclass
-from typing import Dict, Set, List, Tuple
 import time
 import json
 import numpy as np
-from collections import defaultdict
 import traceback  # Hata detayı için ekledik
-from datetime import datetime
+from zone_engine import ZoneEngine
+from cycle_stats import ZoneCycleStats
+from cycle_store import CycleStore, format_timestamp
+from track_table import TrackTable
+from events import ZONE_ENTER, ZONE_EXIT
 
 @dataclass
 class ObjectCycleData:
@@ -15,21 +17,30 @@ class ObjectCycleData:
     cycle_complete: bool = False
 
 class CycleTimeAnalyzer:
-    def __init__(self, zones):
+    def __init__(self, zones, retained_cycles=100000, window_cycles=100, window_seconds=600,
+                 track_table=None, max_disappeared_time=1.0, events=None):
         self.zones = zones
-        # Her zone için ayrı bir dictionary tutuyoruz
-        self.zone_objects = {zone_name: {} for zone_name in zones.keys()}  # {zone_name: {track_id: ObjectCycleData}}
-        self.completed_cycles = defaultdict(list)  # {zone_name: [completed_cycles]}
-        self.cycle_stats = {zone_name: [] for zone_name in zones.keys()}  # Her bölge için ayrı istatistik
+        # Zone giriş zamanları track tablosunda (slot x zone, NaN = zone'da değil);
+        # paylaşılan tabloyu sahibi süpürür
+        self._owns_table = track_table is None
+        self.track_table = TrackTable(len(zones)) if track_table is None else track_table
+        self.max_disappeared_time = max_disappeared_time  # saniye
+        # Tamamlanan cycle'lar sütunlu dizide; son `retained_cycles` kayıt bellekte kalır
+        # (tam geçmiş cycle log'dadır)
+        self.cycle_store = CycleStore(zones.keys(), max_cycles=retained_cycles)
+        # Her bölge için sabit bellekli akan istatistik
+        self.cycle_stats = {zone_name: ZoneCycleStats(window_cycles, window_seconds)
+                            for zone_name in zones.keys()}
+        self._last_time = None  # Son olayın zamanı (kayan pencereler için)
+        self.zone_engine = ZoneEngine(zones)  # update'e zone_frame verilmezse kullanılır
+        self.cycle_log = None  # attach_log ile bağlanan append-only kayıt
+        self.history = None    # attach_history ile bağlanan kalıcı geçmiş (CycleHistoryWriter)
+        self._flushed = 0      # Log'a gönderilen cycle sayısı (cycle_store.total_appended cinsinden)
+        self.lost_cycles = 0   # Kayda gönderilmeden bellekten atılan cycle (olmamalı; sayılır)
+        self.events = events   # Giriş / çıkış olayları (EventPublisher; None ise olay üretilmez)
+        self.error_count = 0
+        self._reported_errors = set()
         
-    def _calculate_center(self, bbox):
-        return ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
-    
-    def _is_in_zone(self, center: Tuple[float, float], zone_coords: List[int]) -> bool:
-        x, y = center
-        x1, y1, x2, y2 = zone_coords
-        return x1 < x < x2 and y1 < y < y2
-
     def _convert_to_native_types(self, obj):
         """NumPy tiplerini native Python tiplerine dönüştür"""
         if isinstance(obj, np.integer):
@@ -45,124 +56,149 @@ class CycleTimeAnalyzer:
             return [self._convert_to_native_types(item) for item in obj]
         return obj
     
-    def update(self, detections):
+    def _report_error(self, message, error):
+        """Hatayı say; aynı yer ve türdeki hata için ayrıntı yalnızca ilk seferde yazılır
+        (her frame'de tekrarlayan hata konsolu ve frame döngüsünü boğmaz)"""
+        self.error_count += 1
+        key = (message, type(error).__name__)
+        if key in self._reported_errors:
+            return
+        self._reported_errors.add(key)
+        print(f"{message}: {str(error)} (tekrarları yalnızca sayılır)")
+        print(traceback.format_exc())
+    
+    def update(self, detections, zone_frame=None, timestamp=None):
         try:
-            current_time = time.time()
+            # Zaman damgası verilmezse duvar saati kullanılır (canlı akış)
+            current_time = time.time() if timestamp is None else timestamp
+            self._last_time = current_time
             
             # Eğer detections None ise veya tracker_id yoksa, işlemi atla
             if detections is None or not hasattr(detections, 'tracker_id') or len(detections.tracker_id) == 0:
                 return
             
-            current_track_ids = set(map(int, detections.tracker_id))  # track_id'leri int'e çevir
+            # Zone üyeliği dışarıdan verilmediyse kendi motorumuzla hesapla
+            if zone_frame is None:
+                zone_frame = self.zone_engine.update(detections.xyxy, detections.tracker_id)
             
-            # Her zone için aktif boxları takip et
-            active_boxes = {zone_name: set() for zone_name in self.zones.keys()}
+            zone_names = self.zone_engine.zone_names
+            track_ids = zone_frame.track_ids.tolist()  # NumPy int64'ü normal int'e çevir
+            table = self.track_table
+            slots = table.slots(track_ids)
+            table.touch(slots, current_time)
+            entry_time = table.entry_time
+            events = self.events
             
-            # Mevcut frame'deki tespitleri işle
-            for i, (bbox, track_id) in enumerate(zip(detections.xyxy, detections.tracker_id)):
-                try:
-                    track_id = int(track_id)  # NumPy int64'ü normal int'e çevir
-                    center = self._calculate_center(bbox)
-                    
-                    # Her bölge için kontrol
-                    for zone_name, zone_info in self.zones.items():
-                        is_in_zone = self._is_in_zone(center, zone_info["coords"])
-                        
-                        if is_in_zone:
-                            active_boxes[zone_name].add(track_id)
-                            
-                            # Nesne bölgeye yeni girdiyse
-                            if track_id not in self.zone_objects[zone_name]:
-                                self.zone_objects[zone_name][track_id] = ObjectCycleData(
-                                    entry_time=current_time,
-                                    zone_name=zone_name
-                                )
-                                print(f"Box ID {track_id} entered {zone_name}")
-                except Exception as box_error:
-                    print(f"Box işlenirken hata: track_id={track_id}, hata={str(box_error)}")
-                    continue
+            # Zone'a yeni giren nesneler
+            for row, zone_idx in np.argwhere(zone_frame.entered).tolist():
+                slot = slots[row]
+                if np.isnan(entry_time[slot, zone_idx]):
+                    entry_time[slot, zone_idx] = current_time
+                    if events is not None:
+                        events.emit(ZONE_ENTER, current_time, track_ids[row], zone_names[zone_idx])
+            
+            # Zone'dan çıkan (görünür) ve kaybolan nesneler
+            exits = [(track_ids[row], zone_idx)
+                     for row, zone_idx in np.argwhere(zone_frame.exited).tolist()]
+            lost_ids = zone_frame.lost_ids.tolist()
+            exits.extend((lost_ids[row], zone_idx)
+                         for row, zone_idx in np.argwhere(zone_frame.lost_membership).tolist())
             
-            # Her zone için çıkan veya kaybolan nesneleri kontrol et
-            for zone_name in self.zones.keys():
+            for track_id, zone_idx in exits:
+                zone_name = zone_names[zone_idx]
                 try:
-                    current_zone_tracks = set(self.zone_objects[zone_name].keys())
+                    slot = table.slot_of.get(track_id)
+                    if slot is None or np.isnan(entry_time[slot, zone_idx]):
+                        continue
+                    
+                    entered_at = float(entry_time[slot, zone_idx])
+                    cycle_time = current_time - entered_at
                     
-                    # Zone'dan çıkan nesneleri bul
-                    exited_tracks = current_zone_tracks - active_boxes[zone_name]
+                    # İstatistikleri güncelle
+                    self.cycle_stats[zone_name].add(cycle_time, current_time)
                     
-                    for track_id in exited_tracks:
-                        cycle_data = self.zone_objects[zone_name][track_id]
-                        if not cycle_data.cycle_complete:
-                            cycle_data.exit_time = current_time
-                            cycle_data.cycle_complete = True
-                            cycle_time = cycle_data.exit_time - cycle_data.entry_time
-                            
-                            # İstatistikleri güncelle
-                            self.cycle_stats[zone_name].append(cycle_time)
-                            
-                            # Tamamlanan döngüyü kaydet
-                            completed_cycle = {
-                                'track_id': track_id,
-                                'entry_time': float(cycle_data.entry_time),
-                                'exit_time': float(cycle_data.exit_time),
-                                'cycle_time': float(cycle_time)
-                            }
-                            self.completed_cycles[zone_name].append(completed_cycle)
-                            print(f"Box ID {track_id} exited {zone_name} after {cycle_time:.2f} seconds")
-                            
-                            # Tamamlanan cycle'ı temizle
-                            del self.zone_objects[zone_name][track_id]
+                    # Tamamlanan döngüyü kaydet
+                    self.cycle_store.append(track_id, zone_name, entered_at, current_time)
+                    if events is not None:
+                        events.emit(ZONE_EXIT, current_time, track_id, zone_name, cycle_time=cycle_time)
+                    
+                    # Tamamlanan cycle'ı temizle
+                    entry_time[slot, zone_idx] = np.nan
                 except Exception as zone_error:
-                    print(f"Zone işlenirken hata: zone={zone_name}, hata={str(zone_error)}")
+                    self._report_error(f"Zone işlenirken hata: zone={zone_name}", zone_error)
                     continue
+            
+            # Uzun süre görünmeyen track'leri temizle
+            if self._owns_table:
+                table.evict(current_time, self.max_disappeared_time)
                 
         except Exception as e:
-            print(f"Cycle time analizi sırasında hata: {str(e)}")
-            print(traceback.format_exc())
+            self._report_error("Cycle time analizi sırasında hata", e)
     
-    def get_current_cycle_times(self):
+    def current_cycle_arrays(self, timestamp=None):
+        """Aktif (track, zone) çiftleri dizi olarak: (track_ids, zone_indices, geçen süreler).
+        Sıra track tablosu sırasıdır; çizim sözlük kurmadan doğrudan bunu kullanır."""
+        current_time = time.time() if timestamp is None else timestamp
+        table = self.track_table
+        entry_time = table.entry_time[:table._high]
+        slots, zone_indices = np.nonzero(~np.isnan(entry_time))
+        return table.track_id[slots], zone_indices, current_time - entry_time[slots, zone_indices]
+    
+    def get_current_cycle_times(self, timestamp=None):
         """Aktif nesnelerin anlık cycle time'larını döndür"""
-        current_time = time.time()
         current_cycles = {}
         
         # Her track_id için bir dictionary oluştur
-        for zone_name, tracks in self.zone_objects.items():
-            for track_id, cycle_data in tracks.items():
-                if not cycle_data.cycle_complete:
-                    if track_id not in current_cycles:
-                        current_cycles[track_id] = {}
-                    current_time_in_zone = current_time - cycle_data.entry_time
-                    current_cycles[track_id][zone_name] = current_time_in_zone
+        zone_names = self.zone_engine.zone_names
+        track_ids, zone_indices, elapsed = self.current_cycle_arrays(timestamp)
+        for track_id, zone_idx, seconds in zip(track_ids.tolist(), zone_indices.tolist(), elapsed.tolist()):
+            current_cycles.setdefault(int(track_id), {})[zone_names[zone_idx]] = seconds
         
         return current_cycles
     
-    def get_zone_statistics(self):
-        """Her bölge için istatistikleri hesapla"""
+    @property
+    def zone_objects(self):
+        """{zone_name: {track_id: ObjectCycleData}} görünümü (okuma anında oluşturulur)"""
+        table = self.track_table
+        zone_names = self.zone_engine.zone_names
+        objects = {zone_name: {} for zone_name in zone_names}
+        entry_time = table.entry_time[:table._high]
+        for slot, zone_idx in np.argwhere(~np.isnan(entry_time)).tolist():
+            zone_name = zone_names[zone_idx]
+            objects[zone_name][int(table.track_id[slot])] = ObjectCycleData(
+                entry_time=float(entry_time[slot, zone_idx]),
+                zone_name=zone_name
+            )
+        return objects
+    
+    def get_zone_statistics(self, timestamp=None):
+        """Her bölge için istatistikleri döndür (akan özetlerden, O(1))"""
+        now = timestamp if timestamp is not None else self._last_time
+        if now is None:
+            now = time.time()
+        
         stats = {}
-        for zone_name in self.zones.keys():
-            cycle_times = self.cycle_stats[zone_name]
-            if cycle_times:
-                stats[zone_name] = {
-                    'min_time': float(min(cycle_times)),
-                    'max_time': float(max(cycle_times)),
-                    'avg_time': float(sum(cycle_times) / len(cycle_times)),
-                    'total_objects': len(cycle_times),
-                    'current_objects': len([t for t in self.zone_objects[zone_name].values() 
-                                         if not t.cycle_complete])
-                }
-            else:
-                stats[zone_name] = {
-                    'min_time': 0.0,
-                    'max_time': 0.0,
-                    'avg_time': 0.0,
-                    'total_objects': 0,
-                    'current_objects': 0
-                }
+        table = self.track_table
+        in_zone = np.count_nonzero(~np.isnan(table.entry_time[:table._high]), axis=0)
+        for zone_idx, zone_name in enumerate(self.zone_engine.zone_names):
+            summary = self.cycle_stats[zone_name].summary(now)
+            summary['total_objects'] = summary.pop('count')
+            # Tamamlanan cycle'ların giriş zamanı silinir, kalanlar aktiftir
+            summary['current_objects'] = int(in_zone[zone_idx])
+            stats[zone_name] = summary
         return stats
     
     def _format_timestamp(self, timestamp):
         """Unix timestamp'i okunabilir formata çevir"""
-        return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')
+        return format_timestamp(timestamp)
+    
+    @property
+    def completed_cycles(self):
+        """Bellekteki tamamlanan cycle'lar {zone_name: [cycle dict]} (okuma anında oluşturulur)"""
+        cycles = {zone_name: [] for zone_name in self.zones.keys()}
+        for record in self.cycle_store.to_records():
+            cycles[record.pop('zone')].append(record)
+        return cycles
 
     def save_statistics(self, output_path):
         """İstatistikleri JSON dosyasına kaydet"""
@@ -171,8 +207,8 @@ class CycleTimeAnalyzer:
             'completed_cycles': {
                 zone_name: [{
                     'track_id': cycle['track_id'],
-                    'entry_time': self._format_timestamp(cycle['entry_time']),
-                    'exit_time': self._format_timestamp(cycle['exit_time']),
+                    'entry_time': format_timestamp(cycle['entry_time']),
+                    'exit_time': format_timestamp(cycle['exit_time']),
                     'cycle_time': cycle['cycle_time'],
                     'cycle_time_formatted': f"{cycle['cycle_time']:.2f} saniye"
                 } for cycle in cycles]
@@ -181,4 +217,56 @@ class CycleTimeAnalyzer:
         }
         
         with open(output_path, 'w') as f:
-            json.dump(stats, f, indent=4) 
\ No newline at end of file
+            json.dump(stats, f, indent=4)
+    
+    def attach_log(self, cycle_log):
+        """Tamamlanan cycle'ları append-only kayda (CycleLogWriter) yönlendir"""
+        self.cycle_log = cycle_log
+        # retained_cycles sınırında eski cycle'lar atılmadan önce kayda gönderilir
+        self.cycle_store.on_drop = self._flush_cycles
+    
+    def attach_history(self, history):
+        """Tamamlanan cycle'ları kalıcı geçmişe (CycleHistoryWriter) de gönder"""
+        self.history = history
+        self.cycle_store.on_drop = self._flush_cycles
+    
+    def get_history_statistics(self, start=None, end=None, zones=None):
+        """Kalıcı geçmişten zone başına istatistikler (çıkış zamanı [start, end)).
+        Özet tablolarından okunur; son flush'tan sonraki cycle'lar henüz dahil değildir."""
+        if self.history is None:
+            return {}
+        return self.history.query().zone_statistics(start, end, zones, stream=self.history.stream)
+    
+    def _flush_cycles(self):
+        """Son flush'tan beri tamamlanan cycle'ları kayda / geçmişe gönder (kuyruğa ekler)"""
+        store = self.cycle_store
+        lost = store.lost_since(self._flushed)
+        if lost:
+            if not self.lost_cycles:
+                print(f"Uyarı: {lost} cycle kayda gönderilmeden bellekten atıldı (sonrakiler yalnızca sayılır)")
+            self.lost_cycles += lost
+        new_cycles = store.to_records(store.since(self._flushed))
+        self._flushed = store.total_appended
+        if self.history is not None:
+            self.history.append(new_cycles)
+        if self.cycle_log is not None:
+            self.cycle_log.append(new_cycles)
+
+    def flush_log(self):
+        """Son flush'tan beri tamamlanan cycle'ları kayda / geçmişe ve özet istatistikleri kayda gönder"""
+        if self.cycle_log is None and self.history is None:
+            return
+        self._flush_cycles()
+        if self.cycle_log is None:
+            return
+        self.cycle_log.write_summary({
+            'updated_at': format_timestamp(time.time()),
+            'zone_statistics': self.get_zone_statistics()
+        })
+    
+    def export_cycles(self, output_path):
+        """Bellekteki cycle'ları toplu dışa aktar (.npz veya .csv)"""
+        if output_path.endswith('.csv'):
+            self.cycle_store.to_csv(output_path)
+        else:
+            self.cycle_store.to_npz(output_path)
@@ -1,200 +1,184 @@
-import cv2
+import threading
+import time
 import numpy as np
-from ultralytics import YOLO
-import supervision as sv
-import os
-import json
-import torch
-from zone_counter import ZoneCounter
 from config import Config
-from cycle_time_analyzer import CycleTimeAnalyzer
+from backends import create_backend, warmup
+from analytics import ZoneAnalytics
+from zone_engine import load_zones
+from motion import BoxPropagator, StrideScheduler, create_motion_gate
+from roi import create_roi_tiler
+from tracking import StreamTracker
+from detections import DetectionBuffers
+from metrics import NullMetrics
 
 class MachineDetector:
-    def __init__(self, model_path, video_path):
-        # GPU kontrolü
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        print(f"Using device: {self.device}")
+    def __init__(self, model_path, video_path, fps=None, metrics=None, frame_size=None, events=None,
+                 clip_dir=None, history_path=None):
+        # Aşama süreleri (kapalıysa boş işlem)
+        self.metrics = metrics if metrics is not None else NullMetrics()
         
-        # Model yükleme
-        self.model = YOLO(model_path)
-        if self.device == 'cuda':
-            self.model.to(self.device)
+        # Model (Config.BACKEND: ultralytics / onnx / openvino) arka planda yüklenir
+        # ve ısıtılır; bu sırada zone'lar, analiz ve ilk frame'lerin decode'u hazırlanır
+        self.backend = None
+        self.device = None
+        self.model = None
+        self.tracker = None
+        self.startup_times = {}  # {'model_load': s, 'warmup': s}
+        self._backend_error = None
+        self._backend_ready = threading.Event()
         
         # Video kaynağı
         self.video_path = video_path
         
-        # zones.json yolunu belirle
-        self.project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.zones_path = os.path.join(self.project_dir, 'zones.json')
+        # zones.json'dan bölgeleri yükle (frame_size verilirse video açılmaz)
+        self.zones = load_zones(Config.ZONES_PATH, self.video_path, frame_size=frame_size)
+        self.analytics = ZoneAnalytics(self.zones, log_dir=Config.CYCLE_LOG_DIR, metrics=self.metrics,
+                                       events=events, history_path=history_path,
+                                       clip_dir=clip_dir, fps=fps)
+        self.zone_engine = self.analytics.zone_engine
+        self.zone_counter = self.analytics.zone_counter
+        self.cycle_analyzer = self.analytics.cycle_analyzer
+        self.recorder = None  # DetectionRecorder: tracker çıktısı tekrar analiz için kaydedilir
         
-        # zones.json'dan bölgeleri yükle
-        self.zones = self._load_zones()
-        self.zone_counter = ZoneCounter(self.zones)
-        self.cycle_analyzer = CycleTimeAnalyzer(self.zones)
-
-    def _load_zones(self):
-        if os.path.exists(Config.ZONES_PATH):
-            with open(Config.ZONES_PATH, 'r') as f:
-                data = json.load(f)
-                
-            # Video frame boyutlarını al
-            cap = cv2.VideoCapture(self.video_path)
-            ret, frame = cap.read()
-            cap.release()
+        # Inference stride: atlanan frame'lerde kutular hızla ileri taşınır
+        self.frame_index = 0
+        self.scheduler = StrideScheduler(
+            stride=Config.INFERENCE_STRIDE,
+            adaptive=Config.ADAPTIVE_STRIDE,
+            tolerance=Config.STRIDE_CYCLE_TOLERANCE,
+            fps=fps,
+            max_displacement=Config.STRIDE_MAX_DISPLACEMENT
+        )
+        self.propagator = BoxPropagator(max_displacement=Config.STRIDE_MAX_DISPLACEMENT)
+        
+        # Hareket kapısı: zone'larda hareket yoksa detector atlanır, son durum korunur
+        self.motion_gate = create_motion_gate(self.zones)
+        self._gate_closed = False
+        self._last_detections = None
+        
+        # ROI modunda detector zone kırpıntılarında çalışır, tracking ayrı yapılır
+        self.roi_tiler = create_roi_tiler(self.zones)
+        # model.track çıktısı her frame yeniden kullanılan bloklara tek kopyayla alınır
+        self.buffers = DetectionBuffers()
+        
+        loader = threading.Thread(target=self._load_backend, args=(model_path, fps, frame_size),
+                                  name='model-loader', daemon=True)
+        loader.start()
+        if not Config.BACKGROUND_MODEL_LOAD:
+            self.wait_until_ready()
+    
+    def _load_backend(self, model_path, fps, frame_size):
+        """Model yükleme, (gerekirse) ayrı tracker ve warmup - arka plan thread'i"""
+        try:
+            start = time.perf_counter()
+            backend = create_backend(model_path)
+            # Ultralytics tam frame'de kendi tracker'ını (model.track) kullanır;
+            # ROI modunda ve diğer backend'lerde tracking ayrı yapılır
+            model = getattr(backend, 'model', None)
+            tracker = None
+            if self.roi_tiler is not None or model is None:
+                tracker = StreamTracker(Config.TRACKER_CONFIG, fps)
+            self.startup_times['model_load'] = time.perf_counter() - start
             
-            if ret:
-                current_height, current_width = frame.shape[:2]
-                saved_height = data["frame_size"]["height"]
-                saved_width = data["frame_size"]["width"]
-                
-                # Boyutlar farklıysa ölçeklendirme yap
-                if current_height != saved_height or current_width != saved_width:
-                    scale_x = current_width / saved_width
-                    scale_y = current_height / saved_height
-                    
-                    scaled_zones = {}
-                    for zone_name, zone_info in data["zones"].items():
-                        coords = zone_info["coords"]
-                        scaled_coords = [
-                            int(coords[0] * scale_x),  # x1
-                            int(coords[1] * scale_y),  # y1
-                            int(coords[2] * scale_x),  # x2
-                            int(coords[3] * scale_y)   # y2
-                        ]
-                        scaled_zones[zone_name] = {
-                            "coords": scaled_coords,
-                            "count": zone_info["count"]
-                        }
-                    return scaled_zones
-                
-                return data["zones"]
+            # Warmup: ilk frame'lerin gecikmesi başlangıca taşınır
+            if frame_size is not None:
+                start = time.perf_counter()
+                width, height = frame_size
+                images, imgsz = self._inputs(np.zeros((height, width, 3), dtype=np.uint8))
+                warmup(backend, images, imgsz)
+                self.startup_times['warmup'] = time.perf_counter() - start
             
-        # Varsayılan zone'lar
-        return {
-            "zone1": {"coords": [100, 100, 300, 300], "count": 0},
-            "zone2": {"coords": [400, 100, 600, 300], "count": 0},
-            "zone3": {"coords": [700, 100, 900, 300], "count": 0}
-        }
+            self.device, self.model, self.tracker = backend.device, model, tracker
+            self.backend = backend
+        except Exception as e:
+            self._backend_error = e
+        finally:
+            self._backend_ready.set()
+    
+    def wait_until_ready(self):
+        """Model yüklenip ısınana kadar bekle; yükleme hatasını bu thread'de yükselt"""
+        self._backend_ready.wait()
+        error = self._backend_error
+        if error is not None:
+            # Eksik paket (ör. onnxruntime, openvino) arka plan thread'inde fark edilir; adıyla bildirilir
+            missing = f" (eksik paket: {error.name})" if isinstance(error, ImportError) and error.name else ""
+            raise RuntimeError(f"Model yüklenemedi{missing}: {error}") from error
+    
+    def _inputs(self, frame):
+        """Detector girişleri ve giriş boyutu (ROI modunda kırpıntılar)"""
+        if self.roi_tiler is None:
+            return [frame], None
+        return self.roi_tiler.crops(frame), min(self.roi_tiler.imgsz(), Config.ROI_MAX_IMGSZ)
 
-    def _format_detections(self, results):
-        # CUDA hatası için güncellendi
-        boxes = results.boxes.xyxy.to('cpu').numpy()  # Direkt CPU'ya taşı
-        scores = results.boxes.conf.to('cpu').numpy()
-        class_ids = results.boxes.cls.to('cpu').numpy().astype(int)
+    def detect(self, frame):
+        """Frame için track'leri döndür; stride dışındaki frame'lerde kutular tahmin edilir"""
+        frame_index = self.frame_index
+        self.frame_index += 1
         
-        return sv.Detections(
-            xyxy=boxes,
-            confidence=scores,
-            class_id=class_ids
-        )
-
-    def _draw_results(self, frame, tracks):
-        # Tespit kutularını çiz - ince çizgi (thickness=1) ve mavi renk
-        for box, track_id in zip(tracks.xyxy, tracks.tracker_id):
-            x1, y1, x2, y2 = map(int, box)
-            # Bounding box - ince mavi çizgi (BGR: 255, 0, 0)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 1)
-            
-            # ID yazısı - küçük punto ve mavi renk
-            # Font scale 0.5 (daha küçük yazı)
-            cv2.putText(frame, 
-                       f"ID: {track_id}", 
-                       (x1, y1-5),  # Biraz daha yukarı
-                       cv2.FONT_HERSHEY_SIMPLEX, 
-                       0.4,  # Font boyutu küçültüldü
-                       (255, 0, 0),  # Mavi renk (BGR)
-                       1)  # Yazı kalınlığı
-
-        # Bölgeleri çiz
-        for zone_name, zone_info in self.zones.items():
-            x1, y1, x2, y2 = zone_info["coords"]
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)  # Zone çizgileri aynı kalınlıkta
-            cv2.putText(frame, 
-                       f"{zone_name}: {zone_info['count']}", 
-                       (x1, y1-10),
-                       cv2.FONT_HERSHEY_SIMPLEX, 
-                       0.9, 
-                       (0, 0, 255), 
-                       2)
-
-    def _draw_cycle_times(self, frame, current_cycles):
-        """Frame üzerine cycle time bilgilerini çiz"""
-        # Her zone için ayrı y-offset takibi
-        zone_y_offsets = {zone_name: 0 for zone_name in self.zones.keys()}
+        if self.motion_gate is not None:
+            with self.metrics.stage('motion_gate'):
+                moving = self.motion_gate.check(frame)
+            if not moving:
+                self._gate_closed = True
+                self.metrics.inc('inference_skipped', reason='motion')
+                return self._last_detections
+        if self._gate_closed:
+            # Hareket yeniden başladı: eski hızlarla tahmin yerine inference yap
+            self._gate_closed = False
+            self.scheduler.reset()
         
-        for track_id, zones in current_cycles.items():
-            for zone_name, time_in_zone in zones.items():
-                try:
-                    if zone_name in self.zones:
-                        zone_coords = self.zones[zone_name]["coords"]
-                        x1, y1 = zone_coords[0], zone_coords[1]
-                        
-                        # Y pozisyonunu hesapla (20 piksel aralıklarla)
-                        text_y = y1 - 25 - (zone_y_offsets[zone_name] * 15)
-                        
-                        # Metni hazırla ve çiz
-                        text = f"ID:{track_id} {time_in_zone:.1f}s"
-                        cv2.putText(
-                            frame,
-                            text,
-                            (x1, text_y),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.4,  # Font boyutu küçültüldü
-                            (0, 255, 0),
-                            1    # Çizgi kalınlığı azaltıldı
-                        )
-                        
-                        # Y-offset'i güncelle
-                        zone_y_offsets[zone_name] += 1
-                except Exception as e:
-                    print(f"Cycle time çiziminde hata: track_id={track_id}, zone={zone_name}, hata={str(e)}")
-                    continue
+        if self.scheduler.should_infer(frame_index):
+            detections = self._infer(frame)
+            self.propagator.observe(detections, frame_index)
+            self.scheduler.update(self.propagator.max_speed())
+        else:
+            with self.metrics.stage('propagate'):
+                detections = self.propagator.predict(frame_index)
+            self.metrics.inc('inference_skipped', reason='stride')
+        
+        self._last_detections = detections
+        return detections
     
-    def process_frame(self, frame):
-        # Model ile tespit ve tracking
-        with torch.no_grad():
-            results = self.model.track(
-                frame,
-                conf=Config.CONFIDENCE_THRESHOLD,
-                iou=Config.IOU_THRESHOLD,
-                tracker=Config.TRACKER_CONFIG,
-                persist=True,
-                device=self.device
-            )[0]
+    def _infer(self, frame):
+        """Model ile tespit ve tracking; track yoksa None döner"""
+        if self.backend is None:
+            self.wait_until_ready()
+        if self.tracker is not None:
+            return self._infer_tracked(frame)
         
-        # Sonuçları CPU'ya taşı
-        if results.boxes.id is not None:
-            boxes = results.boxes.xyxy.cpu().numpy()
-            track_ids = results.boxes.id.cpu().numpy().astype(int)
-            scores = results.boxes.conf.cpu().numpy()
-            class_ids = results.boxes.cls.cpu().numpy().astype(int)
-            
-            # Detections oluştur
-            detections = sv.Detections(
-                xyxy=boxes,
-                confidence=scores,
-                class_id=class_ids,
-                tracker_id=track_ids
-            )
-            
-            # Bölge sayımlarını güncelle
-            self.zone_counter.update(detections)
-            
-            # Cycle time analizi
-            self.cycle_analyzer.update(detections)
-            current_cycles = self.cycle_analyzer.get_current_cycle_times()
-            
-            # Görselleştirme
-            self._draw_results(frame, detections)
-            self._draw_cycle_times(frame, current_cycles)
-            
-            # Her 1000 frame'de bir istatistikleri kaydet
-            if hasattr(self, 'frame_count'):
-                self.frame_count += 1
-            else:
-                self.frame_count = 0
-                
-            if self.frame_count % 1000 == 0:
-                self.cycle_analyzer.save_statistics('cycle_time_stats.json')
+        with self.metrics.stage('inference'):
+            results = self.backend.track(frame, Config.TRACKER_CONFIG)
         
-        return frame
\ No newline at end of file
+        if results.boxes.id is None:
+            return None
+        
+        # Track'li Boxes.data [x1, y1, x2, y2, id, conf, cls]: tek cihaz -> host kopyası
+        with self.metrics.stage('transfer'):
+            return self.buffers.from_tensor(results.boxes.data)
+    
+    def _infer_tracked(self, frame):
+        """Tespit (ROI modunda kırpıntılar tek batch'te) + ayrı tracker"""
+        images, imgsz = self._inputs(frame)
+        with self.metrics.stage('inference'):
+            results = self.backend.predict(images, imgsz)
+        
+        with self.metrics.stage('transfer'):
+            if self.roi_tiler is None:
+                xyxy, scores, class_ids = results[0]
+            else:
+                xyxy, scores, class_ids = self.roi_tiler.merge(results, Config.IOU_THRESHOLD)
+        with self.metrics.stage('tracking'):
+            return self.tracker.update(xyxy, scores, class_ids, frame)
+    
+    def analyze(self, frame, detections, timestamp=None, render=True):
+        """Zone sayımı, cycle time analizi ve (render ise) çizim"""
+        if self.recorder is not None:
+            self.recorder.write(timestamp, detections)
+        return self.analytics.analyze(frame, detections, timestamp, render)
+    
+    def process_frame(self, frame, timestamp=None, render=True):
+        """Frame'i işle; timestamp verilirse (medya saati) olaylar onunla damgalanır.
+        render=False (headless) ise çizim yapılmaz, yalnızca analiz çalışır."""
+        with self.metrics.stage('detect'):
+            detections = self.detect(frame)
+        return self.analyze(frame, detections, timestamp, render)
@@ -0,0 +1,142 @@
+import json
+import os
+import numpy as np
+from detections import DetectionBatch
+
+# Frame tablosu: her frame için zaman damgası ve kutu tablosundaki aralık
+# count == -1: tracker çıktısı yok (detections None)
+FRAME_DTYPE = np.dtype([
+    ('frame_index', '<i8'),
+    ('timestamp', '<f8'),
+    ('offset', '<i8'),
+    ('count', '<i4'),
+])
+
+# Kutu başına 26 byte
+BOX_DTYPE = np.dtype([
+    ('xyxy', '<f4', (4,)),
+    ('tracker_id', '<i4'),
+    ('confidence', '<f4'),
+    ('class_id', '<i2'),
+])
+
+FRAMES_FILE = 'frames.bin'
+BOXES_FILE = 'boxes.bin'
+META_FILE = 'meta.json'
+
+
+class DetectionRecorder:
+    """Frame başına tracker çıktısını kayıt klasörüne ekler.
+
+    Frame ve kutu tabloları ham ikili dosyalara sırayla yazılır; okuma
+    tarafı (DetectionRecording) bunları memory-map ile açar. Meta dosyası
+    (video, fps, frame boyutu) başta yazılır, close() sayıları günceller.
+    """
+
+    def __init__(self, directory, video_path=None, fps=None, frame_size=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.meta = {
+            'version': 1,
+            'video_path': video_path,
+            'fps': fps,
+            'frame_size': list(frame_size) if frame_size is not None else None,
+            'frames': 0,
+            'boxes': 0,
+        }
+        self._frames = open(os.path.join(directory, FRAMES_FILE), 'wb')
+        self._boxes = open(os.path.join(directory, BOXES_FILE), 'wb')
+        self._frame_row = np.zeros(1, dtype=FRAME_DTYPE)
+        self._write_meta()
+
+    def _write_meta(self):
+        tmp_path = os.path.join(self.directory, META_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=4)
+        os.replace(tmp_path, os.path.join(self.directory, META_FILE))
+
+    def write(self, timestamp, detections):
+        """Bir frame'in tracker çıktısını ekle (None: track yok)"""
+        row = self._frame_row[0]
+        row['frame_index'] = self.meta['frames']
+        row['timestamp'] = timestamp
+        row['offset'] = self.meta['boxes']
+
+        if detections is None:
+            row['count'] = -1
+        else:
+            count = len(detections.tracker_id)
+            row['count'] = count
+            if count:
+                boxes = np.empty(count, dtype=BOX_DTYPE)
+                boxes['xyxy'] = detections.xyxy
+                boxes['tracker_id'] = detections.tracker_id
+                boxes['confidence'] = 0.0 if detections.confidence is None else detections.confidence
+                boxes['class_id'] = 0 if detections.class_id is None else detections.class_id
+                self._boxes.write(boxes.tobytes())
+                self.meta['boxes'] += count
+
+        self._frames.write(self._frame_row.tobytes())
+        self.meta['frames'] += 1
+
+    def close(self):
+        if self._frames is None:
+            return
+        self._frames.close()
+        self._boxes.close()
+        self._frames = self._boxes = None
+        self._write_meta()
+
+
+class DetectionRecording:
+    """Kaydedilmiş tracker çıktısını memory-map ile okur (model ve video decode yok)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        # Kayıt yarıda kaldıysa sayılar dosya boyutundan alınır
+        self.frames = self._map(FRAMES_FILE, FRAME_DTYPE)
+        self.boxes = self._map(BOXES_FILE, BOX_DTYPE)
+        # Kutuları diske ulaşmamış son frame'ler atılır
+        if len(self.frames):
+            complete = self.frames['offset'] + np.maximum(self.frames['count'], 0) <= len(self.boxes)
+            self.frames = self.frames[:len(complete) if complete.all() else int(np.argmin(complete))]
+
+    def _map(self, name, dtype):
+        path = os.path.join(self.directory, name)
+        count = os.path.getsize(path) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        # Düz ndarray view: memmap alt sınıfının satır başı ek yükü olmadan aynı eşleme
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,)).view(np.ndarray)
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def fps(self):
+        return self.meta.get('fps')
+
+    @property
+    def frame_size(self):
+        """(genişlik, yükseklik) veya None"""
+        size = self.meta.get('frame_size')
+        return tuple(size) if size else None
+
+    def detections(self, i):
+        """i. frame'in (timestamp, DetectionBatch veya None) çifti"""
+        frame = self.frames[i]
+        count = int(frame['count'])
+        if count < 0:
+            return float(frame['timestamp']), None
+        
+        # Kayıt boyunca saklanabilsin diye her frame kendi bloğunu alır
+        offset = int(frame['offset'])
+        boxes = self.boxes[offset:offset + count]
+        return float(frame['timestamp']), DetectionBatch.from_columns(
+            boxes['xyxy'], boxes['tracker_id'], boxes['confidence'], boxes['class_id'])
+
+    def __iter__(self):
+        for i in range(len(self.frames)):
+            yield self.detections(i)
@@ -0,0 +1,96 @@
+import numpy as np
+from config import Config
+
+# Sütun düzeni ultralytics'in track'li Boxes.data'sı ve tracker çıktısıyla aynı:
+# [x1, y1, x2, y2, track_id, conf, cls]
+TRACK_ID, CONFIDENCE, CLASS_ID = 4, 5, 6
+N_COLUMNS = 7
+
+
+class DetectionBatch:
+    """Bir frame'in track'leri: tek bitişik (N, 7) blok ve isimli sütun görünümleri.
+
+    xyxy / confidence float32, tracker_id / class_id aynı belleğin int32
+    görünümleridir; sütunlar için kopya yapılmaz. Blok DetectionBuffers'tan
+    geldiyse birkaç frame sonra yeniden kullanılır: frame'den uzun saklanacak
+    değerler kopyalanmalıdır.
+    """
+
+    __slots__ = ('data', 'xyxy', 'tracker_id', 'confidence', 'class_id')
+
+    def __init__(self, data):
+        self.data = data
+        ints = data.view(np.int32)
+        self.xyxy = data[:, :4]
+        self.tracker_id = ints[:, TRACK_ID]
+        self.confidence = data[:, CONFIDENCE]
+        self.class_id = ints[:, CLASS_ID]
+
+    def __len__(self):
+        return len(self.data)
+
+    @classmethod
+    def from_columns(cls, xyxy, tracker_id, confidence=None, class_id=None, out=None):
+        """Ayrı dizilerden batch (out verilirse o blokta, yoksa yeni blokta)"""
+        data = np.empty((len(tracker_id), N_COLUMNS), dtype=np.float32) if out is None else out
+        batch = cls(data)
+        batch.xyxy[:] = xyxy
+        batch.tracker_id[:] = tracker_id
+        batch.confidence[:] = 0.0 if confidence is None else confidence
+        batch.class_id[:] = 0 if class_id is None else class_id
+        return batch
+
+    @classmethod
+    def _from_float_rows(cls, data):
+        """Satırları [.., track_id, conf, cls] float olarak yazılmış blokta ID / sınıf
+        sütunlarını yerinde int32'ye çevir"""
+        batch = cls(data)
+        batch.tracker_id[:] = data[:, TRACK_ID]
+        batch.class_id[:] = data[:, CLASS_ID]
+        return batch
+
+
+class DetectionBuffers:
+    """Frame başına yeni bellek ayırmamak için dönüşümlü kullanılan sabit sayıda blok.
+
+    Bir batch, size kadar yeni batch alınana kadar geçerlidir; bu yüzden size
+    pipeline'da aynı anda işlenen frame sayısından (frame havuzu) büyük olmalıdır.
+    Blok, daha fazla satır gerektiğinde büyütülür.
+    """
+
+    def __init__(self, size=None, capacity=64):
+        # Pipeline frame havuzu (2 * kuyruk + 3) + tahmin / hareket kapısında tutulanlar
+        size = size or 2 * Config.PIPELINE_QUEUE_SIZE + 5
+        self._blocks = [np.empty((capacity, N_COLUMNS), dtype=np.float32) for _ in range(size)]
+        self._next = 0
+
+    def take(self, rows):
+        """Sıradaki bloğun ilk rows satırı"""
+        slot = self._next
+        self._next = (slot + 1) % len(self._blocks)
+        block = self._blocks[slot]
+        if len(block) < rows:
+            block = self._blocks[slot] = np.empty((max(rows, 2 * len(block)), N_COLUMNS),
+                                                  dtype=np.float32)
+        return block[:rows]
+
+    def from_tracks(self, tracks):
+        """Tracker çıktısından ([x1, y1, x2, y2, track_id, score, cls, ...]) batch"""
+        data = self.take(len(tracks))
+        data[:] = tracks[:, :N_COLUMNS]
+        return DetectionBatch._from_float_rows(data)
+
+    def from_tensor(self, boxes_data):
+        """(N, 7) tensor'dan (track'li Boxes.data): tüm sütunlar tek cihaz -> host
+        kopyasıyla doğrudan bloğa yazılır (float16 ise tür aynı kopyada çevrilir)"""
+        import torch
+
+        data = self.take(len(boxes_data))
+        torch.from_numpy(data).copy_(boxes_data)
+        return DetectionBatch._from_float_rows(data)
+
+    def copy(self, batch):
+        """Batch'in bu halkadaki kopyası"""
+        data = self.take(len(batch))
+        np.copyto(data, batch.data)
+        return DetectionBatch(data)
@@ -0,0 +1,71 @@
+import threading
+import time
+import cv2
+from config import Config
+
+
+def preview(frame, scale):
+    """Gösterim kopyası: ölçek 1'den farklıysa küçültülmüş (INTER_AREA)"""
+    if scale != 1.0:
+        return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return frame.copy()  # Kaynak buffer havuza geri dönebilir
+
+
+class Display:
+    """Operatör ekranı: pencereler kendi thread'inde, saniyede en fazla fps kez güncellenir.
+
+    Analiz tarafı yalnızca submit() ile son frame'i bırakır (küçültülmüş kopya) ve
+    beklemez; imshow / waitKey analiz hızını etkilemez. due() False iken frame
+    gösterilmeyeceği için çizim de atlanabilir. Pencerede 'q' ile quit_requested kurulur.
+    """
+
+    def __init__(self, fps=None, scale=None):
+        fps = Config.DISPLAY_FPS if fps is None else fps
+        self.interval = 1.0 / fps if fps else 0.0
+        self.scale = Config.DISPLAY_SCALE if scale is None else scale
+        self.quit_requested = threading.Event()
+        self.shown = 0
+        self.failed = False  # Pencere açılamadı (ör. GUI'siz OpenCV): analiz headless sürer
+
+        self._frames = {}     # pencere -> gösterilmeyi bekleyen son frame
+        self._next_due = {}   # pencere -> bir sonraki gösterim anı (perf_counter)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name='display', daemon=True)
+        self._thread.start()
+
+    def due(self, window):
+        """Bu pencere için yeni frame gösterme zamanı geldi mi"""
+        return not self.failed and time.perf_counter() >= self._next_due.get(window, 0.0)
+
+    def submit(self, window, frame):
+        """Frame'in (ölçeklenmiş) kopyasını gösterime bırak; bekleyen eski frame atılır"""
+        image = preview(frame, self.scale)
+        with self._lock:
+            self._frames[window] = image
+        self._next_due[window] = time.perf_counter() + self.interval
+        self._wake.set()
+
+    def _loop(self):
+        try:
+            while not self._closed.is_set():
+                # Yeni frame yoksa da pencereler olay döngüsüyle canlı tutulur
+                self._wake.wait(0.03)
+                self._wake.clear()
+                with self._lock:
+                    frames, self._frames = self._frames, {}
+                for window, frame in frames.items():
+                    cv2.imshow(window, frame)
+                    self.shown += 1
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    self.quit_requested.set()
+            cv2.destroyAllWindows()
+        except cv2.error as e:
+            self.failed = True
+            print(f"Ekran açılamadı, gösterim olmadan devam ediliyor: {getattr(e, 'err', e)}")
+
+    def close(self):
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
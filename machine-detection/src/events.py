@@ -0,0 +1,359 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, asdict
+from config import Config
+
+# Olay türleri
+ZONE_ENTER = 'zone_enter'                   # Nesne zone'a girdi
+ZONE_EXIT = 'zone_exit'                     # Nesne zone'dan çıktı (cycle_time ile)
+COUNT_INCREMENT = 'count_increment'         # Zone sayımı arttı (count: yeni sayım)
+TRACK_REASSOCIATED = 'track_reassociated'   # Yeni track kaybolan track'le eşleşti (previous_id)
+EVENT_TYPES = (ZONE_ENTER, ZONE_EXIT, COUNT_INCREMENT, TRACK_REASSOCIATED)
+
+DROP_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+@dataclass(frozen=True)
+class Event:
+    type: str
+    timestamp: float
+    track_id: int
+    zone: str = None
+    stream: str = None
+    count: int = None         # count_increment
+    cycle_time: float = None  # zone_exit
+    previous_id: int = None   # track_reassociated
+
+    def to_dict(self):
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+    def message(self):
+        """Konsol satırı (eski print çıktısıyla aynı metin)"""
+        if self.type == ZONE_ENTER:
+            text = f"Box ID {self.track_id} entered {self.zone}"
+        elif self.type == ZONE_EXIT:
+            text = f"Box ID {self.track_id} exited {self.zone} after {self.cycle_time:.2f} seconds"
+        elif self.type == COUNT_INCREMENT:
+            text = f"ID {self.track_id} completed {self.zone}. New count: {self.count}"
+        else:
+            text = f"ID {self.track_id} reassociated with lost ID {self.previous_id}"
+        return text if self.stream is None else f"[{self.stream}] {text}"
+
+
+class EventPublisher:
+    """Bir akışın olaylarını bus'a gönderir (stream alanı sabit)"""
+
+    __slots__ = ('bus', 'stream')
+
+    def __init__(self, bus, stream=None):
+        self.bus = bus
+        self.stream = stream
+
+    def emit(self, type, timestamp, track_id, zone=None, **fields):
+        self.bus.publish(Event(type, timestamp, track_id, zone, self.stream, **fields))
+
+
+class EventTee:
+    """Olayları aynı frame'de birden fazla hedefe (EventPublisher, ClipRecorder) iletir"""
+
+    __slots__ = ('targets',)
+
+    def __init__(self, *targets):
+        self.targets = [target for target in targets if target is not None]
+
+    def emit(self, type, timestamp, track_id, zone=None, **fields):
+        for target in self.targets:
+            target.emit(type, timestamp, track_id, zone, **fields)
+
+
+class EventBus:
+    """Zone olaylarını frame döngüsünden ayıran süreç içi olay kuyruğu.
+
+    publish() yalnızca deque'ye ekler (GIL altında atomik, kilit yok) ve hiçbir
+    zaman G/Ç yapmaz. Arka plan thread'i kuyruğu flush_interval'da bir, kuyruk
+    yarıya dolunca hemen boşaltır ve olayları batch_size'lık gruplar halinde
+    sink'lere yazar; yavaş bir sink yalnızca bu thread'i bekletir. Kuyruk
+    dolduğunda drop_policy uygulanır: 'drop_oldest' en eski olayı atar,
+    'drop_newest' yeni olayı atar, 'block' dispatcher'ı uyandırıp bir grubun
+    boşaltılmasını en fazla block_timeout saniye bekler, sonra yeni olayı atar.
+    Sayaçlar (published, dropped, delivered, sink_errors) tek üretici thread
+    varsayar (analiz thread'i).
+    """
+
+    def __init__(self, sinks, queue_size=10000, drop_policy='drop_oldest', batch_size=500,
+                 flush_interval=0.2, block_timeout=0.05, metrics=None):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Geçersiz olay kuyruğu politikası: {drop_policy} ({', '.join(DROP_POLICIES)})")
+        self.sinks = list(sinks)
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.metrics = metrics
+
+        self.published = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.sink_errors = {sink.name: 0 for sink in self.sinks}
+        self._reported = {}  # Metriklere son aktarılan sayaçlar
+
+        self._queue = deque()
+        self._high_water = max(queue_size // 2, 1)
+        self._wake = threading.Event()     # Kuyruk yarıya doldu veya kapanış: hemen boşalt
+        self._drained = threading.Event()  # Dispatcher bir grup aldı ('block' bekleyişi için)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='event-bus', daemon=True)
+        self._thread.start()
+
+    def publisher(self, stream=None):
+        return EventPublisher(self, stream)
+
+    def publish(self, event):
+        """Olayı kuyruğa ekle; atıldıysa False"""
+        queue = self._queue
+        if len(queue) >= self.queue_size:
+            if self.drop_policy == 'drop_oldest':
+                try:
+                    queue.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass  # Bu arada dispatcher boşalttı; atılan olay yok
+            elif not self._wait_for_space():
+                self.dropped += 1
+                return False
+        queue.append(event)
+        self.published += 1
+        if len(queue) >= self._high_water and not self._wake.is_set():
+            self._wake.set()
+        return True
+
+    def _wait_for_space(self):
+        if self.drop_policy != 'block':
+            return False
+        deadline = time.perf_counter() + self.block_timeout
+        while len(self._queue) >= self.queue_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            self._drained.clear()
+            self._wake.set()
+            if len(self._queue) < self.queue_size:
+                break  # clear() öncesinde boşaltıldı
+            self._drained.wait(remaining)
+        return True
+
+    def _drain(self):
+        queue = self._queue
+        while queue:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(queue.popleft())
+            except IndexError:
+                pass
+            self._drained.set()
+            for sink in self.sinks:
+                try:
+                    sink.write(batch)
+                except Exception as e:
+                    self.sink_errors[sink.name] += 1
+                    if self.sink_errors[sink.name] == 1:
+                        print(f"Olay sink'i '{sink.name}' yazamadı (sonraki hatalar yalnızca sayılır): {str(e)}")
+                        print(traceback.format_exc())
+            self.delivered += len(batch)
+
+    def _report(self):
+        if self.metrics is None or not self.metrics.enabled:
+            return
+        self.metrics.set_gauge('event_queue_depth', len(self._queue))
+        counters = {('events_published', ()): self.published, ('events_dropped', ()): self.dropped}
+        counters.update({('event_sink_errors', (('sink', name),)): value
+                         for name, value in self.sink_errors.items()})
+        for (name, labels), value in counters.items():
+            delta = value - self._reported.get((name, labels), 0)
+            if delta:
+                self.metrics.inc(name, delta, **dict(labels))
+                self._reported[(name, labels)] = value
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closed.is_set()
+            self._drain()
+            self._report()
+            if closing:
+                break
+        # Sink'ler kendi thread'lerinde (ör. SQLite bağlantısı) kapatılır
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"Olay sink'i '{sink.name}' kapatılırken hata: {str(e)}")
+
+    def stats(self):
+        return {'published': self.published, 'dropped': self.dropped, 'delivered': self.delivered,
+                'queued': len(self._queue), 'sink_errors': dict(self.sink_errors)}
+
+    def close(self):
+        """Kuyruktaki olayları yaz ve sink'leri kapat"""
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+
+    def print_summary(self):
+        stats = self.stats()
+        errors = ', '.join(f"{name}: {count}" for name, count in stats['sink_errors'].items() if count)
+        print(f"  Olaylar: {stats['published']} yayınlandı, {stats['delivered']} sink'lere iletildi, "
+              f"{stats['dropped']} atıldı" + (f", sink hataları ({errors})" if errors else ""))
+
+
+class ConsoleSink:
+    """Olay satırlarını konsola yazar (frame döngüsü terminali beklemez)"""
+
+    name = 'console'
+
+    def write(self, events):
+        print('\n'.join(event.message() for event in events))
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """Olayları append-only JSON Lines dosyasına yazar (batch başına tek write + flush)"""
+
+    name = 'jsonl'
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, events):
+        self._file.write(''.join(json.dumps(event.to_dict(), separators=(',', ':')) + '\n'
+                                 for event in events))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class SqliteSink:
+    """Olayları SQLite 'events' tablosuna yazar (batch başına tek transaction, WAL).
+
+    Bağlantı ilk yazımda dispatcher thread'inde açılır; SQLite bağlantıları
+    açıldıkları thread'de kullanılmalıdır.
+    """
+
+    name = 'sqlite'
+    COLUMNS = ('type', 'timestamp', 'track_id', 'zone', 'stream', 'count', 'cycle_time', 'previous_id')
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS events (type TEXT NOT NULL, timestamp REAL NOT NULL, '
+                     'track_id INTEGER, zone TEXT, stream TEXT, count INTEGER, cycle_time REAL, '
+                     'previous_id INTEGER)')
+        conn.execute('CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp)')
+        conn.commit()
+        return conn
+
+    def write(self, events):
+        if self._conn is None:
+            self._conn = self._connect()
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO events ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                [(e.type, e.timestamp, e.track_id, e.zone, e.stream, e.count, e.cycle_time, e.previous_id)
+                 for e in events])
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class UnixSocketSink:
+    """Olayları yerel Unix soketini dinleyen sürece JSON Lines olarak gönderir.
+
+    Dinleyen yoksa batch atılır (hata olarak sayılır) ve bağlantı en erken
+    retry_interval sonra yeniden denenir; gönderim timeout ile sınırlıdır.
+    """
+
+    name = 'socket'
+
+    def __init__(self, path, timeout=0.5, retry_interval=1.0):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("Unix soketi bu platformda desteklenmiyor (Config.EVENT_SINKS)")
+        self.path = path
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._sock = None
+        self._next_attempt = 0.0
+
+    def _connect(self):
+        if time.monotonic() < self._next_attempt:
+            raise ConnectionError(f"Olay soketine bağlanılamadı: {self.path}")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            self._next_attempt = time.monotonic() + self.retry_interval
+            raise
+        self._sock = sock
+
+    def write(self, events):
+        if self._sock is None:
+            self._connect()
+        data = ''.join(json.dumps(event.to_dict(), separators=(',', ':')) + '\n' for event in events)
+        try:
+            self._sock.sendall(data.encode('utf-8'))
+        except OSError:
+            self.close()
+            self._next_attempt = time.monotonic() + self.retry_interval
+            raise
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+def create_event_bus(sinks=None, metrics=None):
+    """Config'e göre EventBus; sink tanımlı değilse None (olay üretilmez)"""
+    sinks = Config.EVENT_SINKS if sinks is None else sinks
+    if not sinks:
+        return None
+    factories = {
+        'console': ConsoleSink,
+        'jsonl': lambda: JsonlSink(Config.EVENT_JSONL_PATH),
+        'sqlite': lambda: SqliteSink(Config.EVENT_SQLITE_PATH),
+        'socket': lambda: UnixSocketSink(Config.EVENT_SOCKET_PATH),
+    }
+    unknown = [name for name in sinks if name not in factories]
+    if unknown:
+        raise ValueError(f"Bilinmeyen olay sink'i: {', '.join(unknown)} ({', '.join(factories)})")
+    return EventBus([factories[name]() for name in sinks],
+                    queue_size=Config.EVENT_QUEUE_SIZE,
+                    drop_policy=Config.EVENT_DROP_POLICY,
+                    batch_size=Config.EVENT_BATCH_SIZE,
+                    flush_interval=Config.EVENT_FLUSH_INTERVAL,
+                    block_timeout=Config.EVENT_BLOCK_TIMEOUT,
+                    metrics=metrics)
@@ -1,47 +1,164 @@
+import time
+STARTUP_ORIGIN = time.perf_counter()  # Ağır import'lardan önce: başlangıç raporunun sıfır noktası
+
+import argparse
 import cv2
 from detect import MachineDetector
 from config import Config
+from clock import FrameGapCounter, create_clock
+from display import Display
+from perf import StartupTimer, ThroughputMeter
+from pipeline import Pipeline
+from metrics import create_metrics
+from events import create_event_bus
+from detection_cache import DetectionRecorder
 import traceback  # Hata detayı için ekledik
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Makine tespiti ve cycle time analizi")
+    parser.add_argument('--headless', action='store_true', default=Config.HEADLESS,
+                        help="Çizim ve pencere olmadan maksimum hızda çalış")
+    parser.add_argument('--serial', action='store_true', default=not Config.PIPELINE,
+                        help="Decode/inference/analiz pipeline'ı yerine tek thread'li döngü")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Aşama metriklerini bu porttan Prometheus formatında yayınla")
+    parser.add_argument('--record', default=Config.RECORD_PATH, metavar='DIR',
+                        help="Tracker çıktısını src/replay.py ile modelsiz tekrar analiz için kaydet")
+    parser.add_argument('--clips', default=Config.CLIP_DIR if Config.CLIPS else None, metavar='DIR',
+                        help="Zone olaylarında ön / son kayıtlı klipleri bu klasöre kaydet")
+    parser.add_argument('--history', default=Config.HISTORY_DB_PATH, metavar='DB',
+                        help="Tamamlanan cycle'ları kalıcı SQLite geçmişine ekle (ör. cycle_history.db)")
+    parser.add_argument('--display-fps', type=float, default=Config.DISPLAY_FPS,
+                        help="Ekran güncelleme hızı üst sınırı (0: her frame)")
+    parser.add_argument('--display-scale', type=float, default=Config.DISPLAY_SCALE,
+                        help="Önizleme ölçeği (ör. 0.5)")
+    return parser.parse_args()
+
+def run_serial(detector, cap, clock, display, meter):
+    """Tek thread'li döngü: decode, inference ve analiz sırayla (gösterim Display thread'inde)"""
+    metrics = detector.metrics
+    gaps = FrameGapCounter(cap.get(cv2.CAP_PROP_FPS))
+    frame_index = 0
+    while True:
+        with metrics.stage('read'):
+            ret, frame = cap.read()
+        if not ret:
+            print("Video bitti.")
+            break
+
+        # İşleme sürerken kaynağın atladığı frame'ler
+        gap = gaps.update(cap)
+        if gap:
+            metrics.inc('frames_dropped', gap)
+        timestamp = clock.stamp(frame_index, cap.get(cv2.CAP_PROP_POS_MSEC))
+        frame_index += 1
+
+        # Yalnızca ekrana gidecek frame'ler çizilir
+        render = display is not None and display.due('Detection')
+        frame_start = time.perf_counter()
+        processed_frame = detector.process_frame(frame, timestamp, render=render)
+        latency = time.perf_counter() - frame_start
+        meter.record(latency)
+        metrics.observe('frame', latency)
+        metrics.frame()
+
+        if display is None:
+            continue
+
+        if render:
+            with metrics.stage('display'):
+                display.submit('Detection', processed_frame)
+        if display.quit_requested.is_set():
+            break
+
 def main():
-    detector = MachineDetector(
-        model_path=Config.MODEL_PATH,
-        video_path=Config.VIDEO_PATH
-    )
-    
+    startup = StartupTimer(STARTUP_ORIGIN)
+    startup.mark('import')
+    args = parse_args()
+    headless = args.headless
+
     cap = cv2.VideoCapture(Config.VIDEO_PATH)
-    
+
     if not cap.isOpened():
         print("Hata: Video açilamadi!")
         return
-        
+    frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    startup.mark('video açma')
+
+    metrics = create_metrics(args.metrics_port)
+    # Zone olayları arka planda Config.EVENT_SINKS'e yazılır; frame döngüsü beklemez
+    event_bus = create_event_bus(metrics=metrics)
+    # Model arka planda yüklenir (Config.BACKGROUND_MODEL_LOAD); ilk inference onu bekler
+    detector = MachineDetector(
+        model_path=Config.MODEL_PATH,
+        video_path=Config.VIDEO_PATH,
+        fps=cap.get(cv2.CAP_PROP_FPS),
+        metrics=metrics,
+        frame_size=frame_size,
+        events=event_bus.publisher() if event_bus is not None else None,
+        clip_dir=args.clips,
+        history_path=args.history
+    )
+    startup.mark('detector')
+
+    if args.record:
+        detector.recorder = DetectionRecorder(
+            args.record,
+            video_path=Config.VIDEO_PATH,
+            fps=cap.get(cv2.CAP_PROP_FPS),
+            frame_size=frame_size
+        )
+        print(f"Tracker çıktısı kaydediliyor: {args.record}")
+
+    clock = create_clock(Config.CLOCK, cap)
+    display = None if headless else Display(args.display_fps, args.display_scale)
+    meter = ThroughputMeter()
+    meter.start()
+
     try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Video bitti.")
-                break
-                
-            processed_frame = detector.process_frame(frame)
-            
-            cv2.imshow('Detection', processed_frame)
-            
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-            
+        if args.serial:
+            run_serial(detector, cap, clock, display, meter)
+        else:
+            pipeline = Pipeline(detector, cap, clock,
+                                render=not headless,
+                                display=display,
+                                queue_size=Config.PIPELINE_QUEUE_SIZE,
+                                meter=meter,
+                                metrics=metrics)
+            pipeline.run()
+
     except Exception as e:
         print(f"Bir hata oluştu: {str(e)}")
         print("Hata detayı:")
         print(traceback.format_exc())  # Hata stack trace'ini yazdır
     finally:
+        meter.stop()
+
         # İstatistikleri kaydet
         try:
-            detector.cycle_analyzer.save_statistics('cycle_time_stats.json')
+            detector.analytics.close()
         except Exception as save_error:
             print(f"İstatistikler kaydedilirken hata oluştu: {str(save_error)}")
-        
+
+        if detector.recorder is not None:
+            detector.recorder.close()
+        if event_bus is not None:
+            event_bus.close()
+        metrics.close()
         cap.release()
-        cv2.destroyAllWindows()
+        if display is not None:
+            display.close()
+
+        for name, seconds in list(detector.startup_times.items()):
+            startup.add(name, seconds)
+        startup.print_report(meter.first_frame_at)
+        meter.print_summary()
+        metrics.print_summary()
+        if event_bus is not None:
+            event_bus.print_summary()
+        print(f"  Atlanan inference (stride): {detector.scheduler.skipped_frames}")
+        if detector.motion_gate is not None:
+            print(f"  Atlanan inference (hareket yok): {detector.motion_gate.gated_frames}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
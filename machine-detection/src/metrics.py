@@ -0,0 +1,299 @@
+import bisect
+import json
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from config import Config
+
+# Aşama gecikmeleri için histogram sınırları (saniye)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PREFIX = 'machine_detection'
+
+
+class StageHistogram:
+    """Bir aşamanın gecikme histogramı (tüm çalışma) ve son N ölçümü (yüzdelikler için)"""
+
+    __slots__ = ('bucket_counts', 'count', 'total', 'recent')
+
+    def __init__(self, window):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Son kova: +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def quantiles(self, qs=(50, 95, 99)):
+        if not self.recent:
+            return {q: 0.0 for q in qs}
+        values = np.percentile(np.fromiter(self.recent, dtype=np.float64), qs)
+        return dict(zip(qs, values.tolist()))
+
+
+class _StageTimer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Aşama gecikmeleri, fps ve sayaçlar.
+
+    Aşamalar `with metrics.stage('inference'):` ile ölçülür. Değerler
+    Prometheus metin formatında yerel bir HTTP uç noktasından (`serve`) ve
+    periyodik JSON anlık görüntüsünden (`start_snapshots`) okunabilir.
+    Pipeline thread'leri aynı nesneye yazar; güncellemeler kilitle korunur.
+    """
+
+    enabled = True
+
+    def __init__(self, window=2048):
+        self.window = window
+        self.stages = {}             # {aşama: StageHistogram}
+        self.counters = {}           # {(ad, etiketler): değer}
+        self.gauges = {}             # {ad: değer}
+        self.frames = 0
+        self._frame_times = deque(maxlen=window)  # Kayan fps için
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._server = None
+        self._snapshot_stop = threading.Event()
+        self._snapshot_thread = None
+
+    def stage(self, name):
+        """Aşama süresini ölçen context manager"""
+        return _StageTimer(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = StageHistogram(self.window)
+            histogram.observe(seconds)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def frame(self):
+        """İşlenen bir frame'i say (fps için)"""
+        now = time.perf_counter()
+        with self._lock:
+            self.frames += 1
+            self._frame_times.append(now)
+
+    def fps(self):
+        """Son `window` frame üzerinden kayan fps"""
+        with self._lock:
+            if len(self._frame_times) < 2:
+                return 0.0
+            elapsed = self._frame_times[-1] - self._frame_times[0]
+            return (len(self._frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        """Tüm metriklerin JSON'a uygun özeti"""
+        fps = self.fps()
+        with self._lock:
+            stages = {}
+            for name, histogram in self.stages.items():
+                quantiles = histogram.quantiles()
+                stages[name] = {
+                    'count': histogram.count,
+                    'avg_ms': 1000 * histogram.total / histogram.count if histogram.count else 0.0,
+                    'p50_ms': 1000 * quantiles[50],
+                    'p95_ms': 1000 * quantiles[95],
+                    'p99_ms': 1000 * quantiles[99],
+                }
+            counters = {}
+            for (name, labels), value in self.counters.items():
+                key = name if not labels else name + '{' + ','.join(f'{k}={v}' for k, v in labels) + '}'
+                counters[key] = value
+            return {
+                'timestamp': time.time(),
+                'uptime_s': time.time() - self.started_at,
+                'frames': self.frames,
+                'fps': fps,
+                'stages': stages,
+                'counters': counters,
+                'gauges': dict(self.gauges),
+            }
+
+    def render_prometheus(self):
+        """Prometheus metin formatı (exposition format 0.0.4)"""
+        fps = self.fps()
+        lines = [
+            f'# HELP {PREFIX}_frames_total Processed frames',
+            f'# TYPE {PREFIX}_frames_total counter',
+            f'{PREFIX}_frames_total {self.frames}',
+            f'# HELP {PREFIX}_fps Rolling frames per second',
+            f'# TYPE {PREFIX}_fps gauge',
+            f'{PREFIX}_fps {fps:.3f}',
+        ]
+        with self._lock:
+            if self.stages:
+                name = f'{PREFIX}_stage_latency_seconds'
+                lines += [f'# HELP {name} Per-stage latency', f'# TYPE {name} histogram']
+                for stage, histogram in self.stages.items():
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram.bucket_counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+                name = f'{PREFIX}_stage_latency_recent_seconds'
+                lines += [f'# HELP {name} Per-stage latency quantiles over the recent window',
+                          f'# TYPE {name} gauge']
+                for stage, histogram in self.stages.items():
+                    for q, value in histogram.quantiles().items():
+                        lines.append(f'{name}{{stage="{stage}",quantile="{q / 100:g}"}} {value:.6f}')
+
+            declared = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f'{PREFIX}_{name}_total'
+                if metric not in declared:
+                    declared.add(metric)
+                    lines.append(f'# TYPE {metric} counter')
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f'{metric}{{{label_text}}} {value}' if label_text else f'{metric} {value}')
+
+        for name, value in sorted(self.gauges.items()):
+            lines += [f'# TYPE {PREFIX}_{name} gauge', f'{PREFIX}_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def print_summary(self, title="Aşama süreleri"):
+        snapshot = self.snapshot()
+        if not snapshot['stages']:
+            return
+        print(f"\n{title}:")
+        print(f"  {'aşama':<16} {'sayı':>8} {'ort ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, stage in snapshot['stages'].items():
+            print(f"  {name:<16} {stage['count']:>8} {stage['avg_ms']:>8.2f} {stage['p50_ms']:>8.2f} "
+                  f"{stage['p95_ms']:>8.2f} {stage['p99_ms']:>8.2f}")
+        for name, value in snapshot['counters'].items():
+            print(f"  {name}: {value}")
+
+    def serve(self, port, host='127.0.0.1'):
+        """/metrics uç noktasını arka plan thread'inde başlat"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] == '/metrics':
+                    body = metrics.render_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path.split('?')[0] == '/metrics.json':
+                    body = json.dumps(metrics.snapshot()).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Her istek için konsola yazma
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        print(f"Metrikler: http://{host}:{self._server.server_address[1]}/metrics")
+
+    def write_snapshot(self, path):
+        # Yarım yazılmış dosya okunmasın diye geçici dosya + rename
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=4)
+        os.replace(tmp_path, path)
+
+    def start_snapshots(self, path, interval=10.0):
+        """Anlık görüntüyü `interval` saniyede bir JSON dosyasına yaz"""
+        def run():
+            while not self._snapshot_stop.wait(interval):
+                try:
+                    self.write_snapshot(path)
+                except Exception as e:
+                    print(f"Metrik anlık görüntüsü yazılırken hata: {str(e)}")
+                    print(traceback.format_exc())
+            self.write_snapshot(path)
+
+        self._snapshot_thread = threading.Thread(target=run, name='metrics-snapshot', daemon=True)
+        self._snapshot_thread.start()
+
+    def close(self):
+        if self._snapshot_thread is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class NullMetrics:
+    """Metrikler kapalıyken kullanılır; tüm çağrılar boş işlemdir"""
+
+    enabled = False
+    _NULL_STAGE = nullcontext()
+
+    def stage(self, name):
+        return self._NULL_STAGE
+
+    def observe(self, name, seconds):
+        pass
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def set_gauge(self, name, value):
+        pass
+
+    def frame(self):
+        pass
+
+    def print_summary(self, title=None):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_metrics(port=None):
+    """Config'e göre Metrics veya NullMetrics oluştur; port verilirse uç nokta açılır"""
+    port = Config.METRICS_PORT if port is None else port
+    if not (Config.METRICS or port or Config.METRICS_SNAPSHOT_PATH):
+        return NullMetrics()
+
+    metrics = Metrics(window=Config.METRICS_WINDOW)
+    if port:
+        metrics.serve(port, Config.METRICS_HOST)
+    if Config.METRICS_SNAPSHOT_PATH:
+        metrics.start_snapshots(Config.METRICS_SNAPSHOT_PATH, Config.METRICS_SNAPSHOT_INTERVAL)
+    return metrics
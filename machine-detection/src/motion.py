@@ -0,0 +1,211 @@
+import cv2
+import numpy as np
+from config import Config
+from detections import DetectionBuffers
+
+
+class BoxPropagator:
+    """Inference yapılmayan frame'lerde track kutularını sabit hızla ileri taşır.
+
+    Hız, bir track'in son iki inference gözlemi arasındaki kutu farkından
+    (piksel / frame) hesaplanır. Kutu merkezinin son gözlemden kayması
+    max_displacement pikselle sınırlıdır: yavaşlayan veya duran bir nesnenin
+    tahmini kutusu gerçek konumundan en fazla bu kadar uzaklaşır.
+    """
+
+    def __init__(self, max_displacement=None):
+        self.max_displacement = max_displacement
+        self._detections = None
+        self._frame_index = None
+        self._velocity = np.zeros((0, 4), dtype=np.float32)
+        # Son gözlemin track ID'leri ve kutuları (batch bloğu yeniden kullanıldığı için kopya)
+        self._ids = np.zeros(0, dtype=np.int32)
+        self._boxes = np.zeros((0, 4), dtype=np.float32)
+        self.buffers = DetectionBuffers()
+
+    def observe(self, detections, frame_index):
+        """Inference sonucunu kaydet ve track hızlarını güncelle"""
+        previous_index = self._frame_index
+        self._detections = detections
+        self._frame_index = frame_index
+        if detections is None:
+            self._velocity = np.zeros((0, 4), dtype=np.float32)
+            self._ids = np.zeros(0, dtype=np.int32)
+            return
+
+        boxes, ids = detections.xyxy, detections.tracker_id
+        velocity = np.zeros((len(ids), 4), dtype=np.float32)
+        if len(self._ids) and len(ids):
+            # Önceki gözlemde de olan track'ler: ID'ye göre sıralı arama
+            order = np.argsort(self._ids)
+            sorted_ids = self._ids[order]
+            position = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+            seen = sorted_ids[position] == ids
+            previous = order[position[seen]]
+            velocity[seen] = (boxes[seen] - self._boxes[previous]) / max(frame_index - previous_index, 1)
+        self._velocity = velocity
+        self._ids = np.array(ids)
+        self._boxes = np.array(boxes)
+
+    def predict(self, frame_index):
+        """Son gözlemden frame_index'e kadar kutuları tahmin et"""
+        if self._detections is None:
+            return None
+        
+        steps = frame_index - self._frame_index
+        predicted = self.buffers.copy(self._detections)
+        offset = self._velocity * steps
+        if self.max_displacement is not None and len(offset):
+            center = (offset[:, 0:2] + offset[:, 2:4]) / 2
+            distance = np.sqrt((center ** 2).sum(axis=1))
+            offset *= np.minimum(1.0, self.max_displacement / np.maximum(distance, 1e-6))[:, None]
+        predicted.xyxy += offset
+        return predicted
+
+    def max_speed(self):
+        """Track merkezlerinin en yüksek hızı (piksel / frame)"""
+        if len(self._velocity) == 0:
+            return 0.0
+        center_velocity = (self._velocity[:, 0:2] + self._velocity[:, 2:4]) / 2
+        return float(np.sqrt((center_velocity ** 2).sum(axis=1)).max())
+
+
+class StrideScheduler:
+    """Hangi frame'lerde detector'ın çalışacağına karar verir.
+
+    Sabit modda her `stride` frame'de bir inference yapılır. Adaptif modda
+    stride, en hızlı track'in iki inference arasında `max_displacement`
+    pikselden fazla ilerlemeyeceği şekilde seçilir.
+
+    Kaçırılan bir giriş/çıkış en geç bir sonraki inference'ta yakalanır, bu
+    yüzden gerçek bir olay en fazla (stride - 1) / fps saniye kayar ve cycle
+    time hatası 2 * (stride - 1) / fps ile sınırlıdır. max_stride bu sınır
+    `tolerance` saniyeyi aşmayacak şekilde hesaplanır.
+
+    Bu sınır tahmin edilen kutuların yol açtığı hatayı kapsamaz: atlanan
+    frame'lerde kutular sabit hızla ileri taşınır (BoxPropagator). Zone
+    kenarının max_displacement pikseli içinde yavaşlayan veya duran bir
+    nesnenin tahmini kutusu kenarı geçebilir. Bu durumda gerçekte olmayan bir
+    giriş/çıkış üretilir: çıkış sayılır ve cycle kapanır, sayım geri alınmaz.
+    Bu hata yalnızca kenara bu mesafeden yakın nesnelerde görülebilir.
+    """
+
+    def __init__(self, stride=1, adaptive=False, tolerance=0.2, fps=30, max_displacement=8.0):
+        fps = fps if fps and fps > 0 else 30
+        self.max_stride = max(1, 1 + int(tolerance * fps / 2))
+        self.stride = max(1, min(int(stride), self.max_stride))
+        self.adaptive = adaptive
+        self.max_displacement = max_displacement
+        self._last_inference = None
+        self.skipped_frames = 0
+
+    def should_infer(self, frame_index):
+        if self._last_inference is None or frame_index - self._last_inference >= self.stride:
+            self._last_inference = frame_index
+            return True
+        self.skipped_frames += 1
+        return False
+
+    def update(self, max_speed):
+        """Adaptif modda stride'ı track hızına göre güncelle"""
+        if not self.adaptive:
+            return
+        if max_speed <= 0:
+            self.stride = self.max_stride
+        else:
+            self.stride = max(1, min(int(self.max_displacement / max_speed), self.max_stride))
+
+    def reset(self):
+        """Bir sonraki frame'de inference'ı zorla"""
+        self._last_inference = None
+
+
+class MotionGate:
+    """Zone ROI'leri içinde hareket yoksa detector'ı atlatan ucuz ön aşama.
+
+    Zone'ların birleşim dikdörtgeni küçültülüp gri tonlamaya çevrilir ve
+    kayan ortalama arka plandan farkı alınır. Değişen piksel oranı eşiği
+    aşarsa hareket var sayılır; hareket bittikten sonra `hold_frames`
+    frame boyunca detector çalışmaya devam eder.
+    """
+
+    def __init__(self, zones, scale=0.25, threshold=25, min_changed_fraction=0.002,
+                 hold_frames=30, learning_rate=0.05):
+        self.zones = zones
+        self.scale = scale
+        self.threshold = threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.hold_frames = hold_frames
+        self.learning_rate = learning_rate
+
+        self._roi = None       # (x1, y1, x2, y2) - tam çözünürlükte
+        self._mask = None      # küçültülmüş ROI içindeki zone maskesi
+        self._mask_area = 0
+        self._background = None
+        self._hold = 0
+        self.gated_frames = 0
+
+    def _build_roi(self, frame_shape):
+        height, width = frame_shape[:2]
+        coords = np.asarray([zone["coords"] for zone in self.zones.values()], dtype=np.int64).reshape(-1, 4)
+        if len(coords) == 0:
+            self._roi = (0, 0, width, height)
+        else:
+            self._roi = (max(int(coords[:, 0].min()), 0), max(int(coords[:, 1].min()), 0),
+                         min(int(coords[:, 2].max()), width), min(int(coords[:, 3].max()), height))
+
+        x1, y1, x2, y2 = self._roi
+        small_w = max(1, int((x2 - x1) * self.scale))
+        small_h = max(1, int((y2 - y1) * self.scale))
+        mask = np.zeros((small_h, small_w), dtype=np.uint8)
+        if len(coords) == 0:
+            mask[:] = 255
+        for zx1, zy1, zx2, zy2 in coords.tolist():
+            cv2.rectangle(mask,
+                          (int((zx1 - x1) * self.scale), int((zy1 - y1) * self.scale)),
+                          (int((zx2 - x1) * self.scale), int((zy2 - y1) * self.scale)),
+                          255, -1)
+        self._mask = mask
+        self._mask_area = max(int(np.count_nonzero(mask)), 1)
+
+    def check(self, frame):
+        """Detector çalışmalı mı? (True = hareket var veya bekleme süresi dolmadı)"""
+        if self._roi is None:
+            self._build_roi(frame.shape)
+
+        x1, y1, x2, y2 = self._roi
+        small = cv2.resize(frame[y1:y2, x1:x2], (self._mask.shape[1], self._mask.shape[0]),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+        if self._background is None:
+            self._background = gray
+            self._hold = self.hold_frames
+            return True
+
+        diff = cv2.absdiff(gray, self._background)
+        changed = np.count_nonzero((diff > self.threshold) & (self._mask > 0))
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+
+        if changed / self._mask_area >= self.min_changed_fraction:
+            self._hold = self.hold_frames
+            return True
+        if self._hold > 0:
+            self._hold -= 1
+            return True
+
+        self.gated_frames += 1
+        return False
+
+
+def create_motion_gate(zones):
+    """Config.MOTION_GATE açıksa zone'lar için MotionGate oluştur, değilse None"""
+    if not Config.MOTION_GATE:
+        return None
+    return MotionGate(
+        zones,
+        scale=Config.MOTION_GATE_SCALE,
+        threshold=Config.MOTION_GATE_THRESHOLD,
+        min_changed_fraction=Config.MOTION_GATE_MIN_AREA,
+        hold_frames=Config.MOTION_GATE_HOLD_FRAMES
+    )
@@ -0,0 +1,244 @@
+import argparse
+import os
+import time
+import traceback
+import cv2
+import numpy as np
+from config import Config
+from backends import create_backend, warmup
+from analytics import ZoneAnalytics
+from events import create_event_bus
+from clock import create_clock
+from display import Display
+from perf import ThroughputMeter
+from tracking import StreamTracker
+from zone_engine import load_zones
+from motion import BoxPropagator, StrideScheduler, create_motion_gate
+from roi import create_roi_tiler
+
+
+class StreamContext:
+    """Tek bir kameranın durumu: video kaynağı, zone'lar, tracker ve analiz"""
+
+    def __init__(self, name, video_path, zones_path, output_dir='.', event_bus=None):
+        self.name = name
+        self.video_path = video_path
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise IOError(f"Video açılamadı: {video_path}")
+
+        self.clock = create_clock(Config.CLOCK, self.cap)
+        self.frame_index = 0
+        self.finished = False
+
+        # Frame boyutu açık olan kaynaktan; zone'lar için video ikinci kez açılmaz
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.zones = load_zones(zones_path, video_path, frame_size=(self.width, self.height))
+        self.analytics = ZoneAnalytics(
+            self.zones,
+            stats_path=os.path.join(output_dir, f'cycle_time_stats_{name}.json'),
+            log_dir=(os.path.join(output_dir, Config.CYCLE_LOG_DIR, name)
+                     if Config.CYCLE_LOG_DIR else None),
+            events=event_bus.publisher(name) if event_bus is not None else None,
+            history_path=(os.path.join(output_dir, Config.HISTORY_DB_PATH)
+                          if Config.HISTORY_DB_PATH else None),
+            stream=name,
+            clip_dir=os.path.join(output_dir, Config.CLIP_DIR, name) if Config.CLIPS else None,
+            fps=self.cap.get(cv2.CAP_PROP_FPS)
+        )
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.tracker = StreamTracker(Config.TRACKER_CONFIG, fps)
+        self.scheduler = StrideScheduler(
+            stride=Config.INFERENCE_STRIDE,
+            adaptive=Config.ADAPTIVE_STRIDE,
+            tolerance=Config.STRIDE_CYCLE_TOLERANCE,
+            fps=fps,
+            max_displacement=Config.STRIDE_MAX_DISPLACEMENT
+        )
+        self.propagator = BoxPropagator(max_displacement=Config.STRIDE_MAX_DISPLACEMENT)
+        self.motion_gate = create_motion_gate(self.zones)
+        self.roi_tiler = create_roi_tiler(self.zones)
+        self.gate_closed = False
+        self.last_detections = None
+        self.meter = ThroughputMeter()
+
+    def read(self):
+        """Sıradaki frame'i ve zaman damgasını oku; video bittiyse None"""
+        ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+            return None, None
+        timestamp = self.clock.stamp(self.frame_index, self.cap.get(cv2.CAP_PROP_POS_MSEC))
+        self.frame_index += 1
+        return frame, timestamp
+
+    def close(self):
+        try:
+            self.analytics.close()
+        except Exception as save_error:
+            print(f"[{self.name}] İstatistikler kaydedilirken hata oluştu: {str(save_error)}")
+        self.cap.release()
+
+
+class MultiStreamRunner:
+    """Birden fazla kamerayı tek model kopyasıyla işler.
+
+    Her tick'te tüm aktif akışlardan birer frame toplanır ve tek bir batch
+    forward pass yapılır. Tracking ve zone analizi akış başına ayrıdır.
+    """
+
+    def __init__(self, model_path, streams, render=False, output_dir='.'):
+        self.backend = create_backend(model_path)
+        self.device = self.backend.device
+
+        # Pencereler ayrı thread'de, Config.DISPLAY_FPS hızında; yalnızca gösterilecek frame'ler çizilir
+        self.display = Display() if render else None
+        # Tüm akışların olayları tek bus'tan (stream alanıyla) yazılır
+        self.event_bus = create_event_bus()
+        self.streams = [StreamContext(s['name'], s['video_path'], s['zones_path'], output_dir,
+                                      self.event_bus)
+                        for s in streams]
+
+        # Warmup: tüm akışların girişleriyle aynı batch şekli
+        images, _, imgsz = self._batch_inputs(
+            [(stream, np.zeros((stream.height, stream.width, 3), dtype=np.uint8))
+             for stream in self.streams])
+        warmup(self.backend, images, imgsz)
+
+    def _batch_inputs(self, frames):
+        """(akış, frame) çiftlerinden batch girişleri, akış başına dilimler ve giriş boyutu"""
+        # ROI modunda her akışın kırpıntıları aynı batch'e eklenir
+        images, slices, imgsz = [], [], None
+        for stream, frame in frames:
+            crops = [frame] if stream.roi_tiler is None else stream.roi_tiler.crops(frame)
+            slices.append(slice(len(images), len(images) + len(crops)))
+            images.extend(crops)
+            if stream.roi_tiler is not None:
+                imgsz = max(imgsz or 0, min(stream.roi_tiler.imgsz(), Config.ROI_MAX_IMGSZ))
+        return images, slices, imgsz
+
+    def step(self):
+        """Bir tick işle; işlenecek akış kalmadıysa False döner"""
+        tick_start = time.perf_counter()
+
+        batch = []
+        active = False
+        for stream in self.streams:
+            if stream.finished:
+                continue
+            frame, timestamp = stream.read()
+            if frame is None:
+                continue
+            active = True
+
+            frame_index = stream.frame_index - 1
+            if stream.motion_gate is not None and not stream.motion_gate.check(frame):
+                # Zone'larda hareket yok: batch'e girmez, son durum korunur
+                stream.gate_closed = True
+                self._finish(stream, frame, stream.last_detections, timestamp, tick_start)
+                continue
+            if stream.gate_closed:
+                stream.gate_closed = False
+                stream.scheduler.reset()
+
+            if stream.scheduler.should_infer(frame_index):
+                batch.append((stream, frame, timestamp))
+            else:
+                # Stride dışındaki frame: batch'e girmez, kutular tahmin edilir
+                detections = stream.propagator.predict(frame_index)
+                stream.last_detections = detections
+                self._finish(stream, frame, detections, timestamp, tick_start)
+
+        if not batch:
+            return active
+
+        images, slices, imgsz = self._batch_inputs([(stream, frame) for stream, frame, _ in batch])
+        results = self.backend.predict(images, imgsz)
+
+        for (stream, frame, timestamp), result_slice in zip(batch, slices):
+            if stream.roi_tiler is None:
+                xyxy, scores, class_ids = results[result_slice][0]
+            else:
+                xyxy, scores, class_ids = stream.roi_tiler.merge(results[result_slice],
+                                                                 Config.IOU_THRESHOLD)
+            detections = stream.tracker.update(xyxy, scores, class_ids, frame)
+            stream.propagator.observe(detections, stream.frame_index - 1)
+            stream.scheduler.update(stream.propagator.max_speed())
+            stream.last_detections = detections
+            self._finish(stream, frame, detections, timestamp, tick_start)
+
+        return True
+
+    def _finish(self, stream, frame, detections, timestamp, tick_start):
+        render = self.display is not None and self.display.due(stream.name)
+        processed = stream.analytics.analyze(frame, detections, timestamp, render=render)
+        stream.meter.record(time.perf_counter() - tick_start)
+        if render:
+            self.display.submit(stream.name, processed)
+
+    def run(self):
+        for stream in self.streams:
+            stream.meter.start()
+        try:
+            while self.step():
+                if self.display is not None and self.display.quit_requested.is_set():
+                    break
+        finally:
+            for stream in self.streams:
+                stream.meter.stop()
+                stream.close()
+            if self.display is not None:
+                self.display.close()
+            if self.event_bus is not None:
+                self.event_bus.close()
+
+    def print_summary(self):
+        total_frames = 0
+        for stream in self.streams:
+            stream.meter.print_summary(f"[{stream.name}] Throughput özeti")
+            if stream.motion_gate is not None:
+                print(f"  Atlanan inference (hareket yok): {stream.motion_gate.gated_frames}")
+            total_frames += stream.meter.frames
+        elapsed = max((s.meter.summary()['elapsed_s'] for s in self.streams), default=0.0)
+        if elapsed > 0:
+            print(f"\nToplam: {total_frames} frame, {total_frames / elapsed:.2f} fps "
+                  f"({len(self.streams)} akış)")
+        if self.event_bus is not None:
+            self.event_bus.print_summary()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Çok kameralı batch inference")
+    parser.add_argument('--stream', nargs=3, action='append', metavar=('NAME', 'VIDEO', 'ZONES'),
+                        help="Akış adı, video dosyası ve zones.json yolu (birden fazla verilebilir)")
+    parser.add_argument('--render', action='store_true', help="Her akışı ayrı pencerede göster")
+    parser.add_argument('--output-dir', default='.', help="İstatistik dosyalarının klasörü")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.stream:
+        streams = [{'name': name, 'video_path': video, 'zones_path': zones}
+                   for name, video, zones in args.stream]
+    else:
+        streams = Config.STREAMS
+
+    if not streams:
+        print("Hata: Akış tanımlı değil (--stream veya Config.STREAMS)")
+        return
+
+    runner = MultiStreamRunner(Config.MODEL_PATH, streams, render=args.render,
+                               output_dir=args.output_dir)
+    try:
+        runner.run()
+    except Exception as e:
+        print(f"Bir hata oluştu: {str(e)}")
+        print(traceback.format_exc())
+    finally:
+        runner.print_summary()
+
+
+if __name__ == "__main__":
+    main()
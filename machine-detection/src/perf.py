@@ -0,0 +1,81 @@
+import time
+from collections import deque
+import numpy as np
+
+
+class StartupTimer:
+    """Başlangıç aşamalarının süreleri (import, video açma, model yükleme, warmup...)"""
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self._last = self.origin
+        self.phases = []  # (ad, saniye, arka planda mı)
+
+    def mark(self, name):
+        """Son işaretten bu yana geçen süreyi name aşaması olarak kaydet"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last, False))
+        self._last = now
+
+    def add(self, name, seconds):
+        """Ana akışla paralel çalışan (arka plan) bir aşamanın süresini ekle"""
+        self.phases.append((name, seconds, True))
+
+    def print_report(self, first_frame_at=None):
+        print("\nBaşlangıç süreleri:")
+        for name, seconds, background in self.phases:
+            suffix = " (arka plan)" if background else ""
+            print(f"  {name:<14}: {seconds * 1000:8.1f} ms{suffix}")
+        if first_frame_at is not None:
+            print(f"  {'İlk frame':<14}: {(first_frame_at - self.origin) * 1000:8.1f} ms")
+
+
+class ThroughputMeter:
+    """Frame sayısı, fps ve frame başı gecikme özetini tutar"""
+
+    def __init__(self, window=10000):
+        self.frames = 0
+        self.total_latency = 0.0
+        self.latencies = deque(maxlen=window)  # Yüzdelikler için son N gecikme
+        self.start_time = None
+        self.end_time = None
+        self.first_frame_at = None  # İlk frame'in işlendiği an (perf_counter)
+
+    def start(self):
+        self.start_time = time.perf_counter()
+
+    def record(self, latency):
+        if self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+        self.frames += 1
+        self.total_latency += latency
+        self.latencies.append(latency)
+
+    def stop(self):
+        self.end_time = time.perf_counter()
+
+    def summary(self):
+        elapsed = (self.end_time or time.perf_counter()) - (self.start_time or time.perf_counter())
+        summary = {
+            'frames': self.frames,
+            'elapsed_s': elapsed,
+            'fps': self.frames / elapsed if elapsed > 0 else 0.0,
+            'avg_latency_ms': 1000 * self.total_latency / self.frames if self.frames else 0.0,
+        }
+        if self.latencies:
+            p50, p95, p99 = np.percentile(np.fromiter(self.latencies, dtype=np.float64), [50, 95, 99])
+            summary.update({'p50_latency_ms': 1000 * p50,
+                            'p95_latency_ms': 1000 * p95,
+                            'p99_latency_ms': 1000 * p99})
+        return summary
+
+    def print_summary(self, title="Throughput özeti"):
+        s = self.summary()
+        print(f"\n{title}:")
+        print(f"  Frame sayısı : {s['frames']}")
+        print(f"  Süre         : {s['elapsed_s']:.2f} s")
+        print(f"  FPS          : {s['fps']:.2f}")
+        print(f"  Gecikme (ort): {s['avg_latency_ms']:.2f} ms")
+        if 'p50_latency_ms' in s:
+            print(f"  Gecikme p50/p95/p99: {s['p50_latency_ms']:.2f} / "
+                  f"{s['p95_latency_ms']:.2f} / {s['p99_latency_ms']:.2f} ms")
@@ -0,0 +1,207 @@
+import queue
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+import cv2
+import numpy as np
+from clock import FrameGapCounter
+from metrics import NullMetrics
+
+
+@dataclass
+class FramePacket:
+    index: int
+    timestamp: float
+    slot: int
+    captured_at: float  # perf_counter - uçtan uca gecikme için
+    detections: object = None
+
+
+class FramePool:
+    """Önceden ayrılmış frame buffer havuzu; decode her seferinde yeni bellek ayırmaz"""
+
+    def __init__(self, shape, size):
+        self.buffers = [np.empty(shape, dtype=np.uint8) for _ in range(size)]
+        self._free = queue.Queue()
+        for slot in range(size):
+            self._free.put(slot)
+
+    def acquire(self, timeout=None):
+        """Boş slot al; havuz doluysa bekler (backpressure). Zaman aşımında None"""
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, slot):
+        self._free.put(slot)
+
+
+class Pipeline:
+    """Decode / inference / analiz aşamalarını sınırlı kuyruklarla paralel çalıştırır.
+
+    - Capture thread'i frame'leri havuzdaki buffer'lara decode eder
+    - Inference çağıran thread'de (ana thread) çalışır, tracker frame sırasını korur
+    - Analiz ve çizim ayrı bir thread'de çalışır; gösterim Display'in kendi thread'indedir
+      (yalnızca ekrana gidecek frame'ler çizilir, analiz ekranı beklemez)
+    Kuyruklar dolduğunda üretici bekler; stop() veya video sonu temiz kapanış yapar.
+    """
+
+    _SENTINEL = None
+
+    def __init__(self, detector, cap, clock, render=True, display=None, queue_size=4, meter=None,
+                 window_name='Detection', metrics=None):
+        self.detector = detector
+        self.cap = cap
+        self.clock = clock
+        self.render = render
+        self.display = display if render else None  # Display veya None
+        self.meter = meter
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.window_name = window_name
+
+        self.decode_queue = queue.Queue(maxsize=queue_size)
+        self.analytics_queue = queue.Queue(maxsize=queue_size)
+        # Kuyruklardaki + her aşamada işlenen frame'ler için yeterli buffer
+        self.pool = FramePool(self._frame_shape(), 2 * queue_size + 3)
+
+        self._stop = threading.Event()
+        self.error = None
+        self.frames_read = 0
+        self.gaps = FrameGapCounter(cap.get(cv2.CAP_PROP_FPS))  # Kaynağın atladığı frame'ler
+
+    def _frame_shape(self):
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return (height, width, 3)
+
+    def stop(self):
+        self._stop.set()
+
+    def _put(self, q, item):
+        """Kuyruğa koy; durdurulduysa vazgeç (kapanışta kilitlenmeyi önler)"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return self._SENTINEL
+
+    def _capture_loop(self):
+        try:
+            frame_index = 0
+            while not self._stop.is_set():
+                slot = self.pool.acquire(timeout=0.1)
+                if slot is None:
+                    continue
+
+                buffer = self.pool.buffers[slot]
+                with self.metrics.stage('read'):
+                    ret, frame = self.cap.read(buffer)
+                if not ret:
+                    self.pool.release(slot)
+                    print("Video bitti.")
+                    break
+                if frame is not buffer:
+                    # Çözünürlük metadata'dan farklıysa buffer'ı yeniden boyutlandır
+                    if frame.shape != buffer.shape:
+                        self.pool.buffers[slot] = frame
+                    else:
+                        np.copyto(buffer, frame)
+
+                # Capture beklerken kaynağın atladığı frame'ler
+                gap = self.gaps.update(self.cap)
+                if gap:
+                    self.metrics.inc('frames_dropped', gap)
+                timestamp = self.clock.stamp(frame_index, self.cap.get(cv2.CAP_PROP_POS_MSEC))
+                packet = FramePacket(frame_index, timestamp, slot, time.perf_counter())
+                frame_index += 1
+                self.frames_read = frame_index
+
+                if not self._put(self.decode_queue, packet):
+                    self.pool.release(slot)
+                    self.metrics.inc('frames_discarded_on_shutdown')
+                    break
+        except Exception as e:
+            self.error = e
+            print(f"Capture thread'inde hata: {str(e)}")
+            print(traceback.format_exc())
+            self._stop.set()
+        finally:
+            self._put(self.decode_queue, self._SENTINEL)
+
+    def _analytics_loop(self):
+        try:
+            while True:
+                packet = self._get(self.analytics_queue)
+                if packet is self._SENTINEL:
+                    break
+
+                frame = self.pool.buffers[packet.slot]
+                try:
+                    display = self.display
+                    render = self.render and (display is None or display.due(self.window_name))
+                    processed = self.detector.analyze(frame, packet.detections, packet.timestamp,
+                                                      render=render)
+                    if display is not None:
+                        if render:
+                            with self.metrics.stage('display'):
+                                display.submit(self.window_name, processed)
+                        if display.quit_requested.is_set():
+                            self._stop.set()
+                finally:
+                    self.pool.release(packet.slot)
+
+                latency = time.perf_counter() - packet.captured_at
+                self.metrics.observe('end_to_end', latency)
+                self.metrics.frame()
+                if self.meter is not None:
+                    self.meter.record(latency)
+        except Exception as e:
+            self.error = e
+            print(f"Analiz thread'inde hata: {str(e)}")
+            print(traceback.format_exc())
+            self._stop.set()
+
+    def run(self):
+        """Pipeline'ı çalıştır; video bitene veya stop() çağrılana kadar bloklar"""
+        capture_thread = threading.Thread(target=self._capture_loop, name='capture', daemon=True)
+        analytics_thread = threading.Thread(target=self._analytics_loop, name='analytics', daemon=True)
+        capture_thread.start()
+        analytics_thread.start()
+
+        try:
+            while True:
+                packet = self._get(self.decode_queue)
+                if packet is self._SENTINEL:
+                    break
+
+                self.metrics.set_gauge('decode_queue_depth', self.decode_queue.qsize())
+                with self.metrics.stage('detect'):
+                    packet.detections = self.detector.detect(self.pool.buffers[packet.slot])
+                if not self._put(self.analytics_queue, packet):
+                    self.pool.release(packet.slot)
+                    self.metrics.inc('frames_discarded_on_shutdown')
+                    break
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            # Analiz thread'i kuyruğu boşaltıp çıksın; sonra capture'ı durdur
+            self._put(self.analytics_queue, self._SENTINEL)
+            analytics_thread.join()
+            self._stop.set()
+            capture_thread.join()
+
+        if self.error is not None:
+            raise self.error
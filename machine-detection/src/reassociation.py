@@ -0,0 +1,95 @@
+import numpy as np
+
+_linear_sum_assignment = None
+
+
+def _solver():
+    """scipy'nin linear_sum_assignment'ı; ilk eşleştirmede yüklenir (import ~0.4 s).
+    scipy ultralytics ile gelir; yoksa global greedy kullanılır (None)."""
+    global _linear_sum_assignment
+    if _linear_sum_assignment is None:
+        try:
+            from scipy.optimize import linear_sum_assignment
+        except ImportError:
+            linear_sum_assignment = False
+        _linear_sum_assignment = linear_sum_assignment
+    return _linear_sum_assignment or None
+
+
+def _grid_candidates(new_centers, lost_centers, cell_size):
+    """Uniform grid ile yalnızca komşu hücrelerdeki (new, lost) çiftlerini üret"""
+    lost_cells = np.floor(lost_centers / cell_size).astype(np.int64)
+    grid = {}
+    for index, cell in enumerate(map(tuple, lost_cells.tolist())):
+        grid.setdefault(cell, []).append(index)
+
+    new_cells = np.floor(new_centers / cell_size).astype(np.int64)
+    rows, cols = [], []
+    for row, (cx, cy) in enumerate(new_cells.tolist()):
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for col in grid.get((cx + dx, cy + dy), ()):
+                    rows.append(row)
+                    cols.append(col)
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+
+def _greedy_assignment(distance):
+    """scipy yoksa: tüm çiftleri mesafeye göre sıralayıp çakışmasız seç"""
+    rows, cols = np.nonzero(np.isfinite(distance))
+    order = np.argsort(distance[rows, cols], kind='stable')
+    used_rows, used_cols, pairs = set(), set(), []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            pairs.append((row, col))
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pairs = np.asarray(pairs, dtype=np.int64)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def associate(new_centers, lost_centers, max_distance, grid_threshold=64):
+    """Yeni track'leri kaybolan track'lerle toplam mesafeyi en aza indirerek eşleştir.
+
+    Mesafesi `max_distance`'tan küçük olmayan çiftler eşleşmez. Kaybolan track
+    sayısı `grid_threshold`'u aşarsa aday çiftler uniform grid ile bulunur,
+    aksi halde tam mesafe matrisi kullanılır. (new_rows, lost_rows) döndürür.
+    """
+    new_centers = np.asarray(new_centers, dtype=np.float64).reshape(-1, 2)
+    lost_centers = np.asarray(lost_centers, dtype=np.float64).reshape(-1, 2)
+    empty = np.zeros(0, dtype=np.int64)
+    if len(new_centers) == 0 or len(lost_centers) == 0:
+        return empty, empty
+
+    distance = np.full((len(new_centers), len(lost_centers)), np.inf)
+    if len(lost_centers) > grid_threshold:
+        rows, cols = _grid_candidates(new_centers, lost_centers, max_distance)
+        if len(rows):
+            diff = new_centers[rows] - lost_centers[cols]
+            distance[rows, cols] = np.sqrt((diff ** 2).sum(axis=1))
+    else:
+        diff = new_centers[:, None, :] - lost_centers[None, :, :]
+        distance = np.sqrt((diff ** 2).sum(axis=2))
+
+    distance[distance >= max_distance] = np.inf
+    if not np.isfinite(distance).any():
+        return empty, empty
+
+    # Yalnızca en az bir geçerli adayı olan satır/sütunlar çözülür
+    valid_rows = np.flatnonzero(np.isfinite(distance).any(axis=1))
+    valid_cols = np.flatnonzero(np.isfinite(distance).any(axis=0))
+    sub = distance[np.ix_(valid_rows, valid_cols)]
+
+    linear_sum_assignment = _solver()
+    if linear_sum_assignment is not None:
+        # Geçersiz çiftler büyük maliyetle çözülür, sonra elenir
+        cost = np.where(np.isfinite(sub), sub, max_distance * (len(sub) + 1))
+        rows, cols = linear_sum_assignment(cost)
+        keep = np.isfinite(sub[rows, cols])
+        rows, cols = rows[keep], cols[keep]
+    else:
+        rows, cols = _greedy_assignment(sub)
+
+    return valid_rows[rows], valid_cols[cols]
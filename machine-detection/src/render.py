@@ -0,0 +1,146 @@
+import cv2
+import numpy as np
+from zone_engine import zone_polygon
+
+ZONE_COLOR = (0, 0, 255)    # Kırmızı (BGR)
+TRACK_COLOR = (255, 0, 0)   # Mavi
+TIMER_COLOR = (0, 255, 0)   # Yeşil
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def _empty_layer():
+    return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.uint8)
+
+
+def _canvas(shape, bounds):
+    """bounds ([x1, y1, x2, y2], frame'e kırpılır) boyutunda boş tuval ve sol üst köşesi"""
+    height, width = shape[:2]
+    x1, y1 = max(bounds[0], 0), max(bounds[1], 0)
+    x2, y2 = min(bounds[2], width - 1), min(bounds[3], height - 1)
+    if x1 > x2 or y1 > y2:
+        return None, None
+    return np.zeros((y2 - y1 + 1, x2 - x1 + 1, 3), dtype=np.uint8), np.asarray([x1, y1], dtype=np.int32)
+
+
+def _layer(canvas, origin, width):
+    """Tuvaldeki çizili pikseller -> (frame'in düz byte indeksleri, byte değerleri)"""
+    if canvas is None:
+        return _empty_layer()
+    rows, cols = np.nonzero(canvas[:, :, 0] | canvas[:, :, 1] | canvas[:, :, 2])
+    pixels = (rows + origin[1]) * width + (cols + origin[0])
+    # Tek boyutlu byte dağıtımı, (N, 3) satır indekslemeden ~3 kat hızlı
+    return (pixels[:, None] * 3 + np.arange(3)).ravel(), canvas[rows, cols].ravel()
+
+
+class ZoneOverlay:
+    """Zone çerçeveleri ve sayım etiketleri: önceden çizilir, her frame'e basılır.
+
+    Katmanlar küçük tuvallerde çizilir; çizilen pikseller (maske) frame'deki düz
+    byte indeksleri ve değerleriyle saklanır ve tek dağıtım işlemiyle yazılır.
+    Çerçeveler frame boyutu başına bir kez, etiketler yalnızca o zone'un sayımı
+    değişince yeniden çizilir (etiketler ayrı bir dağıtımda, çerçevelerin üstüne).
+    """
+
+    def __init__(self, zones):
+        self.zones = zones
+        self._shape = None
+        self._outline_canvas = self._outline_origin = None
+        self._outlines = _empty_layer()
+        self._labels = {}   # zone -> (sayım, indeksler, değerler)
+        self._label_index, self._label_values = _empty_layer()
+
+    def _build_outlines(self, shape):
+        coords = np.asarray([zone_info["coords"] for zone_info in self.zones.values()]).reshape(-1, 4)
+        canvas = origin = None
+        if len(coords):
+            canvas, origin = _canvas(shape, [int(coords[:, 0].min()) - 2, int(coords[:, 1].min()) - 2,
+                                             int(coords[:, 2].max()) + 2, int(coords[:, 3].max()) + 2])
+        if canvas is not None:
+            for zone_info in self.zones.values():
+                polygon = zone_polygon(zone_info) - origin
+                if zone_info.get("polygon"):
+                    cv2.polylines(canvas, [polygon], True, ZONE_COLOR, 2)
+                else:
+                    cv2.rectangle(canvas, tuple(polygon[0].tolist()), tuple(polygon[2].tolist()),
+                                  ZONE_COLOR, 2)
+        self._outline_canvas, self._outline_origin = canvas, origin
+        self._outlines = _layer(canvas, origin, shape[1])
+
+    def _label_layer(self, shape, zone_name, count):
+        x1, y1 = self.zones[zone_name]["coords"][:2]
+        label = f"{zone_name}: {count}"
+        (text_w, text_h), baseline = cv2.getTextSize(label, FONT, 0.9, 2)
+        canvas, origin = _canvas(shape, [x1 - 2, y1 - 10 - text_h - 2, x1 + text_w + 2, y1 - 10 + baseline + 2])
+        if canvas is None:
+            return _empty_layer()
+
+        # Altındaki çerçeve parçası önce kopyalanır: yazının kenar yumuşatması
+        # çerçeve üzerinde her frame'de çizilmiş gibi karışır
+        base = self._outline_canvas
+        if base is not None:
+            left, top = np.maximum(origin, self._outline_origin)
+            right = min(origin[0] + canvas.shape[1], self._outline_origin[0] + base.shape[1])
+            bottom = min(origin[1] + canvas.shape[0], self._outline_origin[1] + base.shape[0])
+            if left < right and top < bottom:
+                canvas[top - origin[1]:bottom - origin[1], left - origin[0]:right - origin[0]] = \
+                    base[top - self._outline_origin[1]:bottom - self._outline_origin[1],
+                         left - self._outline_origin[0]:right - self._outline_origin[0]]
+        cv2.putText(canvas, label, (int(x1 - origin[0]), int(y1 - 10 - origin[1])), FONT, 0.9, ZONE_COLOR, 2)
+        return _layer(canvas, origin, shape[1])
+
+    def _refresh(self, shape):
+        changed = False
+        if shape != self._shape:
+            self._shape, self._labels, changed = shape, {}, True
+            self._build_outlines(shape)
+        for zone_name, zone_info in self.zones.items():
+            cached = self._labels.get(zone_name)
+            if cached is None or cached[0] != zone_info["count"]:
+                self._labels[zone_name] = (zone_info["count"],
+                                           *self._label_layer(shape, zone_name, zone_info["count"]))
+                changed = True
+        if changed:
+            self._label_index = np.concatenate([label[1] for label in self._labels.values()])
+            self._label_values = np.concatenate([label[2] for label in self._labels.values()])
+
+    def draw(self, frame):
+        self._refresh(frame.shape)
+        for index, values in (self._outlines, (self._label_index, self._label_values)):
+            if frame.flags.c_contiguous:
+                frame.reshape(-1)[index] = values
+            else:
+                rows, rest = np.divmod(index, frame.shape[1] * 3)
+                frame[rows, rest // 3, rest % 3] = values
+
+
+def draw_tracks(frame, xyxy, track_ids):
+    """Track kutuları (tek polylines çağrısı) ve ID etiketleri"""
+    if len(xyxy) == 0:
+        return
+    boxes = xyxy.astype(np.int32)
+    x1, y1, x2, y2 = boxes.T
+    corners = np.stack([np.stack([x1, y1], 1), np.stack([x2, y1], 1),
+                        np.stack([x2, y2], 1), np.stack([x1, y2], 1)], axis=1)
+    cv2.polylines(frame, list(corners), True, TRACK_COLOR, 1)
+    for (x, y), track_id in zip(boxes[:, :2].tolist(), track_ids.tolist()):
+        cv2.putText(frame, f"ID: {track_id}", (x, y - 5), FONT, 0.4, TRACK_COLOR, 1)
+
+
+def draw_cycle_timers(frame, anchors, track_ids, zone_indices, elapsed):
+    """Aktif cycle süreleri; her zone'un sol üst köşesinin üstünde 15 px aralıkla yığılır.
+
+    anchors: (Z, 2) zone başına (x1, y1); diğerleri current_cycle_arrays() çıktısı.
+    """
+    if len(zone_indices) == 0:
+        return
+    # Zone içindeki sıra (track tablosu sırası korunur)
+    order = np.argsort(zone_indices, kind='stable')
+    sorted_zones = zone_indices[order]
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - np.searchsorted(sorted_zones, sorted_zones)
+
+    x = anchors[zone_indices, 0]
+    y = anchors[zone_indices, 1] - 25 - rank * 15
+    for text_x, text_y, track_id, seconds in zip(x.tolist(), y.tolist(), track_ids.tolist(),
+                                                 elapsed.tolist()):
+        cv2.putText(frame, f"ID:{track_id} {seconds:.1f}s", (text_x, text_y), FONT, 0.4, TIMER_COLOR, 1)
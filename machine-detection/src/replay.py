@@ -0,0 +1,112 @@
+import argparse
+import contextlib
+import itertools
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from analytics import ZoneAnalytics
+from detection_cache import DetectionRecording
+from zone_engine import load_zones
+
+
+def replay(recording_path, zones_path, max_distance=50, max_disappeared_time=1.0,
+           stats_path=None, quiet=True):
+    """Kaydı tek bir zone/parametre yapılandırmasıyla analiz et; özet döndür"""
+    recording = DetectionRecording(recording_path)
+    zones = load_zones(zones_path, recording.meta.get('video_path'), frame_size=recording.frame_size)
+    analytics = ZoneAnalytics(zones, stats_path=stats_path or os.devnull,
+                              max_disappeared_time=max_disappeared_time,
+                              max_distance=max_distance, save_interval=None)
+
+    start = time.perf_counter()
+    # Frame başı sayım/cycle çıktıları isteğe bağlı bastırılır
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        for timestamp, detections in recording:
+            analytics.analyze(None, detections, timestamp, render=False)
+        if stats_path is not None:
+            analytics.save()
+    elapsed = time.perf_counter() - start
+
+    statistics = analytics.cycle_analyzer.get_zone_statistics()
+    return {
+        'zones_path': zones_path,
+        'max_distance': max_distance,
+        'max_disappeared_time': max_disappeared_time,
+        'frames': len(recording),
+        'elapsed_s': elapsed,
+        'counts': analytics.zone_counter.get_counts(),
+        'cycles': {zone: s['total_objects'] for zone, s in statistics.items()},
+        'avg_cycle_time': {zone: s['avg_time'] for zone, s in statistics.items()},
+        'stats_path': stats_path,
+    }
+
+
+def _replay_job(job):
+    try:
+        return replay(**job)
+    except Exception as e:
+        return {**job, 'error': f"{str(e)}\n{traceback.format_exc()}"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Kaydedilmiş tracker çıktısını modelsiz yeniden analiz et")
+    parser.add_argument('recording', help="main.py --record ile oluşturulan kayıt klasörü")
+    parser.add_argument('--zones', nargs='+', required=True, help="Denenecek zones.json dosyaları")
+    parser.add_argument('--max-distance', type=float, nargs='+', default=[50],
+                        help="ZoneCounter max_distance değerleri (piksel)")
+    parser.add_argument('--max-disappeared', type=float, nargs='+', default=[1.0],
+                        help="ZoneCounter max_disappeared_time değerleri (saniye)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Paralel yapılandırma sayısı")
+    parser.add_argument('--output-dir', default=None, help="Her yapılandırmanın istatistik dosyası")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    # Tüm zone dosyası x parametre kombinasyonları aynı kayda karşı çalışır
+    jobs = []
+    for i, (zones_path, max_distance, max_disappeared) in enumerate(
+            itertools.product(args.zones, args.max_distance, args.max_disappeared)):
+        stats_path = None
+        if args.output_dir:
+            name = os.path.splitext(os.path.basename(zones_path))[0]
+            stats_path = os.path.join(args.output_dir,
+                                      f'cycle_time_stats_{i}_{name}_d{max_distance:g}_t{max_disappeared:g}.json')
+        jobs.append({'recording_path': args.recording, 'zones_path': zones_path,
+                     'max_distance': max_distance, 'max_disappeared_time': max_disappeared,
+                     'stats_path': stats_path})
+
+    start = time.perf_counter()
+    workers = max(1, min(args.workers or 1, len(jobs)))
+    if workers == 1:
+        results = [_replay_job(job) for job in jobs]
+    else:
+        # Kayıt memory-map'li olduğundan süreçler aynı sayfa önbelleğini paylaşır
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_replay_job, jobs))
+
+    for result in results:
+        print(f"\n{result['zones_path']}  max_distance={result['max_distance']:g}  "
+              f"max_disappeared={result['max_disappeared_time']:g}")
+        if 'error' in result:
+            print(f"  Hata: {result['error']}")
+            continue
+        print(f"  {result['frames']} frame, {result['elapsed_s']:.2f} s "
+              f"({result['frames'] / max(result['elapsed_s'], 1e-9):.0f} fps)")
+        for zone, count in result['counts'].items():
+            print(f"  {zone}: sayım {count}, cycle {result['cycles'][zone]}, "
+                  f"ort {result['avg_cycle_time'][zone]:.2f} s")
+        if result['stats_path']:
+            print(f"  İstatistikler: {result['stats_path']}")
+    print(f"\nToplam süre: {time.perf_counter() - start:.2f} s ({len(jobs)} yapılandırma, {workers} süreç)")
+
+
+if __name__ == "__main__":
+    main()
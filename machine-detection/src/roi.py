@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+from config import Config
+
+
+class RoiTiler:
+    """Detector'ı tam frame yerine zone bölgelerinin kırpıntıları üzerinde çalıştırır.
+
+    mode='union' : tüm zone'ları kapsayan tek dikdörtgen (+ margin)
+    mode='zones' : her zone için ayrı kırpıntı (+ margin), hepsi tek batch'te
+    Kırpıntılardaki kutular frame koordinatlarına taşınır ve üst üste binen
+    kırpıntılardan gelen tekrarlar NMS ile elenir.
+    """
+
+    def __init__(self, zones, mode='union', margin=32, stride=32):
+        if mode not in ('union', 'zones'):
+            raise ValueError(f"Bilinmeyen ROI modu: {mode}")
+        self.zones = zones
+        self.mode = mode
+        self.margin = margin
+        self.stride = stride
+        self._frame_shape = None
+        self.rects = []
+
+    def _build_rects(self, frame_shape):
+        height, width = frame_shape[:2]
+        coords = np.asarray([zone["coords"] for zone in self.zones.values()], dtype=np.int64).reshape(-1, 4)
+        if len(coords) == 0:
+            rects = np.asarray([[0, 0, width, height]])
+        elif self.mode == 'union':
+            rects = np.asarray([[coords[:, 0].min(), coords[:, 1].min(),
+                                 coords[:, 2].max(), coords[:, 3].max()]])
+        else:
+            rects = coords
+
+        rects = rects + np.asarray([-self.margin, -self.margin, self.margin, self.margin])
+        rects[:, [0, 2]] = rects[:, [0, 2]].clip(0, width)
+        rects[:, [1, 3]] = rects[:, [1, 3]].clip(0, height)
+        self.rects = [tuple(r) for r in rects.tolist() if r[2] > r[0] and r[3] > r[1]]
+        self._frame_shape = frame_shape[:2]
+
+    def crops(self, frame):
+        """Frame'in ROI kırpıntıları (kopyasız view'lar)"""
+        if self._frame_shape != frame.shape[:2]:
+            self._build_rects(frame.shape)
+        return [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in self.rects]
+
+    def imgsz(self):
+        """Kırpıntıları küçültmeden işleyecek model giriş boyutu (stride katı)"""
+        longest = max((max(x2 - x1, y2 - y1) for x1, y1, x2, y2 in self.rects), default=self.stride)
+        return int(np.ceil(longest / self.stride) * self.stride)
+
+    def merge(self, results, iou_threshold):
+        """Kırpıntı sonuçlarını (backend.predict çıktısı: (xyxy, conf, cls) listesi)
+        frame koordinatlarında birleştir -> (xyxy, conf, cls)"""
+        xyxy, conf, cls = [], [], []
+        for (x1, y1, _, _), (boxes, scores, class_ids) in zip(self.rects, results):
+            if len(boxes) == 0:
+                continue
+            xyxy.append(boxes + np.asarray([x1, y1, x1, y1], dtype=np.float32))
+            conf.append(scores)
+            cls.append(class_ids)
+
+        if not xyxy:
+            return (np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32),
+                    np.zeros(0, dtype=np.float32))
+
+        xyxy = np.concatenate(xyxy)
+        conf = np.concatenate(conf)
+        cls = np.concatenate(cls)
+        if len(results) > 1:
+            keep = class_aware_nms(xyxy, conf, cls, iou_threshold)
+            xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+        return xyxy, conf, cls
+
+
+def class_aware_nms(xyxy, conf, cls, iou_threshold):
+    """Sınıf bazlı NMS; tutulan indeksleri döndürür"""
+    # Sınıfları birbirinden ayırmak için kutuları sınıfa göre kaydır
+    offset = cls.reshape(-1, 1) * (float(xyxy.max()) + 1)
+    shifted = xyxy + offset
+    boxes = np.concatenate([shifted[:, :2], shifted[:, 2:] - shifted[:, :2]], axis=1)
+    keep = cv2.dnn.NMSBoxes(boxes.tolist(), conf.tolist(), 0.0, iou_threshold)
+    return np.asarray(keep, dtype=np.int64).reshape(-1)
+
+
+def create_roi_tiler(zones):
+    """Config.INFERENCE_MODE 'union' veya 'zones' ise RoiTiler, 'full' ise None"""
+    if Config.INFERENCE_MODE == 'full':
+        return None
+    return RoiTiler(zones, mode=Config.INFERENCE_MODE, margin=Config.ROI_MARGIN)
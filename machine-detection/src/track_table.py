@@ -0,0 +1,125 @@
+import numpy as np
+from zone_engine import MAX_ZONES
+
+
+class TrackTable:
+    """Track durumları için yoğun slot indeksli paralel diziler.
+
+    ZoneCounter (son konum, zone içi / tamamlanan zone bit maskeleri) ve
+    CycleTimeAnalyzer (zone başına giriş zamanı) aynı tabloyu paylaşır.
+    ByteTrack ID'leri sürekli artsa da boşalan slotlar yeniden kullanılır;
+    tek bir TTL süpürmesi (evict) tüm durumları temizler ve bellek sabit kalır.
+    """
+
+    def __init__(self, n_zones, capacity=256):
+        if n_zones > MAX_ZONES:
+            raise ValueError(f"En fazla {MAX_ZONES} zone desteklenir (verilen: {n_zones})")
+        self.n_zones = n_zones
+        self.slot_of = {}  # {track_id: slot}
+        self._free = []    # Yeniden kullanılacak boş slotlar
+        self._high = 0     # Kullanılmış en yüksek slot + 1
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.track_id = np.full(capacity, -1, dtype=np.int64)
+        self.last_seen = np.full(capacity, -np.inf, dtype=np.float64)
+        self.position = np.zeros((capacity, 2), dtype=np.float64)
+        self.in_mask = np.zeros(capacity, dtype=np.int64)         # Şu an içinde olunan zone'lar
+        self.completed_mask = np.zeros(capacity, dtype=np.int64)  # Sayımı yapılmış zone'lar
+        self.entry_time = np.full((capacity, self.n_zones), np.nan, dtype=np.float64)
+
+    def _grow(self):
+        old = (self.track_id, self.last_seen, self.position, self.in_mask,
+               self.completed_mask, self.entry_time)
+        self._allocate(2 * len(self.track_id))
+        for new, previous in zip((self.track_id, self.last_seen, self.position, self.in_mask,
+                                  self.completed_mask, self.entry_time), old):
+            new[:len(previous)] = previous
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    @property
+    def capacity(self):
+        return len(self.track_id)
+
+    def memory_bytes(self):
+        arrays = (self.track_id, self.last_seen, self.position, self.in_mask,
+                  self.completed_mask, self.entry_time)
+        return sum(a.nbytes for a in arrays)
+
+    def _new_slot(self, track_id):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._high == len(self.track_id):
+                self._grow()
+            slot = self._high
+            self._high += 1
+        self.track_id[slot] = track_id
+        self.last_seen[slot] = -np.inf
+        self.position[slot] = 0.0
+        self.in_mask[slot] = 0
+        self.completed_mask[slot] = 0
+        self.entry_time[slot] = np.nan
+        self.slot_of[track_id] = slot
+        return slot
+
+    def slots(self, track_ids):
+        """track_id'lerin slotları; olmayanlar için yeni slot açılır"""
+        slot_of = self.slot_of
+        return np.fromiter((slot_of[t] if t in slot_of else self._new_slot(t) for t in track_ids),
+                           dtype=np.int64, count=len(track_ids))
+
+    def touch(self, slots, now, positions=None):
+        self.last_seen[slots] = now
+        if positions is not None:
+            self.position[slots] = positions
+
+    def active(self):
+        """Kullanımdaki slotların maskesi (ilk _high slot üzerinde)"""
+        return self.track_id[:self._high] >= 0
+
+    def transfer_counter_state(self, old_id, new_id):
+        """Kayıp track'in sayım durumunu (konum, bit maskeleri) yeni ID'ye taşı.
+
+        Eski slot giriş zamanlarıyla birlikte kalır (cycle analizi kaybolan
+        track'i aynı frame'de kapatır) ve bir sonraki süpürmede silinir.
+        """
+        old_slot = self.slot_of[old_id]
+        new_slot = self.slot_of[new_id] if new_id in self.slot_of else self._new_slot(new_id)
+        self.position[new_slot] = self.position[old_slot]
+        self.in_mask[new_slot] = self.in_mask[old_slot]
+        self.completed_mask[new_slot] = self.completed_mask[old_slot]
+        self.in_mask[old_slot] = 0
+        self.completed_mask[old_slot] = 0
+        self.last_seen[old_slot] = -np.inf  # Aday olmaktan çıkar, süpürmede silinir
+        return new_slot
+
+    def evict(self, now, ttl):
+        """`ttl` saniyedir görülmeyen tüm track'leri tek vektörel süpürmede sil"""
+        high = self._high
+        stale = np.flatnonzero((self.track_id[:high] >= 0) & (now - self.last_seen[:high] > ttl))
+        if len(stale) == 0:
+            return stale
+        evicted = self.track_id[stale].copy()
+        for track_id in evicted.tolist():
+            del self.slot_of[track_id]
+        self.track_id[stale] = -1
+        self.entry_time[stale] = np.nan
+        self._free.extend(stale.tolist())
+        return evicted
+
+
+def zone_bitmasks(membership):
+    """(N, Z) bool üyelik matrisini N adet int64 bit maskesine çevir"""
+    n_zones = membership.shape[1]
+    if n_zones == 0:
+        return np.zeros(len(membership), dtype=np.int64)
+    bits = np.left_shift(np.int64(1), np.arange(n_zones, dtype=np.int64))
+    return membership.astype(np.int64) @ bits
+
+
+def mask_to_indices(mask, n_zones):
+    """Bit maskesindeki zone indeksleri"""
+    return [z for z in range(n_zones) if mask >> z & 1]
@@ -0,0 +1,56 @@
+import numpy as np
+from detections import DetectionBuffers
+
+
+class TrackerInput:
+    """Ultralytics tracker'larının beklediği minimal sonuç arayüzü (xyxy, xywh, conf, cls)"""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.asarray(cls, dtype=np.float32).reshape(-1)
+
+    @property
+    def xywh(self):
+        xywh = np.empty_like(self.xyxy)
+        xywh[:, 0] = (self.xyxy[:, 0] + self.xyxy[:, 2]) / 2
+        xywh[:, 1] = (self.xyxy[:, 1] + self.xyxy[:, 3]) / 2
+        xywh[:, 2] = self.xyxy[:, 2] - self.xyxy[:, 0]
+        xywh[:, 3] = self.xyxy[:, 3] - self.xyxy[:, 1]
+        return xywh
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __getitem__(self, index):
+        return TrackerInput(self.xyxy[index], self.conf[index], self.cls[index])
+
+
+class StreamTracker:
+    """Tek bir video akışına ait tracker durumu.
+
+    model.track(persist=True) tracker'ı modele bağlar, bu yüzden birden fazla
+    akış aynı modeli paylaşırken her akış kendi StreamTracker'ını kullanır.
+    """
+
+    def __init__(self, tracker_config, frame_rate=30):
+        # Ultralytics yalnızca tracker oluşturulurken gerekli
+        from ultralytics.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.utils.checks import check_yaml
+        from ultralytics.trackers.track import TRACKER_MAP
+
+        cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_config)))
+        self.tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=int(frame_rate or 30))
+        self.buffers = DetectionBuffers()
+
+    def update(self, xyxy, conf, cls, frame=None):
+        """Ham tespitleri tracker'a ver; aktif track yoksa None döner"""
+        tracks = self.tracker.update(TrackerInput(xyxy, conf, cls), frame)
+        if len(tracks) == 0:
+            return None
+
+        # tracks: [x1, y1, x2, y2, track_id, score, cls, idx] -> DetectionBatch sütun düzeni
+        return self.buffers.from_tracks(tracks)
+
+    def reset(self):
+        self.tracker.reset()
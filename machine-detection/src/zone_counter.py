@@ -1,9 +1,12 @@
 import numpy as np
-import supervision as sv
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, Set, List, Tuple
+from typing import Set, Tuple
 import time
+from zone_engine import ZoneEngine, ZoneFrame
+from reassociation import associate
+from track_table import TrackTable, zone_bitmasks, mask_to_indices
+from events import COUNT_INCREMENT, TRACK_REASSOCIATED
 
 @dataclass
 class TrackInfo:
@@ -13,107 +16,108 @@ class TrackInfo:
     completed_zones: Set[str]
 
 class ZoneCounter:
-    def __init__(self, zones, max_disappeared_time=1.0, max_distance=50):
+    def __init__(self, zones, max_disappeared_time=1.0, max_distance=50, track_table=None, events=None):
         self.zones = zones
-        self.track_history = {}  # track_id -> TrackInfo
         self.zone_counts = defaultdict(int)
         self.max_disappeared_time = max_disappeared_time  # saniye
         self.max_distance = max_distance  # piksel
-        self.disappeared_tracks = {}  # {track_id: (last_position, last_seen_time)}
-        
-    def _calculate_center(self, bbox):
-        return ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+        self.zone_engine = ZoneEngine(zones)  # update'e zone_frame verilmezse kullanılır
 
-    def _is_in_zone(self, center: Tuple[float, float], zone_coords: List[int]) -> bool:
-        x, y = center
-        x1, y1, x2, y2 = zone_coords
-        return x1 < x < x2 and y1 < y < y2
+        # Track durumu slot indeksli tabloda; paylaşılan tabloyu sahibi süpürür
+        self._owns_table = track_table is None
+        self.track_table = TrackTable(len(zones)) if track_table is None else track_table
+        # Sayım olaylarını dinleyen çağrı: on_count(track_id, zone_name, timestamp)
+        self.on_count = None
+        # Sayım ve yeniden eşleşme olayları (EventPublisher; None ise olay üretilmez)
+        self.events = events
+
+    def _handle_disappeared_tracks(self, current_time: float, zone_frame: ZoneFrame):
+        """Yeni track'leri süresi dolmamış kaybolan track'lerle toplu eşleştir"""
+        table = self.track_table
+        track_ids = zone_frame.track_ids.tolist()
+
+        new_rows = [i for i, track_id in enumerate(track_ids) if track_id not in table.slot_of]
+        if not new_rows:
+            return
+
+        # Kayıp adaylar: bu frame'de görünmeyen ve süresi dolmamış track'ler
+        high = table._high
+        candidates = table.active() & (table.last_seen[:high] < current_time) \
+            & (current_time - table.last_seen[:high] <= self.max_disappeared_time)
+        present = [table.slot_of[t] for t in track_ids if t in table.slot_of]
+        candidates[present] = False
+        lost_slots = np.flatnonzero(candidates)
+        if len(lost_slots) == 0:
+            return
+
+        rows, cols = associate(zone_frame.centers[new_rows], table.position[lost_slots], self.max_distance)
+
+        # Eşleşen track'lerin sayım geçmişini yeni ID'ye taşı
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            old_id = int(table.track_id[lost_slots[col]])
+            table.transfer_counter_state(old_id, track_ids[new_rows[row]])
+            if self.events is not None:
+                self.events.emit(TRACK_REASSOCIATED, current_time, track_ids[new_rows[row]],
+                                 previous_id=old_id)
+
+    def update(self, detections, zone_frame: ZoneFrame = None, timestamp: float = None):
+        # Zaman damgası verilmezse duvar saati kullanılır (canlı akış)
+        current_time = time.time() if timestamp is None else timestamp
+
+        # Zone üyeliği dışarıdan verilmediyse kendi motorumuzla hesapla
+        if zone_frame is None:
+            zone_frame = self.zone_engine.update(detections.xyxy, detections.tracker_id)
 
-    def _handle_disappeared_tracks(self, current_time: float, detections):
-        # Kaybolan track'leri kontrol et
-        current_track_ids = set(detections.tracker_id)
-        
-        # Yeni tespit edilen track'ler için en yakın kaybolan track'i bul
-        for i, track_id in enumerate(detections.tracker_id):
-            if track_id not in self.track_history:
-                center = self._calculate_center(detections.xyxy[i])
-                
-                # En yakın kaybolan track'i bul
-                closest_old_id = None
-                min_distance = float('inf')
-                
-                for old_id, (old_center, last_seen) in list(self.disappeared_tracks.items()):
-                    if current_time - last_seen > self.max_disappeared_time:
-                        continue
-                        
-                    distance = np.sqrt((center[0] - old_center[0])**2 + 
-                                     (center[1] - old_center[1])**2)
-                    
-                    if distance < self.max_distance and distance < min_distance:
-                        min_distance = distance
-                        closest_old_id = old_id
-                
-                # Eğer yakın bir track bulunduysa, ID'yi geri yükle
-                if closest_old_id is not None:
-                    self.track_history[track_id] = self.track_history.pop(closest_old_id)
-                    del self.disappeared_tracks[closest_old_id]
-
-        # Mevcut frame'de görünmeyen track'leri kaydet
-        for track_id in list(self.track_history.keys()):
-            if track_id not in current_track_ids:
-                track_info = self.track_history[track_id]
-                self.disappeared_tracks[track_id] = (track_info.last_position, current_time)
-
-    def update(self, detections: sv.Detections):
-        current_time = time.time()
-        
         # Kaybolan track'leri kontrol et
-        self._handle_disappeared_tracks(current_time, detections)
-        
-        # Her tespit için zone kontrolü
-        for i, (bbox, track_id) in enumerate(zip(detections.xyxy, detections.tracker_id)):
-            center = self._calculate_center(bbox)
-            
-            # Track geçmişi yoksa oluştur
-            if track_id not in self.track_history:
-                self.track_history[track_id] = TrackInfo(
-                    last_seen=current_time,
-                    last_position=center,
-                    in_zones=set(),
-                    completed_zones=set()
-                )
-            
-            track_info = self.track_history[track_id]
-            track_info.last_seen = current_time
-            track_info.last_position = center
-            
-            # Her zone için kontrol
-            for zone_name, zone_info in self.zones.items():
-                is_in_zone = self._is_in_zone(center, zone_info["coords"])
-                
-                if is_in_zone:
-                    # Zone'a yeni giriş
-                    if zone_name not in track_info.in_zones:
-                        track_info.in_zones.add(zone_name)
-                else:
-                    # Zone'dan çıkış
-                    if zone_name in track_info.in_zones:
-                        track_info.in_zones.remove(zone_name)
-                        if zone_name not in track_info.completed_zones:
-                            track_info.completed_zones.add(zone_name)
-                            self.zones[zone_name]["count"] += 1
-                            print(f"ID {track_id} completed {zone_name}. New count: {self.zones[zone_name]['count']}")
+        self._handle_disappeared_tracks(current_time, zone_frame)
+
+        table = self.track_table
+        track_ids = zone_frame.track_ids.tolist()
+        slots = table.slots(track_ids)
+        table.touch(slots, current_time, zone_frame.centers)
+
+        # Track'in kendi geçmişine göre giriş/çıkış (ID geri yüklemesi durumu taşır)
+        masks = zone_bitmasks(zone_frame.membership)
+        exited = table.in_mask[slots] & ~masks
+        newly_completed = exited & ~table.completed_mask[slots]
+        table.completed_mask[slots] |= exited
+        table.in_mask[slots] = masks
+
+        # Zone'dan çıkış: her track her zone için bir kez sayılır
+        zone_names = self.zone_engine.zone_names
+        for row in np.flatnonzero(newly_completed).tolist():
+            for zone_idx in mask_to_indices(int(newly_completed[row]), len(zone_names)):
+                zone_name = zone_names[zone_idx]
+                self.zones[zone_name]["count"] += 1
+                if self.events is not None:
+                    self.events.emit(COUNT_INCREMENT, current_time, track_ids[row], zone_name,
+                                     count=self.zones[zone_name]["count"])
+                if self.on_count is not None:
+                    self.on_count(track_ids[row], zone_name, current_time)
 
         # Uzun süre görünmeyen track'leri temizle
-        for track_id in list(self.disappeared_tracks.keys()):
-            if current_time - self.disappeared_tracks[track_id][1] > self.max_disappeared_time:
-                if track_id in self.track_history:
-                    del self.track_history[track_id]
-                del self.disappeared_tracks[track_id]
+        if self._owns_table:
+            table.evict(current_time, self.max_disappeared_time)
+
+    @property
+    def track_history(self):
+        """track_id -> TrackInfo görünümü (okuma anında oluşturulur)"""
+        table = self.track_table
+        zone_names = self.zone_engine.zone_names
+        history = {}
+        for track_id, slot in table.slot_of.items():
+            history[track_id] = TrackInfo(
+                last_seen=float(table.last_seen[slot]),
+                last_position=tuple(table.position[slot].tolist()),
+                in_zones={zone_names[z] for z in mask_to_indices(int(table.in_mask[slot]), len(zone_names))},
+                completed_zones={zone_names[z] for z in
+                                 mask_to_indices(int(table.completed_mask[slot]), len(zone_names))}
+            )
+        return history
 
     def get_counts(self):
         return {zone: info["count"] for zone, info in self.zones.items()}
 
     def get_active_tracks(self):
-        return {track_id: info.in_zones 
-                for track_id, info in self.track_history.items()}
\ No newline at end of file
+        return {track_id: info.in_zones
+                for track_id, info in self.track_history.items()}
@@ -0,0 +1,266 @@
+from dataclasses import dataclass
+from typing import Dict, List
+import copy
+import hashlib
+import json
+import os
+import cv2
+import numpy as np
+
+# Ölçeklenmiş zone'lar {(zones dosyası özeti, frame boyutu): zones} ve etiket
+# rasterları {zone geometrisi özeti: (origin, raster)}; aynı süreçteki
+# analizörler ve akışlar geometriyi bir kez hesaplar
+_zones_cache = {}
+_raster_cache = {}
+_CACHE_SIZE = 16
+
+# Zone üyelikleri işaretli int64 bit maskelerinde tutulur (TrackTable); işaret biti kullanılmaz
+MAX_ZONES = 63
+
+
+def _cache_put(cache, key, value):
+    if len(cache) >= _CACHE_SIZE:
+        del cache[next(iter(cache))]  # En eski kayıt
+    cache[key] = value
+
+
+@dataclass
+class ZoneFrame:
+    """Bir frame için zone üyelik sonucu (N tespit x Z zone)"""
+    track_ids: np.ndarray      # (N,) int
+    centers: np.ndarray        # (N, 2) float
+    membership: np.ndarray     # (N, Z) bool - tespit zone içinde mi
+    entered: np.ndarray        # (N, Z) bool - bu frame'de zone'a giriş
+    exited: np.ndarray         # (N, Z) bool - bu frame'de zone'dan çıkış (tespit görünür)
+    lost_ids: np.ndarray       # (K,) int - önceki frame'de zone içinde olup artık görünmeyen track'ler
+    lost_membership: np.ndarray  # (K, Z) bool - kaybolan track'lerin son üyelikleri
+
+
+def zone_polygon(zone_info) -> np.ndarray:
+    """Zone'un köşeleri (K, 2) int32; poligonu olmayan zone için coords dikdörtgeni"""
+    if zone_info.get("polygon"):
+        return np.asarray(zone_info["polygon"], dtype=np.int32).reshape(-1, 2)
+    x1, y1, x2, y2 = zone_info["coords"]
+    return np.asarray([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.int32)
+
+
+def polygon_bounds(polygon):
+    """Poligonu çevreleyen [x1, y1, x2, y2] (eski 'coords' alanı)"""
+    polygon = np.asarray(polygon).reshape(-1, 2)
+    x1, y1 = polygon.min(axis=0).tolist()
+    x2, y2 = polygon.max(axis=0).tolist()
+    return [int(x1), int(y1), int(x2), int(y2)]
+
+
+class ZoneEngine:
+    """Tüm zone'lar için üyelik matrisini frame başına tek seferde hesaplar.
+
+    ZoneCounter ve CycleTimeAnalyzer aynı ZoneFrame'i okur. Zone'lar (dikdörtgen
+    veya poligon) önceden piksel başına zone bit maskesi tutan bir etiket
+    rasterına çizilir; üyelik, tespit noktalarında tek bir dizi okumasıdır ve
+    maliyeti zone sayısından ve şeklinden bağımsızdır.
+    """
+
+    def __init__(self, zones):
+        self.set_zones(zones)
+
+    def set_zones(self, zones):
+        """Zone koordinatlarını (yeniden) yükle ve önceki durumu sıfırla"""
+        self.zones = zones
+        self.zone_names: List[str] = list(zones.keys())
+        self.zone_index: Dict[str, int] = {name: i for i, name in enumerate(self.zone_names)}
+        if self.zone_names:
+            self.bounds = np.asarray([zones[name]["coords"] for name in self.zone_names],
+                                     dtype=np.float64).reshape(-1, 4)
+        else:
+            self.bounds = np.empty((0, 4), dtype=np.float64)
+        self._build_raster()
+        self._previous = {}  # {track_id: (Z,) bool} - bir önceki frame'in üyelikleri
+
+    def _geometry_key(self):
+        digest = hashlib.sha1()
+        for name in self.zone_names:
+            zone_info = self.zones[name]
+            digest.update(b'p' if zone_info.get("polygon") else b'r')
+            digest.update(np.asarray(zone_info["coords"], dtype=np.int64).tobytes())
+            digest.update(zone_polygon(zone_info).astype(np.int64).tobytes())
+        return digest.hexdigest()
+
+    def _build_raster(self):
+        """Zone'ları kapsayan alan için piksel başına zone bit maskesi rasterı oluştur
+        (aynı geometri için önbellekten; raster salt okunurdur)"""
+        n_zones = len(self.zone_names)
+        if n_zones > MAX_ZONES:
+            raise ValueError(f"En fazla {MAX_ZONES} zone desteklenir (verilen: {n_zones})")
+        self._bits = np.left_shift(np.uint64(1), np.arange(n_zones, dtype=np.uint64))
+
+        key = self._geometry_key()
+        if key not in _raster_cache:
+            self._fill_raster()
+            self.raster.flags.writeable = False
+            _cache_put(_raster_cache, key, (self.origin, self.raster))
+        self.origin, self.raster = _raster_cache[key]
+
+    def _fill_raster(self):
+        n_zones = len(self.zone_names)
+        dtype = next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64)
+                     if np.iinfo(t).bits >= n_zones)
+
+        polygons = [zone_polygon(self.zones[name]) for name in self.zone_names]
+        if not polygons:
+            self.origin = np.zeros(2, dtype=np.int64)
+            self.raster = np.zeros((0, 0), dtype=dtype)
+            return
+
+        # Raster yalnızca zone'ların çevreleyen kutusunu kapsar
+        corners = np.concatenate(polygons)
+        x0, y0 = np.maximum(corners.min(axis=0), 0).tolist()
+        x1, y1 = corners.max(axis=0).tolist()
+        self.origin = np.asarray([x0, y0], dtype=np.int64)
+        self.raster = np.zeros((max(y1 - y0 + 1, 0), max(x1 - x0 + 1, 0)), dtype=dtype)
+
+        for z, (name, polygon) in enumerate(zip(self.zone_names, polygons)):
+            bit = dtype(1 << z)
+            if self.zones[name].get("polygon"):
+                # Poligon yalnızca kendi çevreleyen kutusu içinde doldurulur
+                px0, py0 = np.maximum(polygon.min(axis=0) - self.origin, 0).tolist()
+                px1, py1 = (polygon.max(axis=0) - self.origin + 1).tolist()
+                window = self.raster[py0:py1, px0:px1]
+                mask = np.zeros(window.shape, dtype=np.uint8)
+                cv2.fillPoly(mask, [polygon - np.asarray([x0 + px0, y0 + py0], dtype=np.int32)], 1)
+                window[mask.view(bool)] |= bit
+            else:
+                # Dikdörtgen: x1 < x < x2 ve y1 < y < y2 olan noktaların pikselleri
+                bx1, by1, bx2, by2 = self.zones[name]["coords"]
+                self.raster[max(by1 - y0, 0):max(by2 - y0, 0), max(bx1 - x0, 0):max(bx2 - x0, 0)] |= bit
+
+    @staticmethod
+    def centers(xyxy) -> np.ndarray:
+        xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+        return np.stack(((xyxy[:, 0] + xyxy[:, 2]) / 2, (xyxy[:, 1] + xyxy[:, 3]) / 2), axis=1)
+
+    def contains(self, points) -> np.ndarray:
+        """(N, 2) noktalar için (N, Z) bool üyelik matrisi döndür"""
+        return self.masks(points)[:, None] & self._bits != 0
+
+    def masks(self, points) -> np.ndarray:
+        """(N, 2) noktaların zone bit maskeleri (raster'dan tek gather)"""
+        pixels = np.floor(np.asarray(points, dtype=np.float64).reshape(-1, 2)).astype(np.int64) - self.origin
+        height, width = self.raster.shape
+        valid = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+        masks = np.zeros(len(pixels), dtype=np.uint64)
+        masks[valid] = self.raster[pixels[valid, 1], pixels[valid, 0]]
+        return masks
+
+    def update(self, xyxy, track_ids) -> ZoneFrame:
+        """Frame'in tespitleri için üyelik ve giriş/çıkış maskelerini hesapla"""
+        track_ids = np.asarray(track_ids, dtype=np.int64).reshape(-1)
+        centers = self.centers(xyxy)
+        membership = self.contains(centers)
+
+        n_zones = len(self.zone_names)
+        previous = np.zeros_like(membership)
+        for row, track_id in enumerate(track_ids.tolist()):
+            prev = self._previous.get(track_id)
+            if prev is not None:
+                previous[row] = prev
+
+        entered = membership & ~previous
+        exited = previous & ~membership
+
+        # Önceki frame'de zone içinde olup bu frame'de görünmeyen track'ler
+        current = set(track_ids.tolist())
+        lost = [track_id for track_id in self._previous if track_id not in current]
+        lost_ids = np.asarray(lost, dtype=np.int64)
+        if lost:
+            lost_membership = np.stack([self._previous[track_id] for track_id in lost])
+        else:
+            lost_membership = np.zeros((0, n_zones), dtype=bool)
+
+        # Yalnızca en az bir zone içindeki track'lerin durumu saklanır
+        inside = membership.any(axis=1)
+        self._previous = {track_id: row for track_id, row
+                          in zip(track_ids[inside].tolist(), membership[inside])}
+
+        return ZoneFrame(
+            track_ids=track_ids,
+            centers=centers,
+            membership=membership,
+            entered=entered,
+            exited=exited,
+            lost_ids=lost_ids,
+            lost_membership=lost_membership
+        )
+
+
+def video_frame_size(video_path):
+    """(genişlik, yükseklik) container meta verisinden; yoksa ilk frame decode edilir.
+    Video açılamazsa None."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width > 0 and height > 0:
+            return width, height
+        ret, frame = cap.read()
+        return (frame.shape[1], frame.shape[0]) if ret else None
+    finally:
+        cap.release()
+
+
+def load_zones(zones_path, video_path=None, frame_size=None):
+    """zones.json'u yükle ve koordinatları videonun çözünürlüğüne ölçekle.
+    frame_size (genişlik, yükseklik) verilirse video açılmaz; yoksa boyut video
+    meta verisinden okunur. Sonuç (dosya özeti, frame boyutu) için önbelleklenir;
+    sayımlar zone'lara yazıldığından her çağrı kendi kopyasını alır."""
+    if os.path.exists(zones_path):
+        with open(zones_path, 'rb') as f:
+            content = f.read()
+        if frame_size is None:
+            frame_size = video_frame_size(video_path)
+        key = (hashlib.sha1(content).hexdigest(), tuple(frame_size) if frame_size else None)
+        if key not in _zones_cache:
+            _cache_put(_zones_cache, key, _scale_zones(json.loads(content), frame_size))
+        return copy.deepcopy(_zones_cache[key])
+        
+    # Varsayılan zone'lar
+    return {
+        "zone1": {"coords": [100, 100, 300, 300], "count": 0},
+        "zone2": {"coords": [400, 100, 600, 300], "count": 0},
+        "zone3": {"coords": [700, 100, 900, 300], "count": 0}
+    }
+
+
+def _scale_zones(data, frame_size):
+    """Kayıtlı zone'ları frame_size'a ölçekle (None: video okunamadı, olduğu gibi)"""
+    if frame_size is not None:
+        current_width, current_height = frame_size
+        saved_height = data["frame_size"]["height"]
+        saved_width = data["frame_size"]["width"]
+        
+        # Boyutlar farklıysa ölçeklendirme yap
+        # (ZoneEngine etiket rasterını ölçeklenmiş zone'lardan video boyutunda kurar)
+        if current_height != saved_height or current_width != saved_width:
+            scale_x = current_width / saved_width
+            scale_y = current_height / saved_height
+            
+            scaled_zones = {}
+            for zone_name, zone_info in data["zones"].items():
+                coords = zone_info["coords"]
+                scaled_coords = [
+                    int(coords[0] * scale_x),  # x1
+                    int(coords[1] * scale_y),  # y1
+                    int(coords[2] * scale_x),  # x2
+                    int(coords[3] * scale_y)   # y2
+                ]
+                scaled_zones[zone_name] = {
+                    "coords": scaled_coords,
+                    "count": zone_info["count"]
+                }
+                if zone_info.get("polygon"):
+                    polygon = [[int(x * scale_x), int(y * scale_y)] for x, y in zone_info["polygon"]]
+                    scaled_zones[zone_name]["polygon"] = polygon
+                    scaled_zones[zone_name]["coords"] = polygon_bounds(polygon)
+            return scaled_zones
+        
+    return data["zones"]
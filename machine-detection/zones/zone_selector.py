@@ -2,6 +2,7 @@ import cv2
 import json
 import os
 import sys
+import numpy as np
 
 # Proje kök dizinini Python path'ine ekle
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -20,6 +21,9 @@ class ZoneSelector:
         self.zone_count = 1
         self.temp_frame = None  # Geçici frame'i saklayacak
         self.frame_size = None  # Frame boyutlarını saklamak için
+        self.mode = 'rect'  # 'rect' (sürükle) veya 'polygon' (köşe köşe tıkla)
+        self.polygon_points = []  # Çizilmekte olan poligonun köşeleri
+        self.cursor = None
 
     def normalize_coordinates(self, start_point, end_point):
         """Koordinatları normalize eder (sol üst, sağ alt formatına çevirir)"""
@@ -36,7 +40,55 @@ class ZoneSelector:
         
         return [left_x, top_y, right_x, bottom_y]
 
+    def add_zone(self, coords, polygon=None):
+        zone_name = f"zone{self.zone_count}"
+        self.zones[zone_name] = {
+            "coords": coords,
+            "count": 0
+        }
+        if polygon is not None:
+            self.zones[zone_name]["polygon"] = polygon
+        self.zone_count += 1
+        print(f"\nZone eklendi: {zone_name}")
+        print(f"Koordinatlar: {coords}")
+        if polygon is not None:
+            print(f"Poligon: {polygon}")
+
+    def close_polygon(self):
+        """Çizilen köşelerden poligon zone oluştur"""
+        points = self.polygon_points
+        self.polygon_points = []
+        if len(points) < 3:
+            print("\nPoligon için en az 3 köşe gerekli!")
+            return
+        if cv2.contourArea(np.asarray(points, dtype=np.int32)) < 400:
+            print("\nZone çok küçük! Lütfen daha büyük bir alan seçin.")
+            return
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        self.add_zone([min(xs), min(ys), max(xs), max(ys)], [list(p) for p in points])
+
+    def polygon_callback(self, event, x, y):
+        if event == cv2.EVENT_LBUTTONDOWN:
+            self.polygon_points.append((x, y))
+        elif event == cv2.EVENT_MOUSEMOVE:
+            self.cursor = (x, y)
+        elif event == cv2.EVENT_RBUTTONDOWN:
+            self.close_polygon()
+
+    def draw_polygon_in_progress(self, frame):
+        if not self.polygon_points:
+            return
+        points = self.polygon_points + ([self.cursor] if self.cursor else [])
+        cv2.polylines(frame, [np.asarray(points, dtype=np.int32)], False, (255, 0, 0), 2)
+        for point in self.polygon_points:
+            cv2.circle(frame, point, 3, (255, 0, 0), -1)
+
     def mouse_callback(self, event, x, y, flags, param):
+        if self.mode == 'polygon':
+            self.polygon_callback(event, x, y)
+            return
+
         if event == cv2.EVENT_LBUTTONDOWN:
             self.drawing = True
             self.start_point = (x, y)
@@ -66,24 +118,21 @@ class ZoneSelector:
             
             # Minimum boyut kontrolü
             if abs(coords[2] - coords[0]) > 20 and abs(coords[3] - coords[1]) > 20:
-                zone_name = f"zone{self.zone_count}"
-                self.zones[zone_name] = {
-                    "coords": coords,
-                    "count": 0
-                }
-                self.zone_count += 1
-                print(f"\nZone eklendi: {zone_name}")
-                print(f"Koordinatlar: {coords}")
+                self.add_zone(coords)
             else:
                 print("\nZone çok küçük! Lütfen daha büyük bir alan seçin.")
 
     def draw_existing_zones(self, frame):
         for zone_name, zone_info in self.zones.items():
             coords = zone_info["coords"]
-            cv2.rectangle(frame, 
-                        (coords[0], coords[1]), 
-                        (coords[2], coords[3]), 
-                        (0, 0, 255), 2)
+            if zone_info.get("polygon"):
+                cv2.polylines(frame, [np.asarray(zone_info["polygon"], dtype=np.int32)],
+                              True, (0, 0, 255), 2)
+            else:
+                cv2.rectangle(frame, 
+                            (coords[0], coords[1]), 
+                            (coords[2], coords[3]), 
+                            (0, 0, 255), 2)
             cv2.putText(frame, zone_name, 
                       (coords[0], coords[1]-10),
                       cv2.FONT_HERSHEY_SIMPLEX, 0.9, 
@@ -115,11 +164,14 @@ class ZoneSelector:
         print("4. 'q' tuşu ile çıkın")
         print("5. 's' tuşu ile kaydedin")
         print("6. 'r' tuşu ile son zone'u silin")
+        print("7. 'p' tuşu ile dikdörtgen / poligon modu arasında geçin")
+        print("   Poligon modu: sol tık ile köşe ekleyin, sağ tık veya Enter ile kapatın")
 
         while True:
             if not self.drawing:
                 display_frame = self.original_frame.copy()
                 self.draw_existing_zones(display_frame)
+                self.draw_polygon_in_progress(display_frame)
                 cv2.imshow("Zone Selector", display_frame)
 
             key = cv2.waitKey(1) & 0xFF
@@ -129,6 +181,12 @@ class ZoneSelector:
                 self.save_zones()
                 print("\nZone'lar kaydedildi!")
                 break
+            elif key == ord('p'):
+                self.mode = 'polygon' if self.mode == 'rect' else 'rect'
+                self.polygon_points = []
+                print(f"\nMod: {'poligon' if self.mode == 'polygon' else 'dikdörtgen'}")
+            elif key == 13 and self.mode == 'polygon':  # Enter: poligonu kapat
+                self.close_polygon()
             elif key == ord('r') and self.zones:  # Son zone'u silme
                 last_zone = f"zone{self.zone_count-1}"
                 if last_zone in self.zones:
@@ -160,7 +218,8 @@ class ZoneSelector:
         print(f"Frame boyutları: {self.frame_size}")
         print("self.zones = {")
         for zone_name, zone_info in self.zones.items():
-            print(f'    "{zone_name}": {{"coords": {zone_info["coords"]}, "count": 0}},')
+            polygon = f', "polygon": {zone_info["polygon"]}' if zone_info.get("polygon") else ''
+            print(f'    "{zone_name}": {{"coords": {zone_info["coords"]}{polygon}, "count": 0}},')
         print("}")
 
 def main():